@@ -1,21 +1,29 @@
 import os
 import glob
-import gspread
-from google.oauth2.service_account import Credentials
 import time
-import pyautogui
-import win32com.client
 import threading
 import json
-import win32gui
-import win32con
 import re
+import operator
+from itertools import zip_longest
+import leitor_xlsx
+import rastreamento
+import relatorio_alteracoes
+import unidades
+import periodos
+
+# gspread/google-auth, pyautogui e pywin32 (win32gui, win32com) são importados dentro das
+# funções que os usam: ler e limpar o .xlsx não carrega GUI, COM nem o cliente do Google.
+# numpy é opcional: só acelera a limpeza de relatórios grandes (caminho escalar sem ele)
 
 def setup_google_credentials(credentials_file_path):
     """
     Configura as credenciais para acessar Google Sheets - VERSÃO CORRIGIDA
     """
     try:
+        import gspread
+        from google.oauth2.service_account import Credentials
+
         # Define os escopos corretos para Google Sheets API
         scopes = [
             'https://www.googleapis.com/auth/spreadsheets',
@@ -44,6 +52,62 @@ def setup_google_credentials(credentials_file_path):
         print(f"Erro ao configurar credenciais do Google: {e}")
         raise
 
+# Cache de clientes e planilhas do Google para reaproveitar autenticação, conexões
+# HTTP (keep-alive da sessão do gspread) e metadados entre uploads do mesmo processo
+_clientes_google = {}
+_planilhas_google = {}
+_trava_cache_google = threading.Lock()
+
+def obter_cliente_google(credentials_file_path):
+    """
+    Retorna o cliente gspread do processo para este arquivo de credenciais,
+    criando-o apenas na primeira chamada.
+
+    O token OAuth fica na sessão autorizada do cliente e só é renovado quando
+    está perto de expirar (google-auth renova automaticamente na requisição).
+    """
+    chave = os.path.abspath(credentials_file_path)
+    # Requisições à API do Google passam a contar nos spans (rastreamento.py)
+    rastreamento.instrumentar_http()
+    with _trava_cache_google:
+        client = _clientes_google.get(chave)
+        if client is None:
+            client = setup_google_credentials(credentials_file_path)
+            _clientes_google[chave] = client
+        else:
+            print("♻️ Reutilizando cliente do Google Sheets já autenticado")
+        return client
+
+def extrair_id_planilha(google_sheets_url):
+    """Extrai o ID da planilha de uma URL do Google Sheets"""
+    if '/d/' not in google_sheets_url:
+        raise ValueError("URL do Google Sheets inválida")
+    return google_sheets_url.split('/d/')[1].split('/')[0]
+
+def obter_planilha_google(credentials_file_path, spreadsheet_id):
+    """
+    Retorna (spreadsheet, worksheet da primeira aba) do cache, abrindo por ID só na primeira vez
+    """
+    chave = (os.path.abspath(credentials_file_path), spreadsheet_id)
+    with _trava_cache_google:
+        em_cache = _planilhas_google.get(chave)
+    if em_cache is not None:
+        return em_cache
+
+    client = obter_cliente_google(credentials_file_path)
+    spreadsheet = client.open_by_key(spreadsheet_id)
+    worksheet = spreadsheet.get_worksheet(0)
+
+    with _trava_cache_google:
+        _planilhas_google[chave] = (spreadsheet, worksheet)
+    return spreadsheet, worksheet
+
+def limpar_cache_google():
+    """Descarta clientes e planilhas em cache (ex.: após trocar credenciais)"""
+    with _trava_cache_google:
+        _clientes_google.clear()
+        _planilhas_google.clear()
+
 def encontra_arquivoReport_maisRecente():
     """
     1. Acesse a pasta de downloads do meu computador;
@@ -194,6 +258,8 @@ def encontrar_popup_transferencia1():
     """
     Encontra especificamente a janela do popup da área de transferência
     """
+    import win32gui
+
     def enum_windows_callback(hwnd, windows):
         if win32gui.IsWindowVisible(hwnd):
             window_text = win32gui.GetWindowText(hwnd)
@@ -215,6 +281,9 @@ def tratar_popup_transferencia2():
     Versão melhorada que procura especificamente pelo popup
     """
     try:
+        import pyautogui
+        import win32gui
+
         print("🫸 Aguardando popup da área de transferência...")
         time.sleep(3)
         
@@ -252,6 +321,8 @@ def tratar_popup_transferencia3():
     Mais seguro que clicar no centro da tela
     """
     try:
+        import pyautogui
+
         print("🫸 Tratando popup via teclado...")
         time.sleep(2)
         
@@ -281,6 +352,8 @@ def tratar_popup_transferencia4():
     Método mais seguro que não clica em lugar nenhum
     """
     try:
+        import pyautogui
+
         print("🫸 Aguardando popup da área de transferência...")
         time.sleep(3)
         
@@ -312,6 +385,8 @@ def tratar_popup_transferencia_seguro():
     Método mais seguro que não clica em lugar nenhum
     """
     try:
+        import pyautogui
+
         print("🫸 Aguardando popup da área de transferência...")
         time.sleep(3)
         
@@ -475,9 +550,7 @@ def verificar_configuracao_google(credentials_file, google_sheets_url):
         
         # Testa conexão
         print("🔄 Testando conexão com Google Sheets...")
-        client = setup_google_credentials(credentials_file)
-        spreadsheet = client.open_by_key(spreadsheet_id)
-        worksheet = spreadsheet.get_worksheet(0)
+        spreadsheet, worksheet = obter_planilha_google(credentials_file, spreadsheet_id)
         
         print(f"✅ Conexão bem-sucedida!")
         print(f"📊 Planilha: {spreadsheet.title}")
@@ -494,6 +567,7 @@ def paste_to_google_sheets_com_formatacao_old(google_sheets_url, data, credentia
     Versão melhorada que cola dados E aplica formatação de moeda
     """
     try:
+        import gspread
         from google.oauth2.service_account import Credentials
         
         print("Configurando acesso ao Google Sheets...")
@@ -590,69 +664,119 @@ def paste_to_google_sheets_com_formatacao_old(google_sheets_url, data, credentia
 
 
 
-def aplicar_formatacao_completa_google_sheets(worksheet, data, linha_inicio=1):
+# Colunas do relatório Ranking de Unidades por tipo de formatação
+COLUNAS_MOEDA = ['C', 'D', 'F', 'G', 'L', 'M', 'O', 'P', 'R', 'S', 'U', 'V', 'X', 'Y', 'AP', 'AQ', 'AS', 'AT']
+COLUNAS_PORCENTAGEM = ['E', 'H', 'I', 'J', 'K', 'N', 'Q', 'T', 'W', 'Z', 'AC', 'AF', 'AI', 'AL', 'AO', 'AR', 'AU']
+COLUNAS_NUMERO = ['AA', 'AB', 'AD', 'AE', 'AG', 'AH', 'AJ', 'AK', 'AM', 'AN']
+
+# Formatos do Google Sheets
+FORMATO_MOEDA_BR = {
+    "numberFormat": {
+        "type": "CURRENCY",
+        "pattern": "\"R$\"#,##0.00"
+    }
+}
+
+FORMATO_PORCENTAGEM = {
+    "numberFormat": {
+        "type": "PERCENT",
+        "pattern": "0.00%"
+    }
+}
+
+FORMATO_NUMERO = {
+    "numberFormat": {
+        "type": "NUMBER",
+        "pattern": "0"
+    }
+}
+
+def agrupa_colunas_adjacentes(colunas):
+    """
+    Agrupa colunas vizinhas em intervalos de índices (início, fim) inclusivos
+    Ex.: ['C', 'D', 'F', 'G', 'L'] -> [(2, 3), (5, 6), (11, 11)]
+    """
+    indices = sorted(leitor_xlsx.coluna_para_indice(col) for col in colunas)
+    grupos = []
+    for indice in indices:
+        if grupos and indice == grupos[-1][1] + 1:
+            grupos[-1] = (grupos[-1][0], indice)
+        else:
+            grupos.append((indice, indice))
+    return grupos
+
+def monta_requisicoes_formatacao(sheet_id, linha_inicio, linha_fim):
+    """
+    Monta as requisições repeatCell (uma por grupo de colunas adjacentes com o mesmo formato)
+    para serem enviadas juntas em um único spreadsheets.batchUpdate
+    """
+    requisicoes = []
+    for colunas, formato in ((COLUNAS_MOEDA, FORMATO_MOEDA_BR),
+                             (COLUNAS_PORCENTAGEM, FORMATO_PORCENTAGEM),
+                             (COLUNAS_NUMERO, FORMATO_NUMERO)):
+        for inicio, fim in agrupa_colunas_adjacentes(colunas):
+            requisicoes.append({
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "startRowIndex": linha_inicio - 1,
+                        "endRowIndex": linha_fim,
+                        "startColumnIndex": inicio,
+                        "endColumnIndex": fim + 1
+                    },
+                    "cell": {"userEnteredFormat": formato},
+                    "fields": "userEnteredFormat.numberFormat"
+                }
+            })
+    return requisicoes
+
+@rastreamento.rastrear('formatacao', 'sheets')
+def aplicar_formatacao_completa_google_sheets(worksheet, data, linha_inicio=1, em_lote=True):
     """
     Aplica formatação completa (moeda, porcentagem, número) às colunas específicas no Google Sheets
+
+    Com em_lote=True (padrão) todas as formatações vão em um único batchUpdate.
+    Com em_lote=False mantém o comportamento antigo (um worksheet.format() por coluna).
     """
     try:
         print("🎨 Aplicando formatação completa no Google Sheets...")
         
-        # Definir todas as colunas por tipo
-        colunas_moeda = ['C', 'D', 'F', 'G', 'L', 'M', 'O', 'P', 'R', 'S', 'U', 'V', 'X', 'Y', 'AP', 'AQ', 'AS', 'AT']
-        colunas_porcentagem = ['E', 'H', 'I', 'J', 'K', 'N', 'Q', 'T', 'W', 'Z', 'AC', 'AF', 'AI', 'AL', 'AO', 'AR', 'AU']
-        colunas_numero = ['AA', 'AB', 'AD', 'AE', 'AG', 'AH', 'AJ', 'AK', 'AM', 'AN']
-        
         num_linhas = len(data)
         linha_fim = linha_inicio + num_linhas - 1
         
-        # Formatos
-        formato_moeda_br = {
-            "numberFormat": {
-                "type": "CURRENCY",
-                "pattern": "\"R$\"#,##0.00"
-            }
-        }
-        
-        formato_porcentagem = {
-            "numberFormat": {
-                "type": "PERCENT",
-                "pattern": "0.00%"
-            }
-        }
-        
-        formato_numero = {
-            "numberFormat": {
-                "type": "NUMBER",
-                "pattern": "0"
-            }
-        }
+        if em_lote:
+            requisicoes = monta_requisicoes_formatacao(worksheet.id, linha_inicio, linha_fim)
+            worksheet.spreadsheet.batch_update({"requests": requisicoes})
+            print(f"📦 {len(requisicoes)} intervalos formatados em uma única requisição (linhas {linha_inicio}-{linha_fim})")
+            print("✅ Formatação completa concluída.")
+            return
         
         # Aplica formatação de moeda
         print("💰 Aplicando formatação de moeda...")
-        for coluna in colunas_moeda:
+        for coluna in COLUNAS_MOEDA:
             try:
                 range_formatacao = f"{coluna}{linha_inicio}:{coluna}{linha_fim}"
-                worksheet.format(range_formatacao, formato_moeda_br)
+                worksheet.format(range_formatacao, FORMATO_MOEDA_BR)
                 print(f"💱 Formatação de moeda aplicada na coluna {coluna}")
             except Exception as e:
                 print(f"⚠️ Erro ao formatar moeda na coluna {coluna}: {e}")
         
         # Aplica formatação de porcentagem
         print("📊 Aplicando formatação de porcentagem...")
-        for coluna in colunas_porcentagem:
+        for coluna in COLUNAS_PORCENTAGEM:
             try:
                 range_formatacao = f"{coluna}{linha_inicio}:{coluna}{linha_fim}"
-                worksheet.format(range_formatacao, formato_porcentagem)
+                worksheet.format(range_formatacao, FORMATO_PORCENTAGEM)
                 print(f"📈 Formatação de porcentagem aplicada na coluna {coluna}")
             except Exception as e:
                 print(f"⚠️ Erro ao formatar porcentagem na coluna {coluna}: {e}")
         
         # Aplica formatação de número
         print("🔢 Aplicando formatação de número...")
-        for coluna in colunas_numero:
+        for coluna in COLUNAS_NUMERO:
             try:
                 range_formatacao = f"{coluna}{linha_inicio}:{coluna}{linha_fim}"
-                worksheet.format(range_formatacao, formato_numero)
+                worksheet.format(range_formatacao, FORMATO_NUMERO)
                 print(f"🔢 Formatação de número aplicada na coluna {coluna}")
             except Exception as e:
                 print(f"⚠️ Erro ao formatar número na coluna {coluna}: {e}")
@@ -670,7 +794,226 @@ def indice_para_coluna_letra(indice):
         indice = indice // 26 - 1
     return result
 
-def limpar_dados_completo_brasileiro_expandido(data):
+# Esquema das colunas do relatório (compilado uma vez na importação do módulo, a partir
+# de COLUNAS_MOEDA, COLUNAS_PORCENTAGEM e COLUNAS_NUMERO acima)
+INDICE_A = leitor_xlsx.coluna_para_indice('A')
+INDICE_B = leitor_xlsx.coluna_para_indice('B')
+INDICE_AV = leitor_xlsx.coluna_para_indice('AV')
+
+def converte_moeda(valor):
+    """'R$ 1.234,56' -> 1234.56 (texto que não é número volta só sem o prefixo)"""
+    if valor.startswith("'R$"):
+        valor = valor[3:]
+    elif valor.startswith("'"):
+        valor = valor[1:]
+    elif valor.startswith("R$"):
+        valor = valor[2:]
+    valor = valor.strip()
+
+    if valor and not valor.isalpha():
+        try:
+            partes = valor.split(',')
+            if len(partes) == 2:
+                valor = f"{partes[0].replace('.', '')},{partes[1]}"
+            else:
+                valor = valor.replace('.', '')
+            return float(valor.replace(',', '.'))
+        except ValueError:
+            return valor.strip()
+    return valor
+
+def converte_porcentagem(valor):
+    """'15,5%' -> 0.155; valores até 1 já são considerados decimais"""
+    valor = valor.strip()
+    if valor.endswith('%'):
+        valor = valor[:-1].strip()
+
+    if valor and not valor.isalpha():
+        try:
+            valor_numerico = float(valor.replace(',', '.'))
+            return valor_numerico / 100 if valor_numerico > 1 else valor_numerico
+        except ValueError:
+            return valor.strip()
+    return valor
+
+def converte_numero(valor):
+    """'1.234,5' -> 1234.5 e '1.234' -> 1234.0"""
+    valor = valor.strip()
+
+    if valor and not valor.isalpha():
+        try:
+            partes = valor.split(',')
+            if len(partes) == 2:
+                valor = f"{partes[0].replace('.', '')}.{partes[1]}"
+            else:
+                valor = valor.replace('.', '')
+            return float(valor)
+        except ValueError:
+            return valor.strip()
+    return valor
+
+def converte_texto(valor):
+    """Outras colunas: só remove espaços"""
+    return valor.strip()
+
+def converte_unidade(valor):
+    """Código da unidade (coluna A) -> Unidade(slug, nome, cep), ou None se o código não for conhecido"""
+    return unidades.resolver_unidade(valor.strip())
+
+def converte_periodo(valor):
+    """Período 'dd/mm/aaaa-dd/mm/aaaa' (coluna B) -> rótulo ('Janeiro/2024', 'Semana 05/2024', ...), ou None se não for um período"""
+    return periodos.rotulo_periodo(valor.strip())
+
+def compilar_esquema_colunas(largura=INDICE_AV + 1):
+    """
+    Monta a lista de conversores por índice de coluna (moeda, porcentagem, número ou texto),
+    para a limpeza fazer uma única consulta por célula em vez de procurar o índice em listas
+    """
+    tipos = {}
+    for colunas, conversor in ((COLUNAS_MOEDA, converte_moeda),
+                               (COLUNAS_PORCENTAGEM, converte_porcentagem),
+                               (COLUNAS_NUMERO, converte_numero)):
+        for coluna in colunas:
+            tipos[leitor_xlsx.coluna_para_indice(coluna)] = conversor
+    largura = max(largura, max(tipos) + 1)
+    return [tipos.get(j, converte_texto) for j in range(largura)]
+
+# As colunas A e B passam primeiro pelos conversores de chave (unidade e período), antes
+# do conversor de célula, e a unidade reconhecida define o CEP da coluna AV
+CONVERSORES_CHAVE = ((INDICE_A, 'A', 'unidade', converte_unidade), (INDICE_B, 'b', 'periodo', converte_periodo))
+ESQUEMA_COLUNAS = compilar_esquema_colunas()
+
+# Nome da regra de cada conversor no relatório de alterações
+REGRAS_CONVERSORES = {converte_moeda: 'moeda', converte_porcentagem: 'porcentagem',
+                      converte_numero: 'numero', converte_texto: 'texto'}
+
+def remove_marcadores_edicao(valor):
+    """Remove 'edit' e 'add' do texto. Retorna (valor, se algum marcador foi encontrado)"""
+    encontrou = False
+    minusculo = valor.lower()
+    if 'edit' in minusculo:
+        valor = valor.replace('edit', '').replace('Edit', '').replace('EDIT', '')
+        encontrou = True
+        minusculo = valor.lower()
+
+    if 'add' in minusculo:
+        valor = valor.replace('add', '').replace('Add', '').replace('ADD', '')
+        encontrou = True
+    return valor, encontrou
+
+# Caminho colunar (NumPy): cada coluna numérica é tratada de uma vez, como um único texto
+# (uma célula por linha). Uma regex sobre o texto inteiro troca por 'nan' as células fora
+# do formato comum ('R$ 1.234,56', '15,5%', '1.234'); no resto, prefixos, '%', espaços e
+# separadores são trocados no texto todo e o NumPy lê a coluna inteira como float64.
+# As células 'nan' seguem pelo conversor escalar. O resultado é idêntico ao escalar.
+LINHAS_MINIMAS_NUMPY = 5000
+
+def _formato_numpy(prefixo, corpo, sufixo):
+    """Regex das linhas (células) fora do formato prefixo + número + sufixo, inclusive vazias"""
+    return re.compile(f"^(?!{prefixo} *{corpo} *{sufixo}$).*$", re.MULTILINE)
+
+# conversor -> (regex das células fora do formato, textos removidos das demais, remove pontos de milhar)
+PADROES_NUMPY = {
+    converte_moeda: (_formato_numpy(r"(?:'R\$|'|R\$)?", r"[0-9][0-9.]*(?:,[0-9]+)?", ""),
+                     ("'R$", "R$", "'", " "), True),
+    converte_porcentagem: (_formato_numpy("", r"[0-9]+(?:,[0-9]+)?", "%?"), ("%", " "), False),
+    converte_numero: (_formato_numpy("", r"[0-9][0-9.]*(?:,[0-9]+)?", ""), (" ",), True),
+}
+
+def _numpy_para_limpeza(motor, linhas):
+    """Módulo numpy se o caminho colunar deve ser usado, senão None"""
+    if motor == 'escalar' or (motor == 'auto' and linhas < LINHAS_MINIMAS_NUMPY):
+        return None
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        if motor == 'numpy':
+            print("⚠️ NumPy não instalado: usando o caminho escalar")
+        return None
+
+def _limpar_colunas_numpy(np, data, conversores, letras, relatorio):
+    """
+    Converte as colunas de moeda, porcentagem e número coluna a coluna (altera 'data').
+    As alterações vão para o relatório em bloco, ou uma a uma se o nível pedir detalhes.
+
+    Retorna:
+    - lista com True para cada linha que teve alguma célula alterada
+    """
+    # Matriz coluna x linha (linhas curtas completadas com None); volta para 'data' no final
+    colunas = list(zip_longest(*data))
+    matriz = np.empty((len(colunas), len(data)), dtype=object)
+    for j, coluna in enumerate(colunas):
+        matriz[j] = coluna
+    alteradas = np.zeros(len(data), dtype=bool)
+    em_bloco = escalares = 0
+
+    for j, conversor in enumerate(conversores[:len(colunas)]):
+        if conversor not in PADROES_NUMPY:
+            continue
+        letra, regra = letras[j], REGRAS_CONVERSORES[conversor]
+        indices = np.flatnonzero(np.not_equal(matriz[j], None))
+        if not len(indices):
+            continue
+        valores = list(map(str, matriz[j, indices].tolist()))
+
+        descarte, removidos, remove_pontos = PADROES_NUMPY[conversor]
+        coluna_texto = '\n'.join(valores)
+        numeros = None
+        if coluna_texto.count('\n') == len(valores) - 1:
+            texto = descarte.sub('nan', coluna_texto)
+            for removido in removidos + (('.',) if remove_pontos else ()):
+                texto = texto.replace(removido, '')
+            numeros = np.fromstring(texto.replace(',', '.'), dtype=np.float64, sep='\n')
+        if numeros is None or len(numeros) != len(valores):
+            # Célula com quebra de linha: a coluna inteira vai pelo caminho escalar
+            numeros = np.full(len(valores), np.nan)
+
+        # Células do formato comum só têm dígitos: nunca viram NaN
+        rapidas = ~np.isnan(numeros)
+        if conversor is converte_porcentagem:
+            numeros = np.where(numeros > 1, numeros / 100, numeros)
+
+        # Mesmo critério do caminho escalar: só é alteração se o texto mudou ('0.0' -> 0.0 não é).
+        # Os números do formato comum viram floats inteiros ('N.0') ou decimais com vírgula, então
+        # só um texto terminado em '.0' pode coincidir; sem nenhum, toda célula convertida mudou.
+        mudadas = rapidas
+        if '.0\n' in coluna_texto + '\n':
+            mudadas = rapidas & np.array(list(map(operator.ne, valores, map(str, numeros.tolist()))))
+
+        matriz[j, indices[mudadas]] = numeros[mudadas]
+        alteradas[indices[mudadas]] = True
+        if relatorio.por_celula:
+            numeros_lista = numeros.tolist()
+            for k in np.flatnonzero(mudadas).tolist():
+                relatorio.registrar(int(indices[k]) + 3, letra, regra, valores[k], numeros_lista[k])
+        else:
+            relatorio.contar(letra, regra, int(mudadas.sum()))
+        em_bloco += int(rapidas.sum())
+
+        for k in np.flatnonzero(~rapidas).tolist():
+            i = int(indices[k])
+            valor_original = valores[k]
+            valor_processado, marcado = remove_marcadores_edicao(valor_original)
+            valor_processado = conversor(valor_processado)
+            if valor_original != str(valor_processado):
+                matriz[j, i] = valor_processado
+                relatorio.registrar(i + 3, letra, regra + '+edit/add' if marcado else regra,
+                                    valor_original, valor_processado)
+                marcado = True
+            if marcado:
+                alteradas[i] = True
+            escalares += 1
+
+    # Devolve as colunas convertidas às linhas, mantendo o tamanho original de cada uma
+    for row, nova in zip(data, matriz.T.tolist()):
+        row[:] = nova[:len(row)]
+
+    print(f"🧮 NumPy: {em_bloco} células numéricas convertidas em bloco, {escalares} pelo caminho escalar")
+    return alteradas.tolist()
+
+@rastreamento.rastrear('limpeza', 'dados')
+def limpar_dados_completo_brasileiro_expandido(data, motor='auto', relatorio=None):
     """
     Função expandida que limpa dados mantendo formato brasileiro:
     - Remove 'edit' e 'add' de todas as colunas
@@ -678,351 +1021,153 @@ def limpar_dados_completo_brasileiro_expandido(data):
     - MANTÉM formato brasileiro (vírgula como separador decimal)
     - Substitui códigos de unidades por nomes das cidades na coluna A
     - Prepara dados para formatação no Google Sheets
+
+    Cada célula é convertida pelo conversor da sua coluna em ESQUEMA_COLUNAS.
+
+    Parâmetros:
+    - motor: 'escalar' (célula a célula), 'numpy' (colunas numéricas em bloco, se o NumPy
+      estiver instalado) ou 'auto' (numpy a partir de LINHAS_MINIMAS_NUMPY linhas)
+    - relatorio: RelatorioAlteracoes que recebe cada célula alterada. None = um relatório
+      novo no nível padrão ('resumo'), fechado ao final com a tabela de alterações; quem
+      passa o próprio relatório (ex.: vários períodos) chama relatorio.fechar() no final.
     """
+    fechar_relatorio = relatorio is None
+    if relatorio is None:
+        relatorio = relatorio_alteracoes.RelatorioAlteracoes()
+    registrar = relatorio.registrar
+
     try:
-        # Define as colunas que contêm valores monetários
-        def coluna_letra_para_indice(letra):
-            """Converte letra da coluna para índice (A=0, B=1, C=2, etc.)"""
-            if len(letra) == 1:
-                return ord(letra.upper()) - ord('A')
-            elif len(letra) == 2:
-                return (ord(letra[0].upper()) - ord('A') + 1) * 26 + (ord(letra[1].upper()) - ord('A'))
-            else:  # Para colunas como AAA, etc.
-                result = 0
-                for i, char in enumerate(reversed(letra.upper())):
-                    result += (ord(char) - ord('A') + 1) * (26 ** i)
-                return result - 1
-        
-        # Mapeamento de códigos para cidades
-        mapeamento_unidades = {
-            '1odontologiasa': 'Santo Antônio',
-            '2odontologiasa': 'Santo Antônio',
-            '3odontologiasa': 'Santo Antônio',
-            '4odontologiasa': 'Santo Antônio',
-            '5odontologiasa': 'Santo Antônio',
-            '6odontologiasa': 'Santo Antônio',
-            '7odontologiasa': 'Santo Antônio',
-            '8odontologiasa': 'Santo Antônio',
-            '9odontologiasa': 'Santo Antônio',
-            '1odontologiana': 'Natal (odonto)',
-            '2odontologiana': 'Natal (odonto)',
-            '3odontologiana': 'Natal (odonto)',
-            '4odontologiana': 'Natal (odonto)',
-            '5odontologiana': 'Natal (odonto)',
-            '6odontologiana': 'Natal (odonto)',
-            '7odontologiana': 'Natal (odonto)',
-            '8odontologiana': 'Natal (odonto)',
-            '9odontologiana': 'Natal (odonto)',
-            '1odontologiasjm': 'São José do Mipibu',
-            '2odontologiasjm': 'São José do Mipibu',
-            '3odontologiasjm': 'São José do Mipibu',
-            '4odontologiasjm': 'São José do Mipibu',
-            '5odontologiasjm': 'São José do Mipibu',
-            '6odontologiasjm': 'São José do Mipibu',
-            '7odontologiasjm': 'São José do Mipibu',
-            '8odontologiasjm': 'São José do Mipibu',
-            '9odontologiasjm': 'São José do Mipibu',
-            '1odontologiacg': 'Canguaretama',
-            '2odontologiacg': 'Canguaretama',
-            '3odontologiacg': 'Canguaretama',
-            '4odontologiacg': 'Canguaretama',
-            '5odontologiacg': 'Canguaretama',
-            '6odontologiacg': 'Canguaretama',
-            '7odontologiacg': 'Canguaretama',
-            '8odontologiacg': 'Canguaretama',
-            '9odontologiacg': 'Canguaretama',
-            '1odontologiagoi': 'Goianinha',
-            '2odontologiagoi': 'Goianinha',
-            '3odontologiagoi': 'Goianinha',
-            '4odontologiagoi': 'Goianinha',
-            '5odontologiagoi': 'Goianinha',
-            '6odontologiagoi': 'Goianinha',
-            '7odontologiagoi': 'Goianinha',
-            '8odontologiagoi': 'Goianinha',
-            '9odontologiagoi': 'Goianinha',
-            '1mbestetica': 'Natal (MBEstética)',
-            '2mbestetica': 'Natal (MBEstética)',
-            '3mbestetica': 'Natal (MBEstética)',
-            '4mbestetica': 'Natal (MBEstética)',
-            '5mbestetica': 'Natal (MBEstética)',
-            '6mbestetica': 'Natal (MBEstética)',
-            '7mbestetica': 'Natal (MBEstética)',
-            '8mbestetica': 'Natal (MBEstética)',
-            '9mbestetica': 'Natal (MBEstética)',
-            '1odontoma': 'Monte Alegre',
-            '2odontoma': 'Monte Alegre',
-            '3odontoma': 'Monte Alegre',
-            '4odontoma': 'Monte Alegre',
-            '5odontoma': 'Monte Alegre',
-            '6odontoma': 'Monte Alegre',
-            '7odontoma': 'Monte Alegre',
-            '8odontoma': 'Monte Alegre',
-            '9odontoma': 'Monte Alegre',
-            '1odontologiabj': 'Brejinho',
-            '2odontologiabj': 'Brejinho',
-            '3odontologiabj': 'Brejinho',
-            '4odontologiabj': 'Brejinho',
-            '5odontologiabj': 'Brejinho',
-            '6odontologiabj': 'Brejinho',
-            '7odontologiabj': 'Brejinho',
-            '8odontologiabj': 'Brejinho',
-            '9odontologiabj': 'Brejinho',
-            '1odontorecife': 'Recife',
-            '2odontorecife': 'Recife',
-            '3odontorecife': 'Recife',
-            '4odontorecife': 'Recife',
-            '5odontorecife': 'Recife',
-            '6odontorecife': 'Recife',
-            '7odontorecife': 'Recife',
-            '8odontorecife': 'Recife',
-            '9odontorecife': 'Recife',
-        }
-        
-        # Mapeamento de cidades para CEPs
-        mapeamento_ceps = {
-            'Santo Antônio': '59255-000',
-            'Natal (odonto)': '59010-000',
-            'São José do Mipibu': '59162-000',
-            'Canguaretama': '59190-000',
-            'Goianinha': '59173-000',
-            'Natal (MBEstética)': '59010-000',
-            'Monte Alegre': '59182-000',
-            'Brejinho': '59219-000',
-            'Recife': '50010-000'
-        }
-        
-        mapeamento_periodos = {
-            '01/01/2025-31/01/2025': 'Janeiro/2025',
-            '01/02/2025-28/02/2025': 'Fevereiro/2025',
-            '01/03/2025-31/03/2025': 'Março/2025',
-            '01/04/2025-30/04/2025': 'Abril/2025',
-            '01/05/2025-31/05/2025': 'Maio/2025',
-            '01/06/2025-30/06/2025': 'Junho/2025',
-            '01/07/2025-31/07/2025': 'Julho/2025',
-            '01/08/2025-31/08/2025': 'Agosto/2025',
-            '01/09/2025-30/09/2025': 'Setembro/2025',
-            '01/10/2025-31/10/2025': 'Outubro/2025',
-            '01/11/2025-30/11/2025': 'Novembro/2025',
-            '01/12/2025-31/12/2025': 'Dezembro/2025',
-        }
-        
-        # Colunas de moeda: C, D, F, G, L, M, O, P, R, S, U, V, X, Y, AP, AQ, AS, AT
-        colunas_moeda = ['C', 'D', 'F', 'G', 'L', 'M', 'O', 'P', 'R', 'S', 'U', 'V', 'X', 'Y', 'AP', 'AQ', 'AS', 'AT']
-        indices_moeda = [coluna_letra_para_indice(col) for col in colunas_moeda]
-        
-        # Colunas de porcentagem: E, H, I, J, K, N, Q, T, W, Z, AC, AF, AI, AL, AO, AR, AU
-        colunas_porcentagem = ['E', 'H', 'I', 'J', 'K', 'N', 'Q', 'T', 'W', 'Z', 'AC', 'AF', 'AI', 'AL', 'AO', 'AR', 'AU']
-        indices_porcentagem = [coluna_letra_para_indice(col) for col in colunas_porcentagem]
-        
-        # Colunas de número: AA, AB, AD, AE, AG, AH, AJ, AK, AM, AN
-        colunas_numero = ['AA', 'AB', 'AD', 'AE', 'AG', 'AH', 'AJ', 'AK', 'AM', 'AN']
-        indices_numero = [coluna_letra_para_indice(col) for col in colunas_numero]
-        
-        # Coluna AV (índice para CEP)
-        indice_av = coluna_letra_para_indice('AV')
-        indice_b = coluna_letra_para_indice('B')
-        
-        print(f"🔍 Colunas de moeda identificadas: {colunas_moeda}")
-        print(f"📊 Colunas de porcentagem identificadas: {colunas_porcentagem}")
-        print(f"🔢 Colunas de número identificadas: {colunas_numero}")
-        
+        print(f"🔍 Colunas de moeda identificadas: {COLUNAS_MOEDA}")
+        print(f"📊 Colunas de porcentagem identificadas: {COLUNAS_PORCENTAGEM}")
+        print(f"🔢 Colunas de número identificadas: {COLUNAS_NUMERO}")
+
+        # Linhas mais largas que o esquema: colunas extras são texto
+        largura = max(map(len, data), default=0)
+        conversores = ESQUEMA_COLUNAS + [converte_texto] * (largura - len(ESQUEMA_COLUNAS))
+        letras = [indice_para_coluna_letra(j) for j in range(len(conversores))]
+        regras = [REGRAS_CONVERSORES[conversor] for conversor in conversores]
+
+        np = _numpy_para_limpeza(motor, len(data))
+        if np is not None:
+            alteradas_numpy = _limpar_colunas_numpy(np, data, conversores, letras, relatorio)
+            indices_escalares = [j for j, conversor in enumerate(conversores) if conversor not in PADROES_NUMPY]
+
         linhas_alteradas = 0
-        
+
         for i, row in enumerate(data):
             linha_alterada = False
-            linha_alterada2 = False
-            cidade_linha = None  # Para armazenar a cidade da linha atual
-            periodo_linha = None
-            
-            # Primeiro, verifica se há substituição de unidade na coluna A
-            if len(row) > 0 and row[0] is not None:
-                valor_coluna_a = str(row[0]).strip()
-                if valor_coluna_a in mapeamento_unidades:
-                    cidade_linha = mapeamento_unidades[valor_coluna_a]
-                    row[0] = cidade_linha
+            unidade_linha = None  # Unidade da linha atual (nome e CEP)
+
+            # Colunas de chave: unidade (A) e período (B)
+            for j, letra, regra, conversor in CONVERSORES_CHAVE:
+                if len(row) > j and row[j] is not None:
+                    valor_chave = str(row[j]).strip()
+                    convertido = conversor(valor_chave)
+                    if convertido is not None:
+                        if j == INDICE_A:
+                            unidade_linha = convertido
+                            convertido = unidade_linha.nome
+                        row[j] = convertido
+                        linha_alterada = True
+                        registrar(i + 3, letra, regra, valor_chave, convertido)
+
+            # Percorre as colunas da linha (no caminho numpy, só as que não são numéricas)
+            if np is None:
+                celulas = enumerate(row)
+            else:
+                linha_alterada = linha_alterada or alteradas_numpy[i]
+                celulas = ((j, row[j]) for j in indices_escalares if j < len(row))
+
+            for j, cell_value in celulas:
+                if cell_value is None:
+                    continue
+                valor_original = str(cell_value)
+
+                # ETAPA 1: Remove 'edit' e 'add' de qualquer coluna
+                valor_processado, marcado = remove_marcadores_edicao(valor_original)
+                if marcado:
                     linha_alterada = True
-                    print(f"Linha {i+3}, Coluna A: '{valor_coluna_a}' -> '{cidade_linha}'")
-            
-            if len(row) > 0 and row[1] is not None:
-                valor_coluna_b = str(row[1]).strip()
-                if valor_coluna_b in mapeamento_periodos:
-                    periodo_linha = mapeamento_periodos[valor_coluna_b]
-                    row[1] = periodo_linha
+
+                # ETAPA 2: Conversor do tipo da coluna
+                valor_processado = conversores[j](valor_processado)
+
+                # Atualiza o valor se houve mudança
+                if valor_original != str(valor_processado):
+                    row[j] = valor_processado
                     linha_alterada = True
-                    print(f"Linha {i+3}, Coluna b: '{valor_coluna_b}' -> '{periodo_linha}'")
-            
-            # Percorre todas as colunas da linha
-            for j, cell_value in enumerate(row):
-                if cell_value is not None:
-                    valor_original = str(cell_value)
-                    valor_processado = valor_original
-                    
-                    # ETAPA 1: Remove 'edit' e 'add' de qualquer coluna
-                    if 'edit' in valor_processado.lower():
-                        valor_processado = valor_processado.replace('edit', '').replace('Edit', '').replace('EDIT', '')
-                        linha_alterada = True
-                    
-                    if 'add' in valor_processado.lower():
-                        valor_processado = valor_processado.replace('add', '').replace('Add', '').replace('ADD', '')
-                        linha_alterada = True
-                    
-                    # ETAPA 2: Tratamento específico por tipo de coluna
-                    if j in indices_moeda:
-                        # Tratamento para colunas de moeda
-                        if valor_processado.startswith("'R$"):
-                            valor_processado = valor_processado[3:]
-                            linha_alterada = True
-                        elif valor_processado.startswith("'"):
-                            valor_processado = valor_processado[1:]
-                            linha_alterada = True
-                        elif valor_processado.startswith("R$"):
-                            valor_processado = valor_processado[2:]
-                            linha_alterada = True
-                        
-                        valor_processado = valor_processado.strip()
-                        
-                        if valor_processado and not valor_processado.isalpha():
-                            try:
-                                partes = valor_processado.split(',')
-                                if len(partes) == 2:
-                                    parte_inteira = partes[0].replace('.', '')
-                                    parte_decimal = partes[1]
-                                    valor_processado = f"{parte_inteira},{parte_decimal}"
-                                else:
-                                    valor_processado = valor_processado.replace('.', '')
-                                
-                                valor_para_sheets = valor_processado.replace(',', '.')
-                                float(valor_para_sheets)
-                                valor_processado = float(valor_para_sheets)
-                                
-                            except ValueError:
-                                valor_processado = valor_processado.strip()
-                    
-                    elif j in indices_porcentagem:
-                        # Tratamento para colunas de porcentagem
-                        valor_processado = valor_processado.strip()
-                        
-                        # Remove % se estiver presente
-                        if valor_processado.endswith('%'):
-                            valor_processado = valor_processado[:-1].strip()
-                            linha_alterada = True
-                        
-                        if valor_processado and not valor_processado.isalpha():
-                            try:
-                                # Converte vírgula para ponto para processamento
-                                valor_para_sheets = valor_processado.replace(',', '.')
-                                valor_numerico = float(valor_para_sheets)
-                                
-                                # Se o valor é maior que 1, assume que já está em formato percentual (ex: 15 = 15%)
-                                # Se o valor é menor que 1, assume que está em decimal (ex: 0.15 = 15%)
-                                if valor_numerico > 1:
-                                    valor_processado = valor_numerico / 100  # Converte para decimal para Google Sheets
-                                else:
-                                    valor_processado = valor_numerico
-                                
-                            except ValueError:
-                                valor_processado = valor_processado.strip()
-                    
-                    elif j in indices_numero:
-                        # Tratamento para colunas de número
-                        valor_processado = valor_processado.strip()
-                        
-                        if valor_processado and not valor_processado.isalpha():
-                            try:
-                                # Remove separadores de milhares e converte vírgula decimal
-                                partes = valor_processado.split(',')
-                                if len(partes) == 2:
-                                    parte_inteira = partes[0].replace('.', '')
-                                    parte_decimal = partes[1]
-                                    valor_processado = f"{parte_inteira}.{parte_decimal}"
-                                else:
-                                    valor_processado = valor_processado.replace('.', '')
-                                
-                                valor_processado = float(valor_processado)
-                                
-                            except ValueError:
-                                valor_processado = valor_processado.strip()
-                    
-                    else:
-                        # Para outras colunas, só remove espaços
-                        valor_processado = valor_processado.strip()
-                    
-                    # Atualiza o valor se houve mudança
-                    if str(valor_original) != str(valor_processado):
-                        data[i][j] = valor_processado
-                        linha_alterada = True
-                        
-                        coluna_letra = indice_para_coluna_letra(j)
-                        print(f"Linha {i+3}, Coluna {coluna_letra}: '{valor_original}' -> '{valor_processado}'")
-            
-            # Preenche CEP na coluna AV se temos uma cidade identificada
-            if cidade_linha:
-                cep = mapeamento_ceps.get(cidade_linha, '')
+                    registrar(i + 3, letras[j], regras[j] + '+edit/add' if marcado else regras[j],
+                              valor_original, valor_processado)
+
+            # Preenche CEP na coluna AV se temos uma unidade identificada
+            if unidade_linha:
+                cep = unidade_linha.cep
                 if cep:
                     # Expande a linha se necessário para incluir a coluna AV
-                    while len(data[i]) <= indice_av:
-                        data[i].append(None)
-                    
-                    data[i][indice_av] = cep  # ✅ Agora funciona sempre
-            
+                    while len(row) <= INDICE_AV:
+                        row.append(None)
+
+                    row[INDICE_AV] = cep
+                    relatorio.contar(letras[INDICE_AV], 'cep')
+
             if linha_alterada:
                 linhas_alteradas += 1
-        
+
+        relatorio.descarregar()
         print(f"✅ Limpeza concluída. {linhas_alteradas} linhas foram alteradas.")
-        
+
     except Exception as e:
         print(f"❌ Erro ao limpar dados: {e}")
-    
+
+    finally:
+        if fechar_relatorio:
+            relatorio.fechar()
+
     return data
 
+def substitui_none(data):
+    """Troca células None por '' (a API do Sheets não aceita None)"""
+    return [['' if cell is None else cell for cell in row] for row in data]
+
+@rastreamento.rastrear('sheets_update', 'sheets')
+def insere_dados_append(worksheet, dados):
+    """
+    Acrescenta as linhas após a tabela existente usando o endpoint values.append.
+    O custo não depende do tamanho da planilha (não há get_all_values nem varredura).
+
+    Retorna:
+    - (range_utilizado, linha_inicio): ex. ('A120:AV128', 120)
+    """
+    resposta = worksheet.append_rows(
+        dados,
+        value_input_option='USER_ENTERED',
+        insert_data_option='OVERWRITE',
+        table_range='A1'
+    )
+    
+    # updatedRange vem no formato "'Aba'!A120:AV128"
+    range_atualizado = resposta['updates']['updatedRange'].split('!')[-1]
+    linha_inicio = leitor_xlsx.separa_referencia(range_atualizado.split(':')[0])[1]
+    return range_atualizado, linha_inicio
+
+@rastreamento.rastrear('envio_sheets', 'sheets')
 def paste_to_google_sheets_com_formatacao_completa(google_sheets_url, data, credentials_file):
     """
     Versão completa que cola dados E aplica todas as formatações
     """
     try:
-        from google.oauth2.service_account import Credentials
-        
         print("🔧 Configurando acesso ao Google Sheets...")
         
-        # Configura as credenciais
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        credentials = Credentials.from_service_account_file(credentials_file, scopes=scopes)
-        client = gspread.authorize(credentials)
-        
         # Extrai o ID da planilha
-        if '/d/' in google_sheets_url:
-            spreadsheet_id = google_sheets_url.split('/d/')[1].split('/')[0]
-            print(f"📋 ID da planilha extraído: {spreadsheet_id}")
-        else:
-            raise ValueError("URL do Google Sheets inválida")
+        spreadsheet_id = extrair_id_planilha(google_sheets_url)
+        print(f"📋 ID da planilha extraído: {spreadsheet_id}")
         
-        # Abre a planilha
+        # Abre a planilha (cliente e metadados reaproveitados entre chamadas)
         print("📂 Abrindo planilha do Google Sheets...")
-        spreadsheet = client.open_by_key(spreadsheet_id)
-        worksheet = spreadsheet.get_worksheet(0)
+        spreadsheet, worksheet = obter_planilha_google(credentials_file, spreadsheet_id)
         
         print(f"📊 Planilha acessada: {spreadsheet.title}")
         print(f"📄 Aba selecionada: {worksheet.title}")
         
-        # Encontra a primeira linha vazia
-        print("🔍 Procurando primeira linha vazia...")
-        all_values = worksheet.get_all_values()
-        
-        next_row = 1
-        if all_values:
-            for i, row in enumerate(all_values):
-                if not any(cell.strip() for cell in row if cell):
-                    next_row = i + 1
-                    break
-            else:
-                next_row = len(all_values) + 1
-        
-        print(f"📍 Inserindo dados a partir da linha {next_row}")
-        
         # Prepara os dados
         if not data or not data[0]:
             raise ValueError("Nenhum dado para inserir")
@@ -1030,35 +1175,15 @@ def paste_to_google_sheets_com_formatacao_completa(google_sheets_url, data, cred
         num_rows = len(data)
         num_cols = len(data[0])
         
-        def num_to_col_letters(num):
-            letters = ''
-            while num:
-                mod = (num - 1) % 26
-                letters = chr(mod + 65) + letters
-                num = (num - 1) // 26
-            return letters
-        
-        start_col = 'A'
-        end_col = num_to_col_letters(num_cols)
-        end_row = next_row + num_rows - 1
-        
-        range_name = f'{start_col}{next_row}:{end_col}{end_row}'
-        print(f"📐 Range de inserção: {range_name}")
-        
         # Limpa dados None
-        cleaned_data = []
-        for row in data:
-            cleaned_row = []
-            for cell in row:
-                if cell is None:
-                    cleaned_row.append('')
-                else:
-                    cleaned_row.append(cell)
-            cleaned_data.append(cleaned_row)
+        cleaned_data = substitui_none(data)
         
-        # Insere os dados na planilha
+        # Insere os dados logo após a última linha preenchida (endpoint append do Sheets)
+        # O próprio servidor encontra a próxima linha, sem baixar o histórico da planilha
         print("💾 Inserindo dados na planilha...")
-        worksheet.update(range_name, cleaned_data, value_input_option='USER_ENTERED')
+        range_name, next_row = insere_dados_append(worksheet, cleaned_data)
+        
+        print(f"📍 Dados inseridos a partir da linha {next_row}")
         
         print("🎨 Aplicando formatações completas...")
         # Aplica todas as formatações após inserir os dados
@@ -1079,6 +1204,7 @@ def abreExcel_copiaDados_formato_completo(file_path):
     Função integrada que aplica limpeza completa e prepara para Google Sheets
     """
     try:
+        import win32com.client
         
         excel_app = win32com.client.Dispatch("Excel.Application")
         excel_app.Visible = True
@@ -1134,9 +1260,58 @@ def abreExcel_copiaDados_formato_completo(file_path):
             pass
         raise
 
-def copiandoDados_excelToGs(link_gs, path_cred):
+def leXlsx_copiaDados_formato_completo(file_path):
+    """
+    Mesma extração de abreExcel_copiaDados_formato_completo, mas lendo o .xlsx direto
+    (zip + XML em streaming), sem abrir o Excel nem fazer uma chamada COM por célula
+    """
+    try:
+        print(f"📂 Lendo o arquivo sem Excel: {file_path}")
+        with rastreamento.span('leitura_xlsx', 'dados', arquivo=os.path.basename(file_path)):
+            data = leitor_xlsx.le_dados_xlsx(file_path, linha_inicial=3)
+
+        num_colunas = len(data[0]) if data else 0
+        print(f"📐 Linhas lidas: {len(data)} | Colunas: {num_colunas}")
+
+        # Aplicação da limpeza completa
+        print("🧹 Iniciando limpeza completa dos dados...")
+        data = limpar_dados_completo_brasileiro_expandido(data)
+
+        print("📋 Processo de extração concluído")
+        return data
+
+    except Exception as e:
+        print(f"❌ Erro: {str(e)}")
+        raise
+
+def enviaLinhas_paraGs(dados, link_gs, path_cred):
+    """
+    Limpa e envia ao Google Sheets linhas já extraídas do navegador
+    (ex.: click_RU_listarRanking(capturar_json=True)), sem arquivo Excel no meio
+    
+    Lança ValueError (nada é enviado) se alguma linha não tiver exatamente as colunas A..AV
+    """
+    if not dados:
+        print("⚠️ Nenhuma linha para enviar ao Google Sheets")
+        return
+    
+    # Linha com outra largura = colunas fora do lugar: melhor não enviar do que desalinhar a planilha
+    largura = INDICE_AV + 1
+    invalidas = [i for i, linha in enumerate(dados) if len(linha) != largura]
+    if invalidas:
+        raise ValueError(f"{len(invalidas)} linha(s) sem as {largura} colunas do relatório (ex.: linha {invalidas[0]})")
+    
+    print("🧹 Iniciando limpeza completa dos dados...")
+    dados = limpar_dados_completo_brasileiro_expandido(dados)
+    paste_to_google_sheets_com_formatacao_completa(link_gs, dados, path_cred)
+
+def copiandoDados_excelToGs(link_gs, path_cred, caminho_arquivo=None):
     """
     Função principal que executa todo o processo
+    
+    Parâmetros:
+    - caminho_arquivo: caminho exato do relatório baixado (ex.: click_download().aguardar()).
+      Só quando não informado o "Report*.xlsx" mais recente da pasta Downloads é procurado.
     """
     # CONFIGURAÇÕES - MODIFIQUE ESTAS VARIÁVEIS CONFORME NECESSÁRIO
     GOOGLE_SHEETS_URL = link_gs
@@ -1145,25 +1320,18 @@ def copiandoDados_excelToGs(link_gs, path_cred):
     try:
         print("🚀 Iniciando o processo de transferência de dados...")
         
-        # 1 e 2: Encontra o arquivo mais recente com "Report" na pasta Downloads
-        latest_file = encontra_arquivoReport_maisRecente()
+        # 1 e 2: Usa o arquivo informado pelo download; sem ele, procura o mais recente com "Report" na pasta Downloads
+        latest_file = caminho_arquivo or encontra_arquivoReport_maisRecente()
         
-        # 3, 4 e 5: Abre o Excel, seleciona e copia os dados
-        copied_data, excel_app = abreExcel_copiaDados_formato_completo(latest_file)
+        # 3, 4 e 5: Lê o .xlsx (sem Excel/COM) e extrai os dados a partir da linha 3
+        copied_data = leXlsx_copiaDados_formato_completo(latest_file)
         
         # 6 e 7: Acessa o Google Sheets e cola os dados
         paste_to_google_sheets_com_formatacao_completa(GOOGLE_SHEETS_URL, copied_data, CREDENTIALS_FILE)
         
-        # Fecha o Excel após a operação
-        excel_app.Quit()
-        
         print("Processo concluído com sucesso!")
         
     except Exception as e:
+        # Repassa o erro: quem chamou precisa saber que o envio pode ter ficado incompleto
         print(f"Erro durante a execução: {str(e)}")
-        
-        # Tenta fechar o Excel em caso de erro
-        try:
-            excel_app.Quit()
-        except:
-            pass
+        raise
@@ -0,0 +1,162 @@
+import os
+import time
+import calendar
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+import login_cliniCorp as lcc
+import addDados_EXtoGS as exgs
+import downloads
+import extracao_ranking
+import rastreamento
+
+'''
+Backfill de vários períodos em uma única sessão logada.
+
+Para cada intervalo de datas: define o período, clica em "Listar" e obtém o relatório
+(download do Excel ou leitura da tabela/JSON). A limpeza e o envio ao Google Sheets do
+período N rodam em uma thread de fundo enquanto o navegador já trabalha no período N+1.
+A thread é única, então os envios continuam em ordem e nunca concorrem entre si.
+
+Pré-requisito: navegador inicializado, login feito e tela de Ranking de Unidades aberta
+(lcc.click_RankinUnidades()).
+
+O seletor de período é conferido a cada intervalo: se não estiver mais em DATA, o item é
+escolhido de novo, e depois do "Listar" as datas na tela são comparadas com as do
+intervalo (um relatório com o filtro errado vira falha do intervalo, não dado errado).
+'''
+
+
+def intervalos_mensais(ano, meses=range(1, 13)):
+    """Lista de (primeiro dia, último dia) de cada mês do ano. Ex.: intervalos_mensais(2024)"""
+    return [(date(ano, mes, 1), date(ano, mes, calendar.monthrange(ano, mes)[1])) for mes in meses]
+
+
+def obter_relatorio(inicio, fim, modo='download'):
+    """
+    Define o período e obtém o relatório do intervalo (parte feita no navegador)
+
+    Parâmetros:
+    - modo: 'download' (Excel), 'tabela' (lê a tabela da tela) ou 'json' (resposta do Listar)
+
+    Retorna:
+    - caminho do .xlsx (modo 'download') ou lista de linhas (modos 'tabela' e 'json')
+    """
+    if not lcc.definir_intervalo_datas(inicio, fim):
+        raise RuntimeError("não foi possível preencher as datas do período")
+
+    relatorio = lcc.click_RU_listarRanking(extrair_tabela=(modo == 'tabela'), capturar_json=(modo == 'json'))
+
+    # O filtro precisa continuar sendo o do intervalo depois do "Listar"
+    if not lcc.confere_intervalo_datas(inicio, fim):
+        raise RuntimeError(f"período na tela mudou durante a listagem (datas na tela: {lcc.datas_na_tela()})")
+
+    if modo in ('tabela', 'json'):
+        return relatorio
+
+    pendente = lcc.click_download()
+    if not pendente:
+        raise RuntimeError("download não iniciado ou sem acompanhamento (pasta de downloads não configurada)")
+    caminho = pendente.aguardar()
+
+    # Um arquivo por intervalo: o site sempre sugere o mesmo nome
+    _, extensao = os.path.splitext(caminho)
+    destino = downloads.caminho_livre(os.path.join(
+        os.path.dirname(caminho), f"Report_{inicio:%Y-%m-%d}_{fim:%Y-%m-%d}{extensao}"
+    ))
+    os.replace(caminho, destino)
+    return destino
+
+
+def enviar_para_sheets(link_gs, path_cred):
+    """
+    Cria a função de processamento padrão: limpa o relatório e envia ao Google Sheets.
+    Serve tanto para o caminho do .xlsx quanto para a lista de linhas.
+    """
+    def processar(inicio, fim, relatorio):
+        if isinstance(relatorio, str):
+            dados = exgs.leXlsx_copiaDados_formato_completo(relatorio)
+            exgs.paste_to_google_sheets_com_formatacao_completa(link_gs, dados, path_cred)
+        else:
+            exgs.enviaLinhas_paraGs(relatorio, link_gs, path_cred)
+        return relatorio if isinstance(relatorio, str) else len(relatorio)
+    return processar
+
+
+def _processar_medindo(processar, inicio, fim, relatorio):
+    inicio_processamento = time.perf_counter()
+    with rastreamento.span('processamento_periodo', 'backfill', inicio=str(inicio), fim=str(fim)):
+        resultado = processar(inicio, fim, relatorio)
+    return resultado, time.perf_counter() - inicio_processamento
+
+
+def executar_backfill(intervalos, processar=None, modo='download', selecionar_data=True):
+    """
+    Percorre os intervalos de datas na sessão atual, um relatório por intervalo
+
+    Parâmetros:
+    - intervalos: lista de (data_inicio, data_fim) do tipo datetime.date
+    - processar: função (inicio, fim, relatorio) executada em segundo plano para cada
+      relatório (ex.: enviar_para_sheets(link, credenciais)). None = só obtém os relatórios
+    - modo: 'download', 'tabela' ou 'json' (ver obter_relatorio); 'tabela' e 'json' sem o
+      mapeamento de colunas de extracao_ranking lançam ErroMapeamentoRanking antes do primeiro intervalo
+    - selecionar_data: escolhe o item DATA no seletor de período sempre que ele não estiver
+      selecionado (conferido antes de cada intervalo)
+
+    Retorna:
+    - lista de dicionários por intervalo: inicio, fim, relatorio, resultado, erro e tempos
+    """
+    extracao_ranking.conferir_mapeamento(modo)
+    print(f"🗓️ Backfill de {len(intervalos)} período(s) no modo '{modo}'...")
+    inicio_total = time.perf_counter()
+    resultados = []
+    futuros = []
+
+    with ThreadPoolExecutor(max_workers=1) as fila:
+        for posicao, (inicio, fim) in enumerate(intervalos, 1):
+            registro = {'inicio': inicio, 'fim': fim, 'relatorio': None, 'resultado': None,
+                        'erro': None, 'navegador_s': None, 'processamento_s': None}
+            resultados.append(registro)
+            print(f"➡️ [{posicao}/{len(intervalos)}] {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}")
+
+            inicio_navegador = time.perf_counter()
+            try:
+                if selecionar_data and not lcc.periodo_data_selecionado():
+                    if posicao > 1:
+                        print("⚠️ O seletor de período não está mais em DATA - selecionando de novo")
+                    lcc.procura_periodo('Data')
+                registro['relatorio'] = obter_relatorio(inicio, fim, modo)
+            except Exception as e:
+                registro['erro'] = f"{type(e).__name__}: {e}"
+                print(f"❌ Falha ao obter o relatório de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}: {registro['erro']}")
+            registro['navegador_s'] = time.perf_counter() - inicio_navegador
+
+            # O processamento deste período segue em paralelo com o navegador no próximo
+            if registro['relatorio'] is not None and processar is not None:
+                # Os spans da thread de fundo ficam pendurados no span de quem chamou o backfill
+                futuro = fila.submit(rastreamento.executar_no_contexto, rastreamento.contexto_atual(),
+                                     _processar_medindo, processar, inicio, fim, registro['relatorio'])
+                futuros.append((registro, futuro))
+
+        for registro, futuro in futuros:
+            try:
+                registro['resultado'], registro['processamento_s'] = futuro.result()
+            except Exception as e:
+                registro['erro'] = f"{type(e).__name__}: {e}"
+                print(f"❌ Falha ao processar {registro['inicio']:%d/%m/%Y} a {registro['fim']:%d/%m/%Y}: {registro['erro']}")
+
+    resumo_backfill(resultados, time.perf_counter() - inicio_total)
+    return resultados
+
+
+def resumo_backfill(resultados, total_s=None):
+    """Imprime, por intervalo, o status e o tempo de navegador e de processamento"""
+    print("🗓️ === RESUMO DO BACKFILL ===")
+    for registro in resultados:
+        status = '❌' if registro['erro'] else '✅'
+        processamento = f"{registro['processamento_s']:.2f}s" if registro['processamento_s'] is not None else '-'
+        print(f"   {status} {registro['inicio']:%d/%m/%Y} a {registro['fim']:%d/%m/%Y} | "
+              f"navegador {registro['navegador_s']:.2f}s | processamento {processamento}"
+              + (f" | {registro['erro']}" if registro['erro'] else ''))
+    if total_s is not None:
+        falhas = sum(1 for registro in resultados if registro['erro'])
+        print(f"   Total: {total_s:.2f}s para {len(resultados)} período(s), {falhas} com falha")
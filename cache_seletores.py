@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import atexit
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+'''
+Cache persistente dos seletores que funcionaram em cada etapa da navegação.
+
+Cada entrada é indexada por "etapa|página" e guarda qual seletor venceu e quanto tempo
+levou. Na próxima execução o seletor aprendido passa para o início da cascata: todos os
+candidatos continuam sendo avaliados na mesma chamada JS (localizador.localizar_primeiro),
+mas o aprendido tem prioridade quando mais de um estiver presente. Entradas são descartadas automaticamente quando o
+seletor falha (site mudou), quando não está mais na lista de candidatos (código mudou)
+ou quando passam de VALIDADE_DIAS sem serem confirmadas.
+
+O arquivo só é regravado quando uma entrada muda (seletor novo, trocado ou descartado).
+Confirmações do mesmo seletor (acertos, último tempo, data) ficam em memória e são
+gravadas uma vez, no fim do processo.
+'''
+
+CAMINHO_CACHE_SELETORES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_seletores.json')
+
+# Dias sem confirmação até uma entrada ser considerada velha
+VALIDADE_DIAS = 30
+
+_cache = None
+_trava = threading.Lock()
+# Confirmações ainda não gravadas no arquivo (ver salvar_pendentes)
+_pendente = False
+
+
+def chave_pagina(url):
+    """
+    Reduz a URL à parte que identifica a tela (host + caminho + rota do hash),
+    ignorando query string e parâmetros da rota
+    """
+    partes = urlsplit(url or '')
+    rota = partes.fragment.split('?')[0]
+    return f"{partes.netloc}{partes.path}#{rota}" if rota else f"{partes.netloc}{partes.path}"
+
+
+def _carregar():
+    """Lê o arquivo de cache uma vez por processo"""
+    global _cache
+    if _cache is None:
+        try:
+            with open(CAMINHO_CACHE_SELETORES, 'r', encoding='utf-8') as arquivo:
+                _cache = json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _cache = {}
+    return _cache
+
+
+def _salvar():
+    """
+    Grava o cache de forma atômica (arquivo temporário + os.replace). Chamada sempre com
+    _trava: as threads do pool gravam uma de cada vez; o temporário tem o pid para outra
+    execução simultânea não truncá-lo
+    """
+    global _pendente
+    temporario = f"{CAMINHO_CACHE_SELETORES}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(_cache, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, CAMINHO_CACHE_SELETORES)
+    _pendente = False
+
+
+@atexit.register
+def salvar_pendentes():
+    """Grava as confirmações que ficaram só em memória (chamada no fim do processo)"""
+    with _trava:
+        if _pendente and _cache is not None:
+            _salvar()
+
+
+def seletor_aprendido(etapa, url, seletores):
+    """
+    Retorna o seletor que venceu da última vez nesta etapa/página, ou None.
+    Entradas velhas ou cujo seletor saiu da lista de candidatos são invalidadas aqui.
+    """
+    chave = f"{etapa}|{chave_pagina(url)}"
+    with _trava:
+        cache = _carregar()
+        entrada = cache.get(chave)
+        if entrada is None:
+            return None
+
+        velha = time.time() - entrada.get('confirmado_em', 0) > VALIDADE_DIAS * 86400
+        if velha or entrada['seletor'] not in seletores:
+            print(f"🗑️ Cache de seletor invalidado para '{etapa}'")
+            del cache[chave]
+            _salvar()
+            return None
+
+        return entrada['seletor']
+
+
+def registrar_acerto(etapa, url, seletor, duracao):
+    """
+    Guarda (ou confirma) o seletor vencedor e o tempo que levou. Só regrava o arquivo se o
+    seletor da etapa mudou; a confirmação do mesmo seletor é gravada no fim do processo
+    """
+    global _pendente
+    chave = f"{etapa}|{chave_pagina(url)}"
+    with _trava:
+        cache = _carregar()
+        entrada = cache.get(chave)
+        mudou = entrada is None or entrada['seletor'] != seletor
+        if mudou:
+            entrada = {'seletor': seletor, 'acertos': 0}
+        entrada['acertos'] += 1
+        entrada['ultimo_tempo'] = round(duracao, 3)
+        entrada['confirmado_em'] = time.time()
+        entrada['atualizado_em'] = datetime.now().isoformat(timespec='seconds')
+        cache[chave] = entrada
+        if mudou:
+            _salvar()
+        else:
+            _pendente = True
+
+
+def registrar_falha(etapa, url):
+    """O seletor aprendido não funcionou mais: remove a entrada para reaprender"""
+    chave = f"{etapa}|{chave_pagina(url)}"
+    with _trava:
+        cache = _carregar()
+        if cache.pop(chave, None) is not None:
+            print(f"🗑️ Seletor aprendido de '{etapa}' não funcionou mais; entrada removida")
+            _salvar()
@@ -6,6 +6,10 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 import time
 import sys
+import esperas
+import localizador
+import downloads
+import rastreamento
 
 def click_download():
     """
@@ -25,8 +29,8 @@ def click_download():
        - Utiliza 10 seletores diferentes baseados na análise do HTML real
        - Prioriza seletores mais específicos para maior precisão
        - Cada seletor foi criado com base em padrões identificados no DOM da aplicação
-       - Usa WebDriverWait com timeout de 15 segundos para cada tentativa
-       - Implementa fallback automático se um seletor falhar
+       - Envia todos os seletores ao navegador em um único execute_script (localizador.py)
+       - Timeout de 15 segundos vale para a cascata inteira, não para cada seletor
     
     2. ESTRATÉGIA SECUNDÁRIA - Navegação por Elementos Filhos:
        - Localiza primeiro o elemento <span> interno que contém o texto "download"
@@ -67,11 +71,9 @@ def click_download():
        - Compatibilidade com elementos mais simples
     
     SISTEMA DE VERIFICAÇÃO DE SUCESSO:
-    Após o clique, a função verifica múltiplos indicadores de que o download foi iniciado:
-    - Mudanças na URL do navegador
-    - Aparição de elementos de loading/progress
-    - Mensagens relacionadas a download
-    - Novos elementos visíveis na página
+    Antes do clique é criado um downloads.DownloadPendente; depois dele a função espera
+    o evento de início do download do Chrome (verificar_download_iniciado). Se nenhum
+    download começar no prazo, retorna False com o motivo.
     
     TRATAMENTO DE ERROS:
     - Logging detalhado de cada tentativa
@@ -84,8 +86,9 @@ def click_download():
     - Não recebe parâmetros diretos
     
     RETORNO:
-    - True: Download iniciado com sucesso
-    - False: Falha na localização ou clique do botão
+    - downloads.DownloadPendente: download iniciado (pendente.aguardar() devolve o caminho
+      do arquivo concluído); None se a pasta de downloads não foi configurada
+    - False: Falha na localização ou clique do botão, ou download não iniciado no prazo
     
     DEPENDÊNCIAS TÉCNICAS:
     - Selenium WebDriver configurado e ativo
@@ -156,34 +159,25 @@ def click_download():
     ]
     
     # Estratégia 1: Tentar seletores CSS e XPath específicos
-    for i, seletor in enumerate(seletores_botao, 1):
-        print(f"🔍 Tentando seletor {i}: {seletor}")
-        try:
-            if seletor.startswith("//"):
-                # XPath
-                botao_DOWNLOAD = wait.until(EC.element_to_be_clickable((By.XPATH, seletor)))
-            else:
-                # CSS selector
-                botao_DOWNLOAD = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            
-            print(f"✅ Botão de DOWNLOAD encontrado com seletor {i}: {seletor}")
-            break
-            
-        except TimeoutException:
-            print(f"⏳ Seletor {i} não funcionou, tentando próximo...")
-            continue
-        except Exception as e:
-            print(f"⚠️ Erro no seletor {i}: {e}")
-            continue
+    # Todos os seletores vão ao navegador em um único execute_script por tentativa
+    print("🔍 Estratégia 1: - Seletores CSS/XPath específicos (em lote)")
+    botao_DOWNLOAD, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='botão DOWNLOAD', etapa='download')
+    if botao_DOWNLOAD is not None:
+        print(f"✅ Botão de DOWNLOAD encontrado com seletor {indice + 1}: {seletores_botao[indice]}")
+    else:
+        print("⏳ Nenhum seletor específico funcionou, tentando próximas estratégias...")
     
     # Estratégia 2: Busca pelo span com texto "download" e depois o botão pai
     if botao_DOWNLOAD is None:
         print("🔍 Estratégia 2: Buscando pelo span interno e navegando para o botão pai...")
         try:
-            # Encontra o span com o ícone de download
-            span_download = wait.until(EC.presence_of_element_located((
-                By.XPATH, "//span[text()='download' and contains(@class, 'material-symbols-outlined')]"
-            )))
+            # Encontra o span com o ícone de download (a página já teve o timeout da estratégia 1 para renderizar)
+            span_download, _ = localizador.localizar_primeiro(
+                driver, ["//span[text()='download' and contains(@class, 'material-symbols-outlined')]"],
+                timeout=2, clicavel=False, descricao='span download'
+            )
+            if span_download is None:
+                raise TimeoutException("span 'download' não encontrado")
             
             # Navega para o botão pai
             botao_DOWNLOAD = span_download.find_element(By.XPATH, "./..")
@@ -304,7 +298,7 @@ def click_download():
         
         # Move para o elemento antes de clicar
         driver.execute_script("arguments[0].scrollIntoView(true);", botao_DOWNLOAD)
-        time.sleep(1)
+        esperas.esperar_backdrop_sumir(driver, timeout=5)
         
         # Aguarda o elemento estar pronto para clique
         wait.until(EC.element_to_be_clickable(botao_DOWNLOAD))
@@ -312,6 +306,9 @@ def click_download():
         # Estratégia de clique aprimorada
         sucesso_clique = False
         
+        # Marca o ponto dos eventos do CDP antes do clique: o download é o próximo a começar
+        pendente = downloads.preparar(driver)
+        
         # Método 1: Clique com ActionChains (mais preciso)
         try:
             print("🔐 Tentativa 1: Clique com ActionChains...")
@@ -324,6 +321,7 @@ def click_download():
             
             # Método 2: JavaScript click direto
             try:
+                rastreamento.registrar_tentativa()
                 print("🔐 Tentativa 2: Clique JavaScript...")
                 driver.execute_script("arguments[0].click();", botao_DOWNLOAD)
                 sucesso_clique = True
@@ -333,6 +331,7 @@ def click_download():
                 
                 # Método 3: Clique normal do Selenium
                 try:
+                    rastreamento.registrar_tentativa()
                     print("🔐 Tentativa 3: Clique Selenium normal...")
                     botao_DOWNLOAD.click()
                     sucesso_clique = True
@@ -347,144 +346,56 @@ def click_download():
         if not sucesso_clique:
             return False
         
-        # Aguarda processamento
-        print("⏳ Aguardando processamento do download...")
-        time.sleep(3)
-        
-        # Verifica indicadores de sucesso
-        return verificar_download_iniciado()
+        # Confirma pelo evento do navegador que o download realmente começou
+        if not verificar_download_iniciado(pendente):
+            return False
+        return pendente
         
     except Exception as e:
         print(f"❌ Erro geral ao processar clique: {e}")
         return False
 
-def verificar_download_iniciado():
+def verificar_download_iniciado(pendente, prazo_inicio=15):
     """
     FUNÇÃO: VERIFICAÇÃO DE SUCESSO DO DOWNLOAD
     ==========================================
     
     DESCRIÇÃO GERAL:
-    Esta função implementa um sistema inteligente de verificação para determinar se um 
-    download foi iniciado com sucesso após o clique no botão correspondente. Utiliza 
-    múltiplos indicadores e heurísticas para detectar mudanças na página web que 
-    sugerem o início do processo de download.
-    
-    METODOLOGIA DE VERIFICAÇÃO:
-    A função emprega uma abordagem multi-indicador que analisa diferentes aspectos 
-    da página web para detectar sinais de que o download foi iniciado:
-    
-    1. ANÁLISE DE URL:
-       - Monitora mudanças na URL do navegador
-       - Procura pela palavra "download" na URL atual
-       - Útil para sistemas que redirecionam durante o download
-       - Detecta URLs temporárias ou endpoints de download
-    
-    2. DETECÇÃO DE ELEMENTOS DE PROGRESSO:
-       - Busca elementos com classes "loading", "progress", "spinner"
-       - Identifica indicadores visuais de processamento
-       - Monitora componentes de UI que aparecem durante operações assíncronas
-       - Útil para aplicações SPA (Single Page Application)
-    
-    3. ANÁLISE DE MENSAGENS TEXTUAIS:
-       - Procura texto contendo "download", "Download", "baixando"
-       - Detecta mensagens de status ou notificações
-       - Identifica feedback textual para o usuário
-       - Suporte para múltiplos idiomas (português/inglês)
-    
-    4. MONITORAMENTO DE ELEMENTOS DINÂMICOS:
-       - Detecta novos elementos que se tornaram visíveis
-       - Procura por mudanças no DOM após o clique
-       - Identifica elementos com "display: block" que apareceram
-       - Captura modificações dinâmicas na interface
-    
-    LÓGICA DE DECISÃO:
-    A função utiliza uma abordagem de "primeiro indicador positivo":
-    - Executa todos os verificadores sequencialmente
-    - Para na primeira detecção positiva
-    - Assume sucesso se qualquer indicador for detectado
-    - Retorna True mesmo se alguns verificadores falharem
-    
-    TRATAMENTO DE DOWNLOADS SILENCIOSOS:
-    Reconhece que alguns downloads podem ser "silenciosos":
-    - Não geram indicadores visuais óbvios
-    - Iniciam diretamente pelo navegador
-    - Não modificam a interface da aplicação
-    - Para estes casos, assume sucesso se o clique foi executado
-    
-    ROBUSTEZ E TOLERÂNCIA A FALHAS:
-    - Cada verificador é executado independentemente
-    - Falhas individuais não comprometem outros verificadores
-    - Logging detalhado de erros para diagnóstico
-    - Estratégia defensiva: assume sucesso em caso de dúvida
+    Confirma que o download começou de fato, usando o evento downloadWillBegin do Chrome
+    DevTools Protocol em vez de indícios na página. As heuristicas anteriores (URL com
+    "download", spinners, textos e elementos com "display: block") davam positivo em
+    quase qualquer página e a função retornava True mesmo sem nenhum indicador, então o
+    fluxo seguia lendo um arquivo antigo ou esperando às cegas.
+    
+    FUNCIONAMENTO:
+    - O DownloadPendente é criado por downloads.preparar() antes do clique e marca a
+      posição no buffer de eventos do CDP (rede_cdp.py)
+    - Aqui apenas se aguarda, por até 'prazo_inicio' segundos, o evento de início
+    - Sem evento no prazo: falha imediata com motivo claro (registrado em
+      downloads.registro_downloads e exibido por downloads.resumo_downloads())
+    - Bytes recebidos, conclusão e tempos ficam no próprio DownloadPendente; o caminho
+      exato do arquivo sai de pendente.aguardar()
     
     PARÂMETROS:
-    - Utiliza variável global 'driver' (instância do WebDriver)
-    - Não recebe parâmetros diretos
+    - pendente: downloads.DownloadPendente (None se a pasta de downloads não foi configurada)
+    - prazo_inicio: segundos para o download começar depois do clique
     
     RETORNO:
-    - True: Download detectado com sucesso OU assumido como bem-sucedido
-    - True (padrão): Em caso de incerteza, assume sucesso
-    
-    CASOS DE USO:
-    - Validação de downloads automáticos em dashboards
-    - Confirmação de exportação de relatórios
-    - Verificação de downloads de arquivos em lote
-    - Monitoramento de operações assíncronas
-    
-    LIMITAÇÕES:
-    - Pode gerar falsos positivos em páginas com muitos elementos dinâmicos
-    - Dependente da implementação específica da aplicação web
-    - Timeout fixo de verificação pode não ser adequado para todos os cenários
-    - Não verifica se o arquivo foi realmente baixado no sistema de arquivos
-    
-    CONSIDERAÇÕES DE DESEMPENHO:
-    - Execução rápida dos verificadores (sem timeouts longos)
-    - Interrupção precoce ao primeiro sucesso
-    - Mínimo impacto na performance da página
-    - Verificações baseadas em estado atual do DOM
+    - True: o download começou (ou não há como acompanhá-lo, pendente=None)
+    - False: nenhum download começou no prazo
     """
-    global driver
-    
     print("🔍 Verificando se o download foi iniciado...")
     
-    try:
-        # Lista de indicadores de que o download pode ter iniciado
-        indicadores_sucesso = [
-            # Mudança na URL
-            lambda: "download" in driver.current_url.lower(),
-            
-            # Elementos de progresso ou loading
-            lambda: len(driver.find_elements(By.CSS_SELECTOR, "*[class*='loading'], *[class*='progress'], .spinner")) > 0,
-            
-            # Mensagens de download
-            lambda: len(driver.find_elements(By.XPATH, "//*[contains(text(), 'download') or contains(text(), 'Download') or contains(text(), 'baixando')]")) > 0,
-            
-            # Novos elementos apareceram na página
-            lambda: len(driver.find_elements(By.CSS_SELECTOR, "*[style*='display: block']")) > 0,
-        ]
-        
-        sucesso_detectado = False
-        
-        for i, verificador in enumerate(indicadores_sucesso, 1):
-            try:
-                if verificador():
-                    print(f"✅ Indicador de sucesso {i} detectado!")
-                    sucesso_detectado = True
-                    break
-            except Exception as e:
-                print(f"⚠️ Erro no verificador {i}: {e}")
-        
-        if sucesso_detectado:
-            print("🎉 Download aparentemente iniciado com sucesso!")
-            return True
-        else:
-            print("⚠️ Nenhum indicador claro de download detectado")
-            print("💡 Isso não significa necessariamente que falhou - alguns downloads são silenciosos")
-            return True  # Assumimos sucesso se o clique funcionou
-            
-    except Exception as e:
-        print(f"⚠️ Erro na verificação de download: {e}")
-        return True  # Assumimos sucesso se chegou até aqui
+    if pendente is None:
+        print("⚠️ Download sem acompanhamento - não é possível confirmar o início")
+        return True
+    
+    if pendente.aguardar_inicio(prazo_inicio):
+        print("🎉 Download iniciado com sucesso!")
+        return True
+    
+    print(f"❌ {pendente.motivo}")
+    return False
 
 def debug_pagina_download():
     """
@@ -0,0 +1,252 @@
+import os
+import time
+from datetime import datetime
+import rede_cdp
+import rastreamento
+
+'''
+Downloads determinísticos via Chrome DevTools Protocol.
+
+Cada execução usa uma pasta de downloads própria (configurada com setDownloadBehavior)
+e cada clique em "download" gera um DownloadPendente, que resolve para o caminho exato
+do arquivo quando o Chrome informa 'completed' no evento downloadProgress. A espera usa
+rede_cdp.aguardar_eventos, que lê os eventos do CDP na própria thread a cada
+rede_cdp.INTERVALO_COLETA_S. Não há busca por glob na pasta Downloads nem escolha pelo
+arquivo mais recente.
+'''
+
+PASTA_BASE_DOWNLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
+
+METODOS_INICIO = ('Page.downloadWillBegin', 'Browser.downloadWillBegin')
+METODOS_PROGRESSO = ('Page.downloadProgress', 'Browser.downloadProgress')
+
+# Pasta de downloads configurada para cada driver (id(driver) -> caminho)
+_pastas = {}
+
+# Drivers cujos downloads são gravados com o nome do GUID (Browser.setDownloadBehavior com
+# 'allowAndName'); no Page.setDownloadBehavior de reserva o arquivo já sai com o nome final
+_nomeia_por_guid = set()
+
+# Resumo de cada download acompanhado nesta execução (ver resumo_downloads)
+registro_downloads = []
+
+
+def nova_pasta_execucao(sufixo=None):
+    """
+    Cria uma pasta exclusiva para os downloads desta execução
+    (sufixo: separa navegadores da mesma execução, ex.: o nome da sessão no pool)
+    """
+    nome = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    if sufixo:
+        nome = f"{nome}_{sufixo}"
+    pasta = os.path.join(PASTA_BASE_DOWNLOADS, nome)
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def configurar_pasta_downloads(driver, pasta):
+    """
+    Direciona os downloads do driver para 'pasta' e liga os eventos de progresso.
+    Os arquivos são gravados com o GUID do download e renomeados ao concluir.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    try:
+        driver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+            'behavior': 'allowAndName', 'downloadPath': pasta, 'eventsEnabled': True
+        })
+        _nomeia_por_guid.add(id(driver))
+    except Exception:
+        # Versões antigas do Chrome: Page.setDownloadBehavior só aceita deny/allow/default
+        # (o arquivo sai com o nome sugerido). Não é enviado junto com o Browser.* para
+        # não sobrescrever o comportamento (e os eventos por GUID) configurado acima.
+        driver.execute_cdp_cmd('Page.setDownloadBehavior', {'behavior': 'allow', 'downloadPath': pasta})
+        _nomeia_por_guid.discard(id(driver))
+    _pastas[id(driver)] = pasta
+    print(f"📁 Pasta de downloads desta execução: {pasta}")
+
+
+def pasta_downloads(driver):
+    """Pasta configurada para o driver (None se configurar_pasta_downloads não foi chamado)"""
+    return _pastas.get(id(driver))
+
+
+def esquecer_driver(driver):
+    """Remove o registro da pasta do driver (ao encerrar o navegador)"""
+    _pastas.pop(id(driver), None)
+    _nomeia_por_guid.discard(id(driver))
+
+
+def caminho_livre(caminho):
+    """Se o arquivo já existe, acrescenta ' (1)', ' (2)'... antes da extensão (como o Chrome faz)"""
+    base, extensao = os.path.splitext(caminho)
+    numero = 1
+    while os.path.exists(caminho):
+        caminho = f"{base} ({numero}){extensao}"
+        numero += 1
+    return caminho
+
+
+class ErroDownload(Exception):
+    """Download que não começou no prazo, foi cancelado ou não terminou no tempo limite"""
+
+
+class DownloadPendente:
+    """
+    Acompanha um download disparado por um clique. Crie com preparar() ANTES do clique;
+    depois use aguardar_inicio() para saber se o download começou e aguardar() para obter
+    o caminho do arquivo concluído.
+
+    Estados: 'aguardando' -> 'iniciado' -> 'em_andamento' -> 'concluido' | 'falhou'
+    """
+
+    def __init__(self, driver, pasta, cursor):
+        self.driver = driver
+        self.pasta = pasta
+        self.nomeia_por_guid = id(driver) in _nomeia_por_guid
+        self.cursor = cursor
+        self.guid = None
+        self.nome_sugerido = None
+        self.caminho = None
+        self.estado = 'aguardando'
+        self.motivo = None
+        self.bytes_recebidos = 0
+        self.bytes_totais = 0
+        self.t_preparado = time.perf_counter()
+        self.t_inicio = None
+        self.t_fim = None
+
+    def atualizar(self):
+        """Processa os eventos de download recebidos desde a última chamada (sem esperar)"""
+        eventos = rede_cdp.eventos_desde(self.driver, self.cursor)
+        self.cursor += len(eventos)
+        return self._processar(eventos)
+
+    def _esperar_eventos(self, limite):
+        """Espera chegar um evento de download (ou até 'limite', em perf_counter) e o processa"""
+        self.cursor, eventos = rede_cdp.aguardar_eventos(
+            self.driver, self.cursor, METODOS_INICIO + METODOS_PROGRESSO, limite - time.perf_counter()
+        )
+        return self._processar(eventos)
+
+    def _processar(self, eventos):
+        for evento in eventos:
+            metodo, params = evento['method'], evento['params']
+            if metodo in METODOS_INICIO and self.guid is None:
+                self.guid = params['guid']
+                self.nome_sugerido = params.get('suggestedFilename') or self.guid
+                self.estado = 'iniciado'
+                self.t_inicio = time.perf_counter()
+                print(f"⬇️ Download iniciado em {self.t_inicio - self.t_preparado:.2f}s: {self.nome_sugerido}")
+            elif metodo in METODOS_PROGRESSO and params.get('guid') == self.guid:
+                self.bytes_recebidos = params.get('receivedBytes', self.bytes_recebidos)
+                self.bytes_totais = params.get('totalBytes', self.bytes_totais)
+                if params.get('state') == 'completed':
+                    self._finalizar()
+                elif params.get('state') == 'canceled':
+                    self._falhar(f"download cancelado pelo navegador: {self.nome_sugerido}")
+                else:
+                    self.estado = 'em_andamento'
+
+            if self.estado in ('concluido', 'falhou'):
+                break
+
+        return self.estado
+
+    def aguardar_inicio(self, prazo=15):
+        """
+        Espera o evento downloadWillBegin por até 'prazo' segundos.
+        Retorna True se o download começou; False (estado 'falhou', com motivo) se não.
+        """
+        limite = self.t_preparado + prazo
+        self.atualizar()
+        while self.estado == 'aguardando':
+            if time.perf_counter() >= limite:
+                self._falhar(f"nenhum download começou em {prazo}s após o clique")
+                return False
+            self._esperar_eventos(limite)
+        return self.estado != 'falhou'
+
+    @rastreamento.rastrear('download_espera', 'navegador')
+    def aguardar(self, timeout=120, prazo_inicio=15):
+        """
+        Aguarda a conclusão e retorna o caminho final do arquivo.
+        Lança ErroDownload (com o motivo) se o download não começar em 'prazo_inicio'
+        segundos, for cancelado ou não terminar em 'timeout' segundos.
+        """
+        if self.estado == 'concluido':
+            return self.caminho
+        if not self.aguardar_inicio(prazo_inicio):
+            raise ErroDownload(self.motivo)
+
+        limite = time.perf_counter() + timeout
+        while self.estado not in ('concluido', 'falhou'):
+            if time.perf_counter() >= limite:
+                self._falhar(f"download não concluiu em {timeout}s "
+                             f"({self.bytes_recebidos}/{self.bytes_totais or '?'} bytes recebidos)")
+                break
+            self._esperar_eventos(limite)
+
+        if self.estado == 'falhou':
+            raise ErroDownload(self.motivo)
+        return self.caminho
+
+    def resumo(self):
+        """Estado, bytes e tempos (do clique ao início e do início ao fim) do download"""
+        return {
+            'arquivo': self.nome_sugerido,
+            'estado': self.estado,
+            'motivo': self.motivo,
+            'bytes': self.bytes_recebidos,
+            'ate_inicio_s': (self.t_inicio - self.t_preparado) if self.t_inicio else None,
+            'transferencia_s': (self.t_fim - self.t_inicio) if self.t_inicio and self.t_fim else None,
+            'total_s': (self.t_fim - self.t_preparado) if self.t_fim else None,
+        }
+
+    def _finalizar(self):
+        """Renomeia o arquivo gravado com o GUID para o nome sugerido pelo site"""
+        if self.nomeia_por_guid:
+            origem = os.path.join(self.pasta, self.guid)
+            destino = caminho_livre(os.path.join(self.pasta, self.nome_sugerido))
+            if os.path.exists(origem) and origem != destino:
+                os.replace(origem, destino)
+            self.caminho = destino if os.path.exists(destino) else origem
+        else:
+            # Page.setDownloadBehavior 'allow': o Chrome já gravou com o nome sugerido
+            self.caminho = os.path.join(self.pasta, self.nome_sugerido)
+        self.estado = 'concluido'
+        self.t_fim = time.perf_counter()
+        registro_downloads.append(self.resumo())
+        print(f"✅ Download concluído em {self.t_fim - self.t_preparado:.2f}s "
+              f"({self.bytes_recebidos} bytes): {self.caminho}")
+
+    def _falhar(self, motivo):
+        self.estado = 'falhou'
+        self.motivo = motivo
+        self.t_fim = time.perf_counter()
+        registro_downloads.append(self.resumo())
+        print(f"❌ Download falhou: {motivo}")
+
+
+def preparar(driver):
+    """
+    Cria o DownloadPendente do próximo download deste driver (chamar antes do clique)
+    Retorna None se a pasta de downloads não foi configurada.
+    """
+    pasta = pasta_downloads(driver)
+    if pasta is None:
+        print("⚠️ Pasta de downloads não configurada - use inicializar_navegador() com pasta de downloads")
+        return None
+    return DownloadPendente(driver, pasta, rede_cdp.marcar(driver))
+
+
+def resumo_downloads():
+    """Imprime estado, tamanho e tempos de cada download acompanhado nesta execução"""
+    if not registro_downloads:
+        return
+    print("⬇️ === RESUMO DOS DOWNLOADS ===")
+    for registro in registro_downloads:
+        ate_inicio = f"{registro['ate_inicio_s']:.2f}s" if registro['ate_inicio_s'] is not None else '-'
+        transferencia = f"{registro['transferencia_s']:.2f}s" if registro['transferencia_s'] is not None else '-'
+        print(f"   {registro['arquivo'] or '-':<35} {registro['estado']:<10} {registro['bytes']} bytes | "
+              f"início {ate_inicio} | transferência {transferencia}"
+              + (f" | {registro['motivo']}" if registro['motivo'] else ''))
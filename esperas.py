@@ -0,0 +1,160 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import time
+
+'''
+Camada de esperas baseada em sinais reais de prontidão da página, para substituir
+os time.sleep() fixos do fluxo de navegação.
+
+Cada espera tem seu próprio timeout e o tempo que realmente levou fica registrado
+em 'registro_esperas' (use resumo_esperas() no final da execução).
+'''
+
+# Lista de (descrição, segundos, sucesso) de todas as esperas feitas no processo
+registro_esperas = []
+
+# Injeta contadores de requisições XHR/fetch pendentes na página (uma vez por documento)
+JS_MONITOR_REDE = """
+if (!window.__esperasRede) {
+    var estado = {pendentes: 0};
+    window.__esperasRede = estado;
+
+    var enviarOriginal = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        estado.pendentes++;
+        this.addEventListener('loadend', function() { estado.pendentes--; }, {once: true});
+        return enviarOriginal.apply(this, arguments);
+    };
+
+    if (window.fetch) {
+        var fetchOriginal = window.fetch;
+        window.fetch = function() {
+            estado.pendentes++;
+            return fetchOriginal.apply(this, arguments).finally(function() { estado.pendentes--; });
+        };
+    }
+}
+return [document.readyState, window.__esperasRede.pendentes];
+"""
+
+# True enquanto houver backdrop/spinner do Material UI visível na tela
+JS_BACKDROP_VISIVEL = """
+var seletores = '.MuiBackdrop-root:not(.MuiBackdrop-invisible), .MuiCircularProgress-root, .MuiLinearProgress-root';
+var elementos = document.querySelectorAll(seletores);
+for (var i = 0; i < elementos.length; i++) {
+    var estilo = window.getComputedStyle(elementos[i]);
+    if (estilo.display !== 'none' && estilo.visibility !== 'hidden' &&
+        parseFloat(estilo.opacity) > 0 && elementos[i].getClientRects().length > 0) {
+        return true;
+    }
+}
+return false;
+"""
+
+
+def esperar(driver, condicao, descricao, timeout=15, intervalo=0.1, obrigatorio=False):
+    """
+    Aguarda 'condicao' (callable que recebe o driver) e registra quanto tempo levou.
+
+    Retorna o resultado da condição. Em caso de timeout, lança TimeoutException se
+    'obrigatorio' for True; caso contrário avisa e retorna None (como os sleeps antigos,
+    que nunca interrompiam o fluxo).
+    """
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        resultado = WebDriverWait(driver, timeout, poll_frequency=intervalo).until(condicao)
+        sucesso = True
+        return resultado
+    except TimeoutException:
+        print(f"⚠️ Espera '{descricao}' excedeu {timeout}s")
+        if obrigatorio:
+            raise
+        return None
+    finally:
+        duracao = time.perf_counter() - inicio
+        registro_esperas.append((descricao, duracao, sucesso))
+        print(f"⏱️ Espera '{descricao}': {duracao:.2f}s")
+
+
+def instalar_monitor_rede(driver):
+    """
+    Instala o contador de requisições pendentes na página atual.
+    Chame antes de um clique para que as requisições disparadas por ele sejam contadas.
+    """
+    driver.execute_script(JS_MONITOR_REDE)
+
+
+def condicao_rede_ociosa(janela=0.5):
+    """
+    Condição que fica verdadeira quando o documento terminou de carregar e não há
+    XHR/fetch pendente durante 'janela' segundos seguidos
+    """
+    estado = {'ociosa_desde': None}
+
+    def _condicao(driver):
+        situacao, pendentes = driver.execute_script(JS_MONITOR_REDE)
+        agora = time.perf_counter()
+        if situacao != 'complete' or pendentes > 0:
+            estado['ociosa_desde'] = None
+            return False
+        if estado['ociosa_desde'] is None:
+            estado['ociosa_desde'] = agora
+        return agora - estado['ociosa_desde'] >= janela
+
+    return _condicao
+
+
+def esperar_pagina_carregada(driver, timeout=15, descricao='página carregada'):
+    """Aguarda document.readyState == 'complete'"""
+    return esperar(driver,
+                   lambda d: d.execute_script("return document.readyState") == 'complete',
+                   descricao, timeout)
+
+
+def esperar_clicavel(driver, by, seletor, timeout=15, descricao=None):
+    """Aguarda o elemento estar visível e habilitado e o retorna"""
+    return esperar(driver, EC.element_to_be_clickable((by, seletor)),
+                   descricao or f"clicável {seletor}", timeout)
+
+
+def esperar_backdrop_sumir(driver, timeout=10, descricao='backdrop MUI sumir'):
+    """Aguarda não haver backdrop/spinner do Material UI cobrindo a tela"""
+    return esperar(driver, lambda d: not d.execute_script(JS_BACKDROP_VISIVEL),
+                   descricao, timeout)
+
+
+def esperar_rede_ociosa(driver, timeout=15, janela=0.5, descricao='rede ociosa'):
+    """Aguarda a página ficar sem requisições pendentes por 'janela' segundos"""
+    return esperar(driver, condicao_rede_ociosa(janela), descricao, timeout)
+
+
+def esperar_url_mudar(driver, url_anterior, timeout=15, descricao='mudança de URL'):
+    """Aguarda a URL atual ser diferente de 'url_anterior'"""
+    return esperar(driver, EC.url_changes(url_anterior), descricao, timeout)
+
+
+def esperar_servidor(driver, timeout=15, descricao='resposta do servidor'):
+    """
+    Substitui o antigo 'time.sleep(5) # aguardando resposta do servidor':
+    espera a rede ficar ociosa e o backdrop do Material UI sumir
+    """
+    inicio = time.perf_counter()
+    esperar_rede_ociosa(driver, timeout, descricao=f"{descricao} (rede)")
+    restante = max(0.5, timeout - (time.perf_counter() - inicio))
+    esperar_backdrop_sumir(driver, restante, descricao=f"{descricao} (backdrop)")
+
+
+def resumo_esperas():
+    """Imprime uma tabela com o tempo de cada espera registrada"""
+    if not registro_esperas:
+        print("⏱️ Nenhuma espera registrada")
+        return
+
+    print("⏱️ === RESUMO DAS ESPERAS ===")
+    for descricao, duracao, sucesso in registro_esperas:
+        marcador = '✅' if sucesso else '⚠️'
+        print(f"   {marcador} {descricao:<45} {duracao:>7.2f}s")
+    total = sum(duracao for _, duracao, _ in registro_esperas)
+    print(f"   Total em esperas: {total:.2f}s ({len(registro_esperas)} esperas)")
@@ -0,0 +1,275 @@
+import json
+import time
+import rede_cdp
+import rastreamento
+
+'''
+Extração da tabela do Ranking de Unidades direto do navegador, sem passar pelo
+download do Excel. As linhas geradas têm o mesmo formato que o leitor do .xlsx
+entrega (uma lista por unidade, colunas A..AV) e seguem para
+addDados_EXtoGS.limpar_dados_completo_brasileiro_expandido.
+
+Dois caminhos:
+- capturar_ranking_xhr: lê a resposta JSON do "Listar" nos eventos de rede do CDP
+- extrair_ranking_dom: lê a tabela já renderizada (ReactTable) em um único execute_script
+
+Os dois caminhos só devolvem linhas com o mapeamento para as colunas do relatório
+configurado (CAMPOS_RANKING_JSON / CABECALHOS_RANKING_DOM); sem ele lançam
+ErroMapeamentoRanking em vez de mandar colunas fora de ordem para a planilha.
+'''
+
+# Quantidade de colunas do relatório em Excel (A..AV), que é o esquema da limpeza
+TOTAL_COLUNAS_RELATORIO = 48
+
+# Trecho da URL da requisição que alimenta a tabela do "Listar".
+# Com None, a maior lista de registros entre as respostas JSON do clique é usada.
+FILTRO_URL_RANKING = None
+
+# Ordem dos campos do JSON que corresponde às colunas A, B, C... do relatório em Excel.
+# Obrigatório para usar capturar_ranking_xhr: enquanto estiver vazio a captura lança
+# ErroMapeamentoRanking e imprime os campos recebidos, para facilitar o preenchimento.
+CAMPOS_RANKING_JSON = []
+
+
+class ErroMapeamentoRanking(Exception):
+    """Dados do ranking sem mapeamento configurado (ou que não batem com ele) para as colunas do relatório"""
+
+
+def conferir_mapeamento(modo):
+    """
+    Lança ErroMapeamentoRanking se o modo ('tabela' ou 'json') ainda não tem o mapeamento
+    para as colunas do relatório (o modo 'download' lê o Excel e não precisa dele).
+    Chamar antes de um lote, para falhar uma vez em vez de uma vez por ranking.
+    """
+    mapeamentos = {'tabela': ('CABECALHOS_RANKING_DOM', CABECALHOS_RANKING_DOM),
+                   'json': ('CAMPOS_RANKING_JSON', CAMPOS_RANKING_JSON)}
+    if modo in mapeamentos and not mapeamentos[modo][1]:
+        raise ErroMapeamentoRanking(
+            f"modo '{modo}' sem mapeamento para as colunas do relatório: preencha "
+            f"extracao_ranking.{mapeamentos[modo][0]} ou use modo='download'"
+        )
+
+
+def completar_linha(linha):
+    """Completa a linha com None até TOTAL_COLUNAS_RELATORIO (colunas A..AV)"""
+    if len(linha) > TOTAL_COLUNAS_RELATORIO:
+        raise ErroMapeamentoRanking(f"linha com {len(linha)} colunas; o relatório tem {TOTAL_COLUNAS_RELATORIO}")
+    return linha + [None] * (TOTAL_COLUNAS_RELATORIO - len(linha))
+
+
+def valor_para_texto_br(valor):
+    """
+    Converte números do JSON para texto no formato brasileiro (vírgula decimal, sem milhar),
+    que é como a limpeza trata os valores vindos do Excel. Ex.: 1234.5 -> '1234,5'
+    """
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, bool):
+        return str(valor)
+    if isinstance(valor, int):
+        return str(valor)
+    if isinstance(valor, float):
+        texto = f"{valor:.10f}".rstrip('0').rstrip('.')
+        return texto.replace('.', ',')
+    return str(valor)
+
+
+def registros_para_linhas(registros, campos=None):
+    """
+    Transforma a lista de objetos do JSON em lista de listas (uma posição por coluna),
+    cada uma com TOTAL_COLUNAS_RELATORIO colunas
+
+    Lança ErroMapeamentoRanking se a ordem dos campos não estiver configurada ou se algum
+    campo configurado não existir nos registros (resposta errada ou JSON mudou)
+    """
+    if not registros:
+        return []
+
+    campos = campos or CAMPOS_RANKING_JSON
+    if not campos:
+        print(f"ℹ️ Campos do JSON recebidos: {list(registros[0].keys())}")
+        raise ErroMapeamentoRanking("CAMPOS_RANKING_JSON não configurado (ordem dos campos nas colunas A..AV)")
+
+    presentes = set().union(*(registro.keys() for registro in registros))
+    ausentes = [campo for campo in campos if campo not in presentes]
+    if ausentes:
+        print(f"ℹ️ Campos do JSON recebidos: {list(registros[0].keys())}")
+        raise ErroMapeamentoRanking(f"campos configurados ausentes na resposta: {ausentes}")
+
+    return [completar_linha([valor_para_texto_br(registro.get(campo)) for campo in campos]) for registro in registros]
+
+
+@rastreamento.rastrear('captura_xhr', 'navegador')
+def capturar_ranking_xhr(driver, cursor, filtro_url=None):
+    """
+    Lê as respostas JSON recebidas depois do cursor (rede_cdp.marcar antes do clique em
+    "Listar") e devolve as linhas da tabela de ranking
+
+    Retorna:
+    - lista de linhas (vazia se nenhuma resposta com registros foi encontrada)
+    - lança ErroMapeamentoRanking se CAMPOS_RANKING_JSON não estiver configurado
+    """
+    respostas = rede_cdp.respostas_json_desde(driver, cursor, filtro_url or FILTRO_URL_RANKING)
+    print(f"📡 Respostas JSON capturadas após o clique: {len(respostas)}")
+
+    melhor_url, registros = None, []
+    for url, corpo in respostas:
+        candidatos = rede_cdp.maior_lista_de_registros(corpo)
+        if len(candidatos) > len(registros):
+            melhor_url, registros = url, candidatos
+
+    if not registros:
+        print("⚠️ Nenhuma resposta JSON com registros da tabela foi encontrada")
+        return []
+
+    print(f"✅ {len(registros)} registros capturados de: {melhor_url}")
+    return registros_para_linhas(registros)
+
+
+# Cabeçalhos da tabela na tela, na ordem das colunas A, B, C... do relatório em Excel.
+# Com cabeçalho agrupado o nome é "Grupo - Coluna". Obrigatório para usar extrair_ranking_dom:
+# enquanto estiver vazio a extração lança ErroMapeamentoRanking e imprime os cabeçalhos lidos,
+# para facilitar o preenchimento.
+CABECALHOS_RANKING_DOM = []
+
+# Lê a ReactTable inteira dentro da página: cabeçalhos (com grupo), todas as linhas da
+# página atual rolando o corpo da tabela (linhas virtualizadas) e as próximas páginas
+# pelo botão "Próximo" da paginação. Devolve JSON em uma única ida e volta.
+# Linhas repetidas entre leituras da rolagem são reconhecidas pela posição (página + índice
+# da linha), não pelo texto: duas unidades com os mesmos números continuam sendo duas linhas.
+JS_EXTRAIR_TABELA = """
+var callback = arguments[arguments.length - 1];
+var limite = Date.now() + arguments[0];
+var tabela = document.querySelector('.ReactTable');
+if (!tabela) { callback(JSON.stringify({erro: 'tabela não encontrada'})); return; }
+
+function texto(el) { return (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim(); }
+
+function cabecalhos() {
+    var grupos = Array.prototype.slice.call(tabela.querySelectorAll('.rt-thead.-headerGroups .rt-th'));
+    var folhas = tabela.querySelectorAll('.rt-thead.-header .rt-th');
+    var nomes = [];
+    for (var i = 0; i < folhas.length; i++) {
+        var nome = texto(folhas[i]);
+        var r = folhas[i].getBoundingClientRect(), centro = r.left + r.width / 2;
+        for (var g = 0; g < grupos.length; g++) {
+            var rg = grupos[g].getBoundingClientRect();
+            if (centro >= rg.left && centro <= rg.right && texto(grupos[g])) {
+                nome = texto(grupos[g]) + ' - ' + nome;
+                break;
+            }
+        }
+        nomes.push(nome);
+    }
+    return nomes;
+}
+
+var linhas = [], vistas = {};
+function coletar() {
+    var trs = tabela.querySelectorAll('.rt-tbody .rt-tr');
+    for (var i = 0; i < trs.length; i++) {
+        if (trs[i].classList.contains('-padRow')) { continue; }
+        var celulas = Array.prototype.map.call(trs[i].querySelectorAll('.rt-td'), texto);
+        var indice = trs[i].getAttribute('aria-rowindex') || trs[i].getAttribute('data-index') || i;
+        var chave = paginas + ':' + indice;
+        if (!celulas.length || vistas[chave]) { continue; }
+        vistas[chave] = true;
+        linhas.push(celulas);
+    }
+}
+
+function primeiraLinha() {
+    var tr = tabela.querySelector('.rt-tbody .rt-tr');
+    return tr ? texto(tr) : '';
+}
+
+var corpo = tabela.querySelector('.rt-tbody'), paginas = 1;
+function rolar(proximo) {
+    coletar();
+    if (corpo && corpo.scrollTop + corpo.clientHeight < corpo.scrollHeight - 1 && Date.now() < limite) {
+        corpo.scrollTop += Math.max(corpo.clientHeight, 50);
+        setTimeout(function() { rolar(proximo); }, 50);
+    } else {
+        proximo();
+    }
+}
+
+function paginar() {
+    var botao = tabela.querySelector('.-pagination .-next button');
+    if (!botao || botao.disabled || Date.now() >= limite) {
+        callback(JSON.stringify({cabecalhos: nomes, linhas: linhas, paginas: paginas}));
+        return;
+    }
+    var anterior = primeiraLinha();
+    botao.click();
+    paginas++;
+    (function aguardar() {
+        if (primeiraLinha() !== anterior || Date.now() >= limite) {
+            if (corpo) { corpo.scrollTop = 0; }
+            rolar(paginar);
+        } else {
+            setTimeout(aguardar, 50);
+        }
+    })();
+}
+
+var nomes = cabecalhos();
+if (corpo) { corpo.scrollTop = 0; }
+rolar(paginar);
+"""
+
+
+@rastreamento.rastrear('extracao_tabela', 'navegador')
+def extrair_tabela_dom(driver, timeout=30):
+    """
+    Lê cabeçalhos e células da tabela de ranking renderizada, em um único execute_async_script
+
+    Retorna:
+    - {'cabecalhos': [...], 'linhas': [[...], ...], 'paginas': n} ou None se a tabela não existir
+    """
+    inicio = time.perf_counter()
+    driver.set_script_timeout(timeout + 5)
+    resultado = json.loads(driver.execute_async_script(JS_EXTRAIR_TABELA, timeout * 1000))
+    if resultado.get('erro'):
+        print(f"⚠️ Extração da tabela: {resultado['erro']}")
+        return None
+    print(f"✅ Tabela lida em {time.perf_counter() - inicio:.2f}s: {len(resultado['linhas'])} linhas, "
+          f"{len(resultado['cabecalhos'])} colunas, {resultado['paginas']} página(s)")
+    return resultado
+
+
+def tabela_para_linhas(cabecalhos, linhas, ordem=None):
+    """
+    Reordena as células pelos nomes de cabeçalho do relatório (CABECALHOS_RANKING_DOM) e
+    completa cada linha até TOTAL_COLUNAS_RELATORIO com None
+
+    Lança ErroMapeamentoRanking se a ordem dos cabeçalhos não estiver configurada ou se
+    algum cabeçalho configurado não estiver na tela (tabela mudou)
+    """
+    ordem = ordem or CABECALHOS_RANKING_DOM
+    if not ordem:
+        print(f"ℹ️ Cabeçalhos lidos da tela: {cabecalhos}")
+        raise ErroMapeamentoRanking("CABECALHOS_RANKING_DOM não configurado (ordem dos cabeçalhos nas colunas A..AV)")
+
+    ausentes = [nome for nome in ordem if nome not in cabecalhos]
+    if ausentes:
+        print(f"ℹ️ Cabeçalhos lidos da tela: {cabecalhos}")
+        raise ErroMapeamentoRanking(f"cabeçalhos configurados ausentes na tela: {ausentes}")
+    posicoes = [cabecalhos.index(nome) for nome in ordem]
+
+    return [completar_linha([linha[p] if p < len(linha) else None for p in posicoes]) for linha in linhas]
+
+
+def extrair_ranking_dom(driver, timeout=30):
+    """
+    Lê a tabela do ranking já listada na tela e devolve as linhas no formato do relatório
+
+    Retorna:
+    - lista de linhas (vazia se a tabela não foi encontrada ou não tem linhas)
+    - lança ErroMapeamentoRanking se CABECALHOS_RANKING_DOM não estiver configurado
+    """
+    tabela = extrair_tabela_dom(driver, timeout)
+    if not tabela or not tabela['linhas']:
+        print("⚠️ Nenhuma linha encontrada na tabela de ranking")
+        return []
+    return tabela_para_linhas(tabela['cabecalhos'], tabela['linhas'])
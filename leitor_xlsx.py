@@ -0,0 +1,183 @@
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+# Namespaces usados pelos arquivos internos de um .xlsx (Office Open XML)
+NS_PLANILHA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL_DOC = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_REL_PACOTE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def coluna_para_indice(referencia):
+    """Converte a parte de letras de uma referência ('AV12' ou 'AV') para índice (A=0, B=1...)"""
+    resultado = 0
+    for char in referencia:
+        if not char.isalpha():
+            break
+        resultado = resultado * 26 + (ord(char.upper()) - ord('A') + 1)
+    return resultado - 1
+
+
+def separa_referencia(referencia):
+    """Separa 'AV12' em (índice da coluna, número da linha) -> (47, 12)"""
+    letras = ''
+    for char in referencia:
+        if char.isalpha():
+            letras += char
+        else:
+            break
+    return coluna_para_indice(letras), int(referencia[len(letras):])
+
+
+def _caminho_primeira_planilha(arquivo_zip):
+    """
+    Descobre o caminho do XML da primeira aba do workbook (normalmente xl/worksheets/sheet1.xml)
+    """
+    padrao = 'xl/worksheets/sheet1.xml'
+    try:
+        workbook = ET.fromstring(arquivo_zip.read('xl/workbook.xml'))
+        primeira_aba = workbook.find(f'{NS_PLANILHA}sheets/{NS_PLANILHA}sheet')
+        if primeira_aba is None:
+            return padrao
+        rel_id = primeira_aba.get(f'{NS_REL_DOC}id')
+
+        relacoes = ET.fromstring(arquivo_zip.read('xl/_rels/workbook.xml.rels'))
+        for relacao in relacoes.iter(f'{NS_REL_PACOTE}Relationship'):
+            if relacao.get('Id') == rel_id:
+                alvo = relacao.get('Target')
+                if alvo.startswith('/'):
+                    return alvo.lstrip('/')
+                return posixpath.normpath(posixpath.join('xl', alvo))
+    except KeyError:
+        pass
+    return padrao
+
+
+def _texto_item(elemento):
+    """Junta os textos de um <si>/<is>, ignorando as anotações fonéticas (<rPh>)"""
+    partes = []
+    for filho in elemento:
+        if filho.tag == f'{NS_PLANILHA}t':
+            partes.append(filho.text or '')
+        elif filho.tag == f'{NS_PLANILHA}r':
+            for t in filho.iter(f'{NS_PLANILHA}t'):
+                partes.append(t.text or '')
+    return ''.join(partes)
+
+
+def carrega_textos_compartilhados(arquivo_zip):
+    """
+    Lê o xl/sharedStrings.xml de forma incremental e retorna a lista de textos
+    """
+    textos = []
+    try:
+        arquivo = arquivo_zip.open('xl/sharedStrings.xml')
+    except KeyError:
+        return textos  # Planilha sem textos compartilhados
+
+    with arquivo:
+        for evento, elemento in ET.iterparse(arquivo, events=('end',)):
+            if elemento.tag == f'{NS_PLANILHA}si':
+                textos.append(_texto_item(elemento))
+                elemento.clear()
+    return textos
+
+
+def _valor_celula(celula, textos):
+    """Converte uma <c> no mesmo tipo de valor que o Excel devolveria via COM (str, float, bool ou None)"""
+    tipo = celula.get('t', 'n')
+
+    if tipo == 'inlineStr':
+        item = celula.find(f'{NS_PLANILHA}is')
+        return _texto_item(item) if item is not None else None
+
+    valor = celula.find(f'{NS_PLANILHA}v')
+    if valor is None or valor.text is None:
+        return None
+    texto = valor.text
+
+    if tipo == 's':
+        return textos[int(texto)]
+    if tipo in ('str', 'e'):
+        return texto
+    if tipo == 'b':
+        return texto == '1'
+    try:
+        return float(texto)
+    except ValueError:
+        return texto
+
+
+def le_linhas_xlsx(caminho_arquivo, linha_inicial=3):
+    """
+    Gera as linhas da primeira aba de um .xlsx a partir de 'linha_inicial', sem Excel/COM.
+
+    O XML da aba é lido de forma incremental (iterparse) e cada linha é descartada
+    logo após ser entregue, então a memória fica constante com o número de linhas.
+    Cada linha é uma lista com uma posição por coluna (None para células vazias).
+    """
+    with zipfile.ZipFile(caminho_arquivo) as arquivo_zip:
+        textos = carrega_textos_compartilhados(arquivo_zip)
+        caminho_aba = _caminho_primeira_planilha(arquivo_zip)
+
+        num_colunas = 0
+        proxima_linha = linha_inicial
+        dados_aba = None
+
+        with arquivo_zip.open(caminho_aba) as arquivo:
+            for evento, elemento in ET.iterparse(arquivo, events=('start', 'end')):
+                if evento == 'start':
+                    if elemento.tag == f'{NS_PLANILHA}sheetData':
+                        dados_aba = elemento
+                    continue
+
+                # <dimension ref="A1:AV11"/> informa a largura usada (equivalente ao UsedRange)
+                if elemento.tag == f'{NS_PLANILHA}dimension':
+                    intervalo = elemento.get('ref', '')
+                    if ':' in intervalo:
+                        num_colunas = coluna_para_indice(intervalo.split(':')[1]) + 1
+
+                elif elemento.tag == f'{NS_PLANILHA}row':
+                    numero_linha = int(elemento.get('r', proxima_linha))
+
+                    if numero_linha >= linha_inicial:
+                        linha = [None] * num_colunas
+                        posicao = 0
+                        for celula in elemento.iter(f'{NS_PLANILHA}c'):
+                            referencia = celula.get('r')
+                            if referencia:
+                                posicao = separa_referencia(referencia)[0]
+                            while len(linha) <= posicao:
+                                linha.append(None)
+                            linha[posicao] = _valor_celula(celula, textos)
+                            posicao += 1
+
+                        # Linhas que não existem no XML (totalmente vazias) viram linhas de None
+                        while proxima_linha < numero_linha:
+                            yield [None] * num_colunas
+                            proxima_linha += 1
+
+                        yield linha
+
+                    proxima_linha = max(proxima_linha, numero_linha + 1)
+
+                    # Descarta a linha já processada para manter a memória estável
+                    elemento.clear()
+                    if dados_aba is not None:
+                        del dados_aba[:]
+
+
+def le_dados_xlsx(caminho_arquivo, linha_inicial=3):
+    """
+    Lê as linhas do relatório (a partir da linha 3) no formato lista de listas,
+    igual ao que era extraído via COM em abreExcel_copiaDados_formato_completo
+    """
+    dados = list(le_linhas_xlsx(caminho_arquivo, linha_inicial))
+
+    # Garante uma matriz retangular (todas as linhas com a mesma quantidade de colunas)
+    largura = max((len(linha) for linha in dados), default=0)
+    for linha in dados:
+        if len(linha) < largura:
+            linha.extend([None] * (largura - len(linha)))
+
+    return dados
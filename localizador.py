@@ -0,0 +1,170 @@
+import time
+import esperas
+import cache_seletores
+
+'''
+Localizador de elementos que envia a lista inteira de seletores candidatos (CSS e XPath)
+ao navegador em um único execute_script e recebe o primeiro elemento válido junto com
+o índice do seletor vencedor.
+
+Antes, cada candidato era testado com um WebDriverWait de 15s próprio, então um seletor
+errado no início da lista custava 15s (N candidatos errados custavam N x 15s). Agora toda
+a lista é avaliada a cada tentativa e o timeout vale para a cascata inteira.
+'''
+
+JS_LOCALIZAR_PRIMEIRO = """
+var candidatos = arguments[0];
+var exigeClicavel = arguments[1];
+
+function clicavel(el) {
+    if (el.disabled) { return false; }
+    if (el.getClientRects().length === 0) { return false; }
+    var estilo = window.getComputedStyle(el);
+    return estilo.visibility !== 'hidden' && estilo.display !== 'none';
+}
+
+for (var i = 0; i < candidatos.length; i++) {
+    var tipo = candidatos[i][0];
+    var expressao = candidatos[i][1];
+    var encontrados = [];
+    try {
+        if (tipo === 'xpath') {
+            var resultado = document.evaluate(expressao, document, null,
+                                              XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var k = 0; k < resultado.snapshotLength; k++) {
+                encontrados.push(resultado.snapshotItem(k));
+            }
+        } else {
+            encontrados = document.querySelectorAll(expressao);
+        }
+    } catch (e) {
+        continue;  // Seletor inválido para este tipo: passa para o próximo
+    }
+    for (var k = 0; k < encontrados.length; k++) {
+        if (encontrados[k].nodeType !== 1) { continue; }
+        if (!exigeClicavel || clicavel(encontrados[k])) {
+            return [encontrados[k], i];
+        }
+    }
+}
+return null;
+"""
+
+
+def seletor_contains_para_xpath(seletor):
+    """
+    Converte a pseudo-sintaxe "tag:contains('texto')" (que não existe em CSS) para o XPath
+    usado no projeto: botão com o texto ou input com o valor
+    """
+    texto = seletor.split(':contains(', 1)[1].rsplit(')', 1)[0].strip().strip('\'"')
+    return f"//button[contains(text(), '{texto}')] | //input[@value='{texto}']"
+
+
+def normaliza_seletor(seletor):
+    """Retorna ('xpath' | 'css', expressão) para um seletor da cascata"""
+    if seletor.startswith('/') or seletor.startswith('('):
+        return ('xpath', seletor)
+    if ':contains(' in seletor:
+        return ('xpath', seletor_contains_para_xpath(seletor))
+    return ('css', seletor)
+
+
+def localizar_primeiro(driver, seletores, timeout=15, clicavel=True, descricao='elemento', etapa=None):
+    """
+    Procura o primeiro elemento que casa com algum dos seletores (na ordem da lista).
+
+    Parâmetros:
+    - seletores: lista de seletores CSS, XPath ou "tag:contains('texto')"
+    - timeout: tempo máximo para a cascata inteira
+    - clicavel: se True exige elemento visível e habilitado; se False basta estar no DOM
+    - etapa: nome da etapa para o cache persistente (cache_seletores.py). Quando informado,
+      o seletor que venceu na última execução vai para o início da cascata (tem prioridade
+      quando mais de um candidato estiver presente). Cada chamada precisa da sua etapa:
+      listas de seletores diferentes com a mesma etapa invalidam o cache uma da outra.
+
+    Retorna:
+    - (elemento, indice_do_seletor) ou (None, None) se nada for encontrado no timeout
+      O índice é sempre relativo à lista 'seletores' recebida.
+    """
+    ordem = list(seletores)
+    aprendido = None
+    url = None
+    if etapa:
+        url = driver.current_url
+        aprendido = cache_seletores.seletor_aprendido(etapa, url, seletores)
+        if aprendido is not None:
+            ordem.remove(aprendido)
+            ordem.insert(0, aprendido)
+            print(f"🧠 Usando primeiro o seletor aprendido para '{etapa}': {aprendido}")
+
+    candidatos = [normaliza_seletor(seletor) for seletor in ordem]
+
+    inicio = time.perf_counter()
+    resultado = esperas.esperar(
+        driver,
+        lambda d: d.execute_script(JS_LOCALIZAR_PRIMEIRO, candidatos, clicavel),
+        f"localizar {descricao}",
+        timeout,
+        intervalo=0.2
+    )
+    duracao = time.perf_counter() - inicio
+
+    if not resultado:
+        if aprendido is not None:
+            cache_seletores.registrar_falha(etapa, url)
+        return None, None
+
+    elemento, posicao = resultado
+    vencedor = ordem[int(posicao)]
+    if etapa:
+        if aprendido is not None and vencedor != aprendido:
+            cache_seletores.registrar_falha(etapa, url)
+        cache_seletores.registrar_acerto(etapa, url, vencedor, duracao)
+
+    return elemento, seletores.index(vencedor)
+
+
+def primeiro_presente(driver, seletores):
+    """
+    Verificação instantânea (sem espera): índice do primeiro seletor presente no DOM, ou None.
+    Substitui laços de find_element que pagavam o implicitly_wait a cada seletor ausente.
+    """
+    candidatos = [normaliza_seletor(seletor) for seletor in seletores]
+    resultado = driver.execute_script(JS_LOCALIZAR_PRIMEIRO, candidatos, False)
+    if not resultado:
+        return None
+    return int(resultado[1])
+
+
+JS_TEXTOS_PRESENTES = """
+var candidatos = arguments[0];
+var textos = [];
+for (var i = 0; i < candidatos.length; i++) {
+    var elemento = null;
+    try {
+        if (candidatos[i][0] === 'xpath') {
+            elemento = document.evaluate(candidatos[i][1], document, null,
+                                         XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else {
+            elemento = document.querySelector(candidatos[i][1]);
+        }
+    } catch (e) {
+        elemento = null;
+    }
+    if (elemento && elemento.nodeType === 1) {
+        textos.push([i, elemento.innerText || elemento.textContent || '']);
+    }
+}
+return textos;
+"""
+
+
+def textos_presentes(driver, seletores):
+    """
+    Verificação instantânea (sem espera) de todos os seletores em uma única chamada.
+
+    Retorna:
+    - lista de (indice_do_seletor, texto do primeiro elemento) dos seletores presentes no DOM
+    """
+    candidatos = [normaliza_seletor(seletor) for seletor in seletores]
+    return [(int(indice), texto) for indice, texto in driver.execute_script(JS_TEXTOS_PRESENTES, candidatos)]
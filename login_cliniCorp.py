@@ -4,24 +4,91 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
 import time
-import sys
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import date
+import esperas
+import localizador
+import persistencia_sessao
+import rede_cdp
+import extracao_ranking
+import downloads
+import rastreamento
+from periodos import get_mes # nomes dos meses (também usados nos rótulos da coluna B)
 
 
 # Variável global para armazenar o driver
 driver = None
 
-def inicializar_navegador():
+class ErroEtapa(Exception):
     """
-    Função para inicializar o navegador Chrome com configurações otimizadas
-    A variável driver fica disponível globalmente para uso em outras funções
+    Falha de uma etapa da automação (elemento não encontrado, login recusado...).
+    Substitui o antigo encerrar_navegador() + sys.exit(1): o navegador continua aberto e
+    quem chamou decide entre tentar a etapa de novo (pipeline.py) ou encerrar.
     """
-    global driver
     
-    print("🚀 Inicializando navegador Chrome...")
+    def __init__(self, etapa, motivo):
+        super().__init__(f"{etapa}: {motivo}")
+        self.etapa = etapa
+        self.motivo = motivo
+
+
+# Métricas do navegador global 'driver' (perfil, tempo de inicialização, carregamentos de página,
+# tempo do último "Listar"). Cada SessaoNavegador tem as suas: workers do pool nunca escrevem aqui
+metricas_navegador = {'perfil': None, 'inicializacao_s': None, 'carregamentos': [], 'ultima_listagem_s': None}
+
+# Recursos bloqueados no perfil "fast": imagens, fontes e rastreadores de terceiros
+URLS_BLOQUEADAS_FAST = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*",
+    "*intercom.io*", "*intercomcdn.com*", "*segment.io*", "*mixpanel.com*", "*sentry.io*",
+]
+
+# Perfis de navegador disponíveis em inicializar_navegador()
+# - interactive: comportamento original (janela visível, maximizada, carrega tudo)
+# - fast: headless (novo modo), viewport fixo, pageLoadStrategy=eager e bloqueio de recursos via CDP
+PERFIS_NAVEGADOR = {
+    'interactive': {
+        'headless': False,
+        'maximizar': True,
+        'page_load_strategy': 'normal',
+        'urls_bloqueadas': [],
+    },
+    'fast': {
+        'headless': True,
+        'maximizar': False,
+        'page_load_strategy': 'eager',
+        'urls_bloqueadas': URLS_BLOQUEADAS_FAST,
+    },
+}
+
+@rastreamento.rastrear('inicializacao_navegador', 'navegador')
+def criar_driver(perfil='interactive', capturar_rede=True, pasta_downloads=None, pasta_perfil=None, metricas=None):
+    """
+    Cria e configura uma instância do Chrome (sem tocar na variável global 'driver')
+    
+    Parâmetros:
+    - perfil, capturar_rede, pasta_downloads: ver inicializar_navegador
+    - pasta_perfil: pasta do perfil do Chrome (--user-data-dir); None usa um perfil temporário
+    - metricas: dicionário onde o perfil e o tempo de inicialização são registrados
+    
+    Retorna:
+    - driver: instância do WebDriver. Lança a exceção original se o Chrome não iniciar.
+    """
+    if perfil not in PERFIS_NAVEGADOR:
+        raise ValueError(f"Perfil de navegador desconhecido: {perfil} (use {list(PERFIS_NAVEGADOR)})")
+    config = PERFIS_NAVEGADOR[perfil]
+    
+    print(f"🚀 Inicializando navegador Chrome (perfil '{perfil}')...")
+    inicio = time.perf_counter()
     
     # Configurações do Chrome para otimizar a automação
     chrome_options = Options()
@@ -34,64 +101,236 @@ def inicializar_navegador():
     # Configura User-Agent para parecer mais com um navegador real
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
     
-    # Para executar em modo headless (sem interface gráfica), descomente a linha abaixo:
-    # chrome_options.add_argument("--headless")
-    
-    try:
-        # Inicializa o driver do Chrome com as opções configuradas
-        # O webdriver.Chrome() cria uma instância do navegador Chrome controlada pelo Selenium
-        driver = webdriver.Chrome(options=chrome_options)
-        
-        # Define um tempo limite padrão para encontrar elementos (10 segundos)
-        # Isso evita que o script trave se um elemento demorar para carregar
-        driver.implicitly_wait(10)
-        
+    if pasta_perfil:
+        # Perfil próprio: cookies e cache não se misturam com outras instâncias
+        chrome_options.add_argument(f"--user-data-dir={pasta_perfil}")
+    
+    # 'eager' devolve o controle no DOMContentLoaded, sem esperar imagens e iframes
+    chrome_options.page_load_strategy = config['page_load_strategy']
+    
+    if capturar_rede:
+        # Eventos do DevTools (Network/Page) ficam disponíveis em driver.get_log('performance')
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': True})
+    
+    if config['headless']:
+        # Novo modo headless do Chrome (mesmo motor do modo com janela)
+        chrome_options.add_argument("--headless=new")
+        # Viewport fixo: sem janela não existe "maximizar"
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+    
+    # Inicializa o driver do Chrome com as opções configuradas
+    # O webdriver.Chrome() cria uma instância do navegador Chrome controlada pelo Selenium
+    novo_driver = webdriver.Chrome(options=chrome_options)
+    # Cada comando enviado ao WebDriver passa a contar nos spans (rastreamento.py)
+    rastreamento.instrumentar_driver(novo_driver)
+    
+    # Define um tempo limite padrão para encontrar elementos (10 segundos)
+    # Isso evita que o script trave se um elemento demorar para carregar
+    novo_driver.implicitly_wait(10)
+    
+    if config['maximizar']:
         # Maximiza a janela do navegador para garantir que todos os elementos sejam visíveis
         # Alguns sites têm comportamentos diferentes em telas menores
-        driver.maximize_window()
-        
-        print("✅ Navegador inicializado com sucesso!")
+        novo_driver.maximize_window()
+    
+    if config['urls_bloqueadas']:
+        # Bloqueia imagens, fontes e rastreadores direto na camada de rede (CDP)
+        novo_driver.execute_cdp_cmd('Network.enable', {})
+        novo_driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': config['urls_bloqueadas']})
+        print(f"🚫 {len(config['urls_bloqueadas'])} padrões de URL bloqueados")
+    
+    # Downloads vão para uma pasta exclusiva e avisam a conclusão por evento do CDP
+    downloads.configurar_pasta_downloads(novo_driver, pasta_downloads or downloads.nova_pasta_execucao())
+    
+    if metricas is not None:
+        metricas['perfil'] = perfil
+        metricas['inicializacao_s'] = time.perf_counter() - inicio
+        metricas['carregamentos'] = []
+    
+    print(f"✅ Navegador inicializado com sucesso em {time.perf_counter() - inicio:.2f}s!")
+    return novo_driver
+
+
+def inicializar_navegador(perfil='interactive', capturar_rede=True, pasta_downloads=None):
+    """
+    Função para inicializar o navegador Chrome com configurações otimizadas
+    A variável driver fica disponível globalmente para uso em outras funções
+    
+    Parâmetros:
+    - perfil: 'interactive' (padrão, janela visível) ou 'fast' (headless, eager e sem
+      imagens/fontes/rastreadores - indicado para servidor Linux sem interface gráfica)
+    - capturar_rede: grava os eventos de rede do CDP (log 'performance'), usados para
+      capturar o JSON do ranking sem baixar o Excel (ver rede_cdp.py)
+    - pasta_downloads: pasta onde o Chrome grava os downloads. Com None é criada uma pasta
+      exclusiva desta execução em downloads/ (ver downloads.py). Requer capturar_rede=True
+      para acompanhar a conclusão dos downloads.
+    """
+    global driver
+    
+    try:
+        driver = criar_driver(perfil, capturar_rede, pasta_downloads, metricas=metricas_navegador)
         
     except Exception as e:
         print(f"❌ Erro ao inicializar navegador: {type(e).__name__}: {e}")
         print("⚠️ Verifique se o ChromeDriver está instalado e configurado corretamente")
-        sys.exit(1)  # Encerra o programa se não conseguir inicializar o navegador
+        raise ErroEtapa('inicializar_navegador', f"{type(e).__name__}: {e}") from e
+
+
+# Sessão de navegador ativa em cada thread (ver SessaoNavegador.ativa)
+_local = threading.local()
+
+
+class SessaoNavegador:
+    """
+    Navegador independente, com perfil do Chrome, pasta de downloads e métricas próprios.
+    
+    As funções de etapa deste módulo (login, click_*, procura_periodo...) usam a sessão
+    ativa na thread atual; sem sessão ativa usam a variável global 'driver'. Assim as
+    mesmas funções rodam em qualquer worker do pool (pool_navegadores.py):
+    
+        sessao = SessaoNavegador(perfil='fast').iniciar()
+        with sessao.ativa():
+            loginCliniCorp_RU(url, usuario, senha)
+            click_RankinUnidades()
+        sessao.encerrar()
+    """
+    
+    def __init__(self, perfil='fast', capturar_rede=True, pasta_downloads=None, nome=None):
+        self.perfil = perfil
+        self.capturar_rede = capturar_rede
+        self.pasta_downloads = pasta_downloads
+        self.nome = nome or f"sessao-{id(self):x}"
+        self.driver = None
+        self.pasta_perfil = None
+        self.metricas = {'perfil': None, 'inicializacao_s': None, 'carregamentos': [], 'ultima_listagem_s': None}
+    
+    def iniciar(self):
+        """Abre o Chrome desta sessão com um perfil temporário exclusivo"""
+        self.pasta_perfil = tempfile.mkdtemp(prefix='perfil_chrome_')
+        pasta_downloads = self.pasta_downloads or downloads.nova_pasta_execucao(self.nome)
+        self.driver = criar_driver(self.perfil, self.capturar_rede, pasta_downloads,
+                                   self.pasta_perfil, self.metricas)
+        return self
+    
+    def encerrar(self):
+        """Fecha o Chrome e apaga o perfil temporário"""
+        if self.driver is not None:
+            rede_cdp.limpar_eventos(self.driver)
+            downloads.esquecer_driver(self.driver)
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"⚠️ Aviso ao encerrar {self.nome}: {e}")
+            self.driver = None
+        if self.pasta_perfil:
+            shutil.rmtree(self.pasta_perfil, ignore_errors=True)
+            self.pasta_perfil = None
+    
+    @contextmanager
+    def ativa(self):
+        """Faz as funções de etapa usarem esta sessão na thread atual"""
+        anterior = getattr(_local, 'sessao', None)
+        _local.sessao = self
+        try:
+            yield self
+        finally:
+            _local.sessao = anterior
+
+
+def sessao_atual():
+    """Sessão ativa na thread atual (None = usa a variável global 'driver')"""
+    return getattr(_local, 'sessao', None)
+
+
+def obter_metricas():
+    """Métricas do navegador em uso: as da sessão ativa ou metricas_navegador"""
+    sessao = sessao_atual()
+    return sessao.metricas if sessao is not None else metricas_navegador
+
+
+def registrar_carregamento_pagina(nome):
+    """
+    Lê o Navigation Timing da página atual e registra o tempo de carregamento nas métricas
+    do navegador em uso (ver obter_metricas)
+    """
+    driver = obter_driver()
+    try:
+        tempos = driver.execute_script("""
+            var nav = performance.getEntriesByType('navigation')[0];
+            if (!nav) { return null; }
+            return [nav.domContentLoadedEventEnd, nav.loadEventEnd, nav.transferSize || 0];
+        """)
+        if not tempos:
+            return None
+        dom_pronto, carregado, bytes_transferidos = tempos
+        registro = {
+            'pagina': nome,
+            'dom_pronto_s': dom_pronto / 1000,
+            'carregado_s': carregado / 1000 if carregado else None,
+            'bytes': bytes_transferidos,
+        }
+        obter_metricas()['carregamentos'].append(registro)
+        carregado_txt = f"{registro['carregado_s']:.2f}s" if registro['carregado_s'] else "em andamento"
+        print(f"⏱️ Página '{nome}': DOM pronto em {registro['dom_pronto_s']:.2f}s, load {carregado_txt}")
+        return registro
+    except Exception as e:
+        print(f"⚠️ Não foi possível medir o carregamento da página '{nome}': {e}")
+        return None
 
 
-def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
+def resumo_navegador():
+    """Imprime o perfil usado, o tempo de inicialização e os carregamentos de página medidos"""
+    metricas = obter_metricas()
+    print(f"🌐 === PERFIL DO NAVEGADOR: {metricas['perfil']} ===")
+    if metricas['inicializacao_s'] is not None:
+        print(f"   Inicialização: {metricas['inicializacao_s']:.2f}s")
+    for registro in metricas['carregamentos']:
+        carregado = f"{registro['carregado_s']:.2f}s" if registro['carregado_s'] else '-'
+        print(f"   {registro['pagina']:<30} DOM {registro['dom_pronto_s']:.2f}s | load {carregado} | {registro['bytes']} bytes")
+
+
+@rastreamento.rastrear('login', 'navegador')
+def loginCliniCorp_RU(url_login, RU_usuario, RU_senha, reutilizar_sessao=True):
     """
     Função para fazer login automatizado no sistema CliniCorp
-    Usa a variável global 'driver' que deve ser inicializada antes
+    Usa o driver da sessão ativa (SessaoNavegador) ou a variável global 'driver', que deve ser inicializada antes
     
     Parâmetros:
     - url_login: string com o link da página de login
     - RU_usuario: string com o nome de usuário ou email
     - RU_senha: string com a senha do usuário
+    - reutilizar_sessao: se True, tenta restaurar a sessão salva (cookies/storage) antes
+      de usar o formulário e salva a sessão após um login bem-sucedido
     
     A função executa o login e deixa o navegador aberto para uso posterior
-    Em caso de erro crítico, encerra o programa
+    Em caso de erro crítico, lança ErroEtapa (o navegador continua aberto para nova tentativa)
     """
-    global driver
+    driver = obter_driver()
     
     # Verifica se o navegador foi inicializado
     if driver is None:
         print("❌ Erro: Navegador não foi inicializado!")
         print("💡 Chame a função inicializar_navegador() antes do login")
-        sys.exit(1)
+        raise ErroEtapa('loginCliniCorp_RU', "Navegador não foi inicializado")
     
     try:
+        # Tenta reaproveitar a sessão da execução anterior antes de preencher o formulário
+        if reutilizar_sessao and persistencia_sessao.restaurar_sessao(driver, RU_usuario, url_login):
+            print("🔄 Navegador permanece aberto para próximas ações...")
+            return
+        
         print(f"🌐 Acessando a página de login: {url_login}")
         # Navega para a URL de login fornecida
         # O get() aguarda a página carregar completamente antes de continuar
         driver.get(url_login)
         
-        # Aguarda 3 segundos para garantir que a página carregou completamente
-        # Alguns elementos JavaScript podem demorar para aparecer
-        time.sleep(3)
-        
-        # Cria um objeto WebDriverWait para aguardar condições específicas
-        # Timeout de 15 segundos para operações que precisam de espera
-        wait = WebDriverWait(driver, 15)
+        # Aguarda o documento terminar de carregar (os campos são aguardados abaixo pelo localizador)
+        esperas.esperar_pagina_carregada(driver, timeout=10, descricao='página de login carregada')
+        registrar_carregamento_pagina('login')
         
         print("🔍 Procurando pelo campo de usuário...")
         # Tenta encontrar o campo de usuário usando diferentes seletores possíveis
@@ -109,22 +348,16 @@ def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
             "input[placeholder*='email']"     # Campo com placeholder contendo "email"
         ]
         
-        # Itera pelos seletores até encontrar um campo válido
-        for seletor in seletores_RU_usuario:
-            try:
-                # Aguarda até 10 segundos pelo elemento aparecer
-                campo_RU_usuario = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, seletor)))
-                print(f"✅ Campo de usuário encontrado com seletor: {seletor}")
-                break  # Sai do loop se encontrou o campo
-            except TimeoutException:
-                continue  # Tenta o próximo seletor se este falhou
+        # Envia todos os seletores ao navegador de uma vez (basta o campo existir no DOM)
+        campo_RU_usuario, indice = localizador.localizar_primeiro(driver, seletores_RU_usuario, timeout=15, clicavel=False, descricao='campo usuário', etapa='login_usuario')
+        if campo_RU_usuario is not None:
+            print(f"✅ Campo de usuário encontrado com seletor: {seletores_RU_usuario[indice]}")
         
         # Verifica se conseguiu encontrar o campo de usuário
         if campo_RU_usuario is None:
             print("❌ Erro crítico: Não foi possível encontrar o campo de usuário")
             print("💡 Verifique se a URL está correta e se a página carregou completamente")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('loginCliniCorp_RU', "Não foi possível encontrar o campo de usuário")
         
         # Limpa qualquer conteúdo existente no campo e digita o usuário
         # clear() remove texto que pode estar pré-preenchido
@@ -147,20 +380,15 @@ def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
             "input[placeholder*='senha']" # Campo com placeholder contendo "senha"
         ]
         
-        # Itera pelos seletores de senha
-        for seletor in seletores_RU_senha:
-            try:
-                campo_RU_senha = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, seletor)))
-                print(f"✅ Campo de senha encontrado com seletor: {seletor}")
-                break
-            except TimeoutException:
-                continue
+        # Envia todos os seletores ao navegador de uma vez (basta o campo existir no DOM)
+        campo_RU_senha, indice = localizador.localizar_primeiro(driver, seletores_RU_senha, timeout=15, clicavel=False, descricao='campo senha', etapa='login_senha')
+        if campo_RU_senha is not None:
+            print(f"✅ Campo de senha encontrado com seletor: {seletores_RU_senha[indice]}")
         
         if campo_RU_senha is None:
             print("❌ Erro crítico: Não foi possível encontrar o campo de senha")
             print("💡 Verifique se a página de login está carregada corretamente")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('loginCliniCorp_RU', "Não foi possível encontrar o campo de senha")
         
         # Insere a senha no campo encontrado
         campo_RU_senha.clear()
@@ -183,38 +411,28 @@ def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
             "form input[type='submit']"  # Qualquer input submit dentro de um form
         ]
         
-        # Tenta encontrar o botão usando cada seletor
-        for seletor in seletores_botao:
-            try:
-                if ":contains(" in seletor:
-                    # Para seletores com :contains, usa XPath que suporta texto
-                    texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                    xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}']"
-                    botao_login = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-                else:
-                    # Para outros seletores, usa CSS selector normal
-                    botao_login = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-                print(f"✅ Botão de login encontrado com seletor: {seletor}")
-                break
-            except TimeoutException:
-                continue
+        # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+        botao_login, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='botão login', etapa='login_botao')
+        if botao_login is not None:
+            print(f"✅ Botão de login encontrado com seletor: {seletores_botao[indice]}")
         
         if botao_login is None:
             print("❌ Erro crítico: Não foi possível encontrar o botão de login")
             print("💡 Verifique se o formulário de login está visível na página")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('loginCliniCorp_RU', "Não foi possível encontrar o botão de login")
         
-        # Aguarda um pouco antes de clicar para garantir que a página está pronta
-        time.sleep(1)
+        # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+        esperas.esperar_backdrop_sumir(driver, timeout=5)
         
         print("🔐 Clicando no botão de login...")
         # Clica no botão de login para submeter o formulário
+        esperas.instalar_monitor_rede(driver)
         botao_login.click()
         
-        # Aguarda alguns segundos para a página processar o login
+        # Aguarda a página processar o login: URL muda e a rede fica ociosa
         print("⏳ Aguardando resposta do servidor...")
-        time.sleep(5)
+        esperas.esperar_url_mudar(driver, url_login, timeout=15, descricao='login (mudança de URL)')
+        esperas.esperar_servidor(driver, timeout=15, descricao='login')
         
         # Verifica se o login foi bem-sucedido analisando a URL atual
         url_atual = driver.current_url
@@ -246,21 +464,22 @@ def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
                     "//*[contains(@class, 'main-content')]"             # Conteúdo principal
                 ]
                 
-                confirmacao_encontrada = False
-                for indicador in indicadores_logado:
-                    try:
-                        elemento = driver.find_element(By.XPATH, indicador)
-                        print(f"✅ Confirmação de login encontrada: {indicador}")
-                        confirmacao_encontrada = True
-                        break
-                    except NoSuchElementException:
-                        continue
+                # Verifica todos os indicadores em uma única chamada (sem pagar o implicitly_wait por ausência)
+                indice = localizador.primeiro_presente(driver, indicadores_logado)
+                confirmacao_encontrada = indice is not None
+                if confirmacao_encontrada:
+                    indicador = indicadores_logado[indice]
+                    print(f"✅ Confirmação de login encontrada: {indicador}")
                 
                 if confirmacao_encontrada:
                     print("🎯 Login confirmado após verificação!")
                 else:
                     print("⚠️ Login aparentemente bem-sucedido (URL mudou), mas sem confirmação visual")
                 
+                # Guarda cookies/storage para as próximas execuções pularem o formulário
+                if reutilizar_sessao:
+                    persistencia_sessao.salvar_sessao(driver, RU_usuario, url_login)
+                
                 print("🔄 Navegador permanece aberto para próximas ações...")
                 
             except Exception as e:
@@ -282,50 +501,56 @@ def loginCliniCorp_RU(url_login, RU_usuario, RU_senha):
                     "//*[contains(@class, 'alert-danger')]"
                 ]
                 
-                erro_encontrado = False
-                for seletor_erro in mensagens_erro:
-                    try:
-                        elemento_erro = driver.find_element(By.XPATH, seletor_erro)
-                        print(f"💥 Mensagem de erro encontrada: {elemento_erro.text}")
-                        erro_encontrado = True
-                    except NoSuchElementException:
-                        continue
+                # Todos os seletores em uma única chamada (sem pagar o implicitly_wait por seletor ausente)
+                erros_encontrados = localizador.textos_presentes(driver, mensagens_erro)
+                for _, texto_erro in erros_encontrados:
+                    print(f"💥 Mensagem de erro encontrada: {texto_erro}")
                 
-                if not erro_encontrado:
+                if not erros_encontrados:
                     print("⚠️ Nenhuma mensagem de erro específica encontrada")
                         
             except Exception as e:
                 print(f"⚠️ Erro ao verificar mensagens de erro: {e}")
             
-            print("🔄 Encerrando programa devido a falha no login...")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('loginCliniCorp_RU', "Login falhou - permanece na página de login ou erro detectado")
+    
+    except ErroEtapa:
+        raise
     
     except Exception as e:
         # Captura qualquer erro não previsto e exibe informações detalhadas
         print(f"❌ Erro crítico durante o processo de login: {type(e).__name__}: {e}")
-        print("🔄 Encerrando programa devido a erro crítico...")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('loginCliniCorp_RU', f"Erro crítico durante o processo de login: {type(e).__name__}: {e}") from e
 
 
 def encerrar_navegador():
     """
     Função para encerrar o navegador de forma segura
     Deve ser chamada no final do programa ou em caso de erro
+    Com uma SessaoNavegador ativa na thread, encerra o navegador dessa sessão
     """
     global driver
     
+    sessao = sessao_atual()
+    if sessao is not None:
+        print(f"🔒 Encerrando navegador da {sessao.nome}...")
+        sessao.encerrar()
+        return
+    
     if driver is not None:
         print("🔒 Encerrando navegador...")
         try:
             # Aguarda 3 segundos antes de fechar para permitir visualização
             time.sleep(3)
+            rede_cdp.limpar_eventos(driver)
+            downloads.esquecer_driver(driver)
             driver.quit()  # Encerra o processo do navegador completamente
-            driver = None  # Limpa a variável global
             print("✅ Navegador encerrado com sucesso!")
         except Exception as e:
             print(f"⚠️ Aviso ao encerrar navegador: {e}")
+        finally:
+            # Mesmo se o quit() falhar (navegador já caído), o driver antigo não deve ser reutilizado
+            driver = None
     else:
         print("⚠️ Navegador já estava encerrado ou não foi inicializado")
 
@@ -336,19 +561,37 @@ def obter_driver():
     Útil para usar o driver em outras partes do código
     
     Retorna:
-    - driver: instância do WebDriver ou None se não inicializado
+    - driver: instância do WebDriver da sessão ativa na thread (SessaoNavegador.ativa) ou,
+      sem sessão ativa, a variável global; None se não inicializado
     """
-    global driver
+    sessao = sessao_atual()
+    if sessao is not None:
+        return sessao.driver
     return driver
 
+def navegador_responde(driver_verificado=None):
+    """
+    Verificação barata (lê o título da página) de que o navegador ainda está vivo
+    
+    Retorna:
+    - True se respondeu; False se não há driver ou se o Chrome/ChromeDriver caiu ou foi fechado
+    """
+    driver_verificado = driver_verificado or obter_driver()
+    if driver_verificado is None:
+        return False
+    try:
+        driver_verificado.title
+        return True
+    except Exception:
+        # WebDriverException (sessão inválida) ou erro de conexão com o ChromeDriver encerrado
+        return False
+
+@rastreamento.rastrear('navegacao_ranking_unidades', 'navegador')
 def click_RankinUnidades():
+    driver = obter_driver()
     
     print("🌐 Acessando a página de Ranking de Unidades.")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print("🔍 Procurando pelo botão 'Ranking de Unidades'...")
     # Procura pelo botão usando vários seletores possíveis
     botao_RU = None
@@ -357,38 +600,27 @@ def click_RankinUnidades():
         "input[id='Ranking de Unidades']"     # input com id Ranking de Unidades
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}']"
-                botao_RU = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                botao_RU = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ Botão de Ranking de Unidades encontrado com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    botao_RU, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='botão Ranking de Unidades', etapa='ranking_unidades')
+    if botao_RU is not None:
+        print(f"✅ Botão de Ranking de Unidades encontrado com seletor: {seletores_botao[indice]}")
     
     if botao_RU is None:
         print("❌ Erro crítico: Não foi possível encontrar o botão de Ranking de Unidades")
         print("💡 Verifique se o formulário de Ranking de Unidades está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('click_RankinUnidades', "Não foi possível encontrar o botão de Ranking de Unidades")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print("🔐 Clicando no botão de Ranking de Unidades...")
     # Clica no botão para submeter o formulário
+    esperas.instalar_monitor_rede(driver)
     botao_RU.click()
     
-    # Aguarda alguns segundos para a página processar
+    # Aguarda a página processar (rede ociosa e sem backdrop)
     print("⏳ Aguardando resposta do servidor...")
-    time.sleep(5)
+    esperas.esperar_servidor(driver, timeout=15, descricao='Ranking de Unidades')
     
     # Procura por elementos que confirmam que o usuário está em RU
     try:
@@ -398,15 +630,12 @@ def click_RankinUnidades():
             "//label[contains(text(), 'Período')]",
         ]
         
-        confirmacao_encontrada = False
-        for indicador in indicadores_logado:
-            try:
-                elemento = driver.find_element(By.XPATH, indicador)
-                print(f"✅ Confirmação de que entrou am Ranking de Unidades encontrada: {indicador}")
-                confirmacao_encontrada = True
-                break
-            except NoSuchElementException:
-                continue
+        # Verifica todos os indicadores em uma única chamada (sem pagar o implicitly_wait por ausência)
+        indice = localizador.primeiro_presente(driver, indicadores_logado)
+        confirmacao_encontrada = indice is not None
+        if confirmacao_encontrada:
+            indicador = indicadores_logado[indice]
+            print(f"✅ Confirmação de que entrou am Ranking de Unidades encontrada: {indicador}")
         
         if confirmacao_encontrada:
             print("🎯 Você está na tela de Ranking de Unidades!")
@@ -421,13 +650,25 @@ def click_RankinUnidades():
     url_atual = driver.current_url
     print(f"🌐 URL atual após entrar em Ranking de Unidades: {url_atual}")
 
-def click_RU_listarRanking():
+@rastreamento.rastrear('listar_ranking', 'navegador')
+def click_RU_listarRanking(capturar_json=False, extrair_tabela=False):
+    """
+    Clica em "Listar" na tela de Ranking de Unidades
     
-    print("🌐 Dentro de Ranking de Unidades - Procurando por 'Listar'.")
+    Parâmetros:
+    - capturar_json: se True, captura via CDP a resposta JSON que alimenta a tabela e
+      retorna as linhas no formato do relatório (dispensa download + Excel). Requer o
+      navegador inicializado com capturar_rede=True.
+    - extrair_tabela: se True, lê a tabela já renderizada na tela (cabeçalhos e células,
+      com rolagem e paginação) em um único execute_script e retorna as linhas no formato
+      do relatório. Não depende do log de rede.
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
+    Retorna:
+    - lista de linhas quando capturar_json=True ou extrair_tabela=True, senão None
+    """
+    driver = obter_driver()
+    
+    print("🌐 Dentro de Ranking de Unidades - Procurando por 'Listar'.")
     
     print("🔍 Procurando pelo botão 'Listar'...")
     # Procura pelo botão usando vários seletores possíveis
@@ -441,38 +682,33 @@ def click_RU_listarRanking():
     
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}']"
-                botao_Listar = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                botao_Listar = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ Botão de Listar encontrado com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    botao_Listar, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='botão Listar', etapa='listar_ranking')
+    if botao_Listar is not None:
+        print(f"✅ Botão de Listar encontrado com seletor: {seletores_botao[indice]}")
     
     if botao_Listar is None:
         print("❌ Erro crítico: Não foi possível encontrar o botão de Listar")
         print("💡 Verifique se o formulário de Listar está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('click_RU_listarRanking', "Não foi possível encontrar o botão de Listar")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print("🔐 Clicando no botão de Listar...")
     # Clica no botão para submeter o formulário
+    esperas.instalar_monitor_rede(driver)
+    if capturar_json:
+        # Marca o ponto a partir do qual as respostas de rede pertencem a este clique
+        cursor_rede = rede_cdp.marcar(driver)
+    inicio_listagem = time.perf_counter()
     botao_Listar.click()
     
-    # Aguarda alguns
+    # Aguarda a listagem (rede ociosa e sem backdrop)
     print("⏳ Aguardando resposta do servidor...")
-    time.sleep(5)
+    esperas.esperar_servidor(driver, timeout=20, descricao='Listar ranking')
+    # Tempo do "Listar" (clique até a rede ociosa) nas métricas do navegador em uso (lote de rankings)
+    obter_metricas()['ultima_listagem_s'] = time.perf_counter() - inicio_listagem
     
     # Procura por elementos que confirmam que o usuário está em RU
     try:
@@ -483,15 +719,12 @@ def click_RU_listarRanking():
         
         ]
         
-        confirmacao_encontrada = False
-        for indicador in indicadores_logado:
-            try:
-                elemento = driver.find_element(By.XPATH, indicador)
-                print(f"✅ Confirmação de que LISTOU o Ranking: {indicador}")
-                confirmacao_encontrada = True
-                break
-            except NoSuchElementException:
-                continue
+        # Verifica todos os indicadores em uma única chamada (sem pagar o implicitly_wait por ausência)
+        indice = localizador.primeiro_presente(driver, indicadores_logado)
+        confirmacao_encontrada = indice is not None
+        if confirmacao_encontrada:
+            indicador = indicadores_logado[indice]
+            print(f"✅ Confirmação de que LISTOU o Ranking: {indicador}")
         
         if confirmacao_encontrada:
             print("🎯 Você está com o Ranking LISTADO!")
@@ -505,16 +738,131 @@ def click_RU_listarRanking():
     # Verifica se o login foi bem-sucedido analisando a URL atual
     url_atual = driver.current_url
     print(f"🌐 URL atual após entrar em Listar: {url_atual}")
+    
+    if capturar_json:
+        print("📡 Capturando os dados do ranking direto da resposta da página...")
+        return extracao_ranking.capturar_ranking_xhr(driver, cursor_rede)
+    
+    if extrair_tabela:
+        print("📋 Lendo a tabela do ranking direto da tela...")
+        return extracao_ranking.extrair_ranking_dom(driver)
+
+# Rankings disponíveis no seletor da tela de Ranking de Unidades
+RANKINGS = ['Vendas', 'Orçamentos', 'Conversão', 'Orçamentos Aprovados', 'Ticket Médio', 'Orçamentos em Aberto', 'Orçamentos em Follow Up', 'Orçamentos Reprovados', 'Atendimentos', 'Faltas', 'Agendamentos Novos Pacientes', 'Agendamento Pacientes Antigos', 'Entradas', 'Saídas']
+
+@rastreamento.rastrear('selecao_ranking', 'navegador')
+def seleciona_ranking(ranking):
+    """
+    Abre o seletor de ranking (o campo que mostra o ranking atual, ex.: 'Vendas') e escolhe 'ranking'
+    
+    Retorna:
+    - True se o ranking foi selecionado, False se o seletor ou o item não foi encontrado
+    """
+    driver = obter_driver()
+    
+    print(f"🔍 Selecionando o ranking '{ranking}'...")
+    
+    # O campo do seletor é o que exibe algum dos rankings conhecidos
+    textos = " or ".join(f"normalize-space(text())='{nome}'" for nome in RANKINGS)
+    valores = " or ".join(f"@data-value='{nome}'" for nome in RANKINGS)
+    seletores_campo = [
+        f"//div[@id='bc_select_field -toggle'][.//*[{textos}]]",
+        f"//div[{valores}]",
+    ]
+    campo, _ = localizador.localizar_primeiro(driver, seletores_campo, timeout=15, descricao='seletor de ranking', etapa='ranking_seletor')
+    if campo is None:
+        print("❌ Não foi possível encontrar o seletor de ranking")
+        return False
+    
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
+    campo.click()
+    
+    seletores_item = [
+        f"div[data-value='{ranking}']",
+        f"//li[normalize-space(.)='{ranking}']",
+        f"//*[@role='option'][normalize-space(.)='{ranking}']",
+    ]
+    item, _ = localizador.localizar_primeiro(driver, seletores_item, timeout=10, descricao=f"item {ranking}", etapa='ranking_item')
+    if item is None:
+        print(f"❌ Não foi possível encontrar o ranking '{ranking}' na lista")
+        return False
+    
+    item.click()
+    print(f"✅ Ranking '{ranking}' selecionado")
+    return True
+
+def listar_rankings_em_lote(rankings=None, modo='download'):
+    """
+    Percorre os rankings na mesma visita à tela de Ranking de Unidades, mantendo o período
+    já selecionado: para cada ranking só troca o seletor, clica em "Listar" e extrai os dados
+    
+    Parâmetros:
+    - rankings: lista de nomes (padrão: todos de RANKINGS)
+    - modo: 'download' (Excel, padrão), 'tabela' (lê a tabela da tela) ou 'json' (resposta
+      do Listar). 'tabela' e 'json' exigem o mapeamento de colunas de extracao_ranking:
+      sem ele o lote lança ErroMapeamentoRanking antes do primeiro ranking
+    
+    Retorna:
+    - (dados, tempos): dados = {ranking: linhas ou caminho do .xlsx}; tempos = {ranking:
+      {'selecao_s', 'servidor_s', 'extracao_s', 'total_s', 'erro'}}
+    """
+    extracao_ranking.conferir_mapeamento(modo)
+    rankings = rankings or RANKINGS
+    print(f"📚 Listando {len(rankings)} ranking(s) no modo '{modo}'...")
+    dados = {}
+    tempos = {}
+    
+    for posicao, ranking in enumerate(rankings, 1):
+        print(f"➡️ [{posicao}/{len(rankings)}] {ranking}")
+        tempo = {'selecao_s': None, 'servidor_s': None, 'extracao_s': None, 'total_s': None, 'erro': None}
+        tempos[ranking] = tempo
+        inicio = time.perf_counter()
+        try:
+            if not seleciona_ranking(ranking):
+                raise RuntimeError(f"ranking '{ranking}' não pôde ser selecionado")
+            tempo['selecao_s'] = time.perf_counter() - inicio
+            
+            inicio_listar = time.perf_counter()
+            obter_metricas()['ultima_listagem_s'] = None
+            if modo == 'download':
+                click_RU_listarRanking()
+                pendente = click_download()
+                if not pendente:
+                    raise RuntimeError("download não iniciado ou sem acompanhamento")
+                dados[ranking] = pendente.aguardar()
+            else:
+                dados[ranking] = click_RU_listarRanking(capturar_json=(modo == 'json'), extrair_tabela=(modo == 'tabela'))
+            tempo['servidor_s'] = obter_metricas()['ultima_listagem_s']
+            if tempo['servidor_s'] is not None:
+                tempo['extracao_s'] = time.perf_counter() - inicio_listar - tempo['servidor_s']
+        except Exception as e:
+            tempo['erro'] = f"{type(e).__name__}: {e}"
+            print(f"❌ Falha no ranking '{ranking}': {tempo['erro']}")
+        tempo['total_s'] = time.perf_counter() - inicio
+    
+    resumo_rankings_em_lote(tempos)
+    return dados, tempos
+
+def resumo_rankings_em_lote(tempos):
+    """Imprime o tempo de cada ranking, do mais lento no servidor para o mais rápido"""
+    def formata(valor):
+        return f"{valor:.2f}s" if valor is not None else '-'
+    
+    print("📚 === TEMPO POR RANKING (mais lento no servidor primeiro) ===")
+    ordem = sorted(tempos, key=lambda nome: tempos[nome]['servidor_s'] or 0, reverse=True)
+    for ranking in ordem:
+        tempo = tempos[ranking]
+        print(f"   {ranking:<32} servidor {formata(tempo['servidor_s'])} | seleção {formata(tempo['selecao_s'])} | "
+              f"extração {formata(tempo['extracao_s'])} | total {formata(tempo['total_s'])}"
+              + (f" | {tempo['erro']}" if tempo['erro'] else ''))
 
 # Será alterada para manipular PERIODO
+@rastreamento.rastrear('selecao_periodo', 'navegador')
 def procura_periodo(priodo_data):
+    driver = obter_driver()
         
     print("🌐 Dentro de Ranking de Unidades - Procurando por 'Período'.")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print("🔍 Procurando pelo seletor 'Período'...")
     # Procura pelo botão usando vários seletores possíveis
     select_rk = None
@@ -529,38 +877,27 @@ def procura_periodo(priodo_data):
         
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ seletor Período encontrado com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='seletor Período', etapa='periodo_seletor')
+    if select_rk is not None:
+        print(f"✅ seletor Período encontrado com seletor: {seletores_botao[indice]}")
     
     if select_rk is None:
         print("❌ Erro crítico: Não foi possível encontrar o seletor Período")
         print("💡 Verifique se o formulário de Período está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('procura_periodo', "Não foi possível encontrar o seletor Período")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print("🔐 Clicando no seletor Período...")
     # Clica no botão para submeter o formulário
+    esperas.instalar_monitor_rede(driver)
     select_rk.click()
     
-    # Aguarda alguns segundos para a página processar
+    # Aguarda o menu abrir (os itens são aguardados em seleciona_periodo)
     print("⏳ Aguardando resposta do servidor para SELECIONAR PERIODO OU DATA...")
-    time.sleep(5)
+    esperas.esperar_servidor(driver, timeout=5, descricao='seletor Período')
     
     # Após achar o seletor de período vai procurar e selecionar qual o periodo
     seleciona_periodo(priodo_data)
@@ -570,6 +907,7 @@ def procura_periodo(priodo_data):
     print(f"🌐 URL atual após entrar em Listar: {url_atual}")
 
 def seleciona_periodo(priodo_data):
+    driver = obter_driver()
     
     if priodo_data == 'Data':
         seleciona_data()
@@ -589,10 +927,6 @@ def seleciona_periodo(priodo_data):
         
         print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo - Procurando por '{priodo_data}'.")
     
-        # Cria um objeto WebDriverWait para aguardar condições específicas
-        # Timeout de 15 segundos para operações que precisam de espera
-        wait = WebDriverWait(driver, 15)
-    
         print(f"🔍 Procurando pelo item '{priodo_data}'...")
     
         # Procura pelo botão usando vários seletores possíveis
@@ -604,43 +938,28 @@ def seleciona_periodo(priodo_data):
             
         ]
         
-        # Tenta encontrar o botão usando cada seletor
-        for seletor in seletores_botao:
-            try:
-                if ":contains(" in seletor:
-                    # Para seletores com :contains, usa XPath que suporta texto
-                    texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                    xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                    select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-                else:
-                    # Para outros seletores, usa CSS selector normal
-                    select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-                print(f"✅ encontrado o item '{priodo_data}' na lista de Periodo com seletor: {seletor}")
-                break
-            except TimeoutException:
-                continue
+        # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+        select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao=f"item {priodo_data}", etapa=f"periodo_{periodo_itens}")
+        if select_rk is not None:
+            print(f"✅ encontrado o item '{priodo_data}' na lista de Periodo com seletor: {seletores_botao[indice]}")
         
         if select_rk is None:
             print(f"❌ Erro crítico: Não foi possível encontrar o item '{priodo_data}'")
             print(f"💡 Verifique se o formulário de '{priodo_data}' está visível na página")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('seleciona_periodo', f"Não foi possível encontrar o item '{priodo_data}'")
         
-        # Aguarda um pouco antes de clicar para garantir que a página está pronta
-        time.sleep(1)
+        # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+        esperas.esperar_backdrop_sumir(driver, timeout=5)
         
         print(f"🔐 Clicando no item '{priodo_data}'...")
         # Clica no botão para submeter o formulário
         select_rk.click()
 
 def seleciona_data():
+    driver = obter_driver()
     
     print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo - Procurando por DATA.")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print(f"🔍 Procurando pelo item DATA...")
     # Procura pelo botão usando vários seletores possíveis
     select_rk = None
@@ -651,30 +970,18 @@ def seleciona_data():
         
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ encontrado o item DATA na lista de Periodo com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='item DATA', etapa='periodo_data')
+    if select_rk is not None:
+        print(f"✅ encontrado o item DATA na lista de Periodo com seletor: {seletores_botao[indice]}")
     
     if select_rk is None:
         print("❌ Erro crítico: Não foi possível encontrar o item DATA")
         print("💡 Verifique se o formulário de DATA está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('seleciona_data', "Não foi possível encontrar o item DATA")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print(f"🔐 Clicando no item DATA...")
     # Clica no botão para submeter o formulário
@@ -682,20 +989,18 @@ def seleciona_data():
 
 # INICIO do trecho
 # Funções para selecionar uma data personalizada
+# (navegação pelo calendário; definir_intervalo_datas escreve as datas direto nos inputs)
 def define_data():
     pass
 
 def clica_ano(desejado, atual = date.today().year):
+    driver = obter_driver()
     
     anoAtual = atual
     anoDesejado = desejado
     
     print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo > DATA - Procurando o botão {anoAtual}.")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print(f"🔍 Procurando pelo botão {anoAtual}...")
     # Procura pelo botão usando vários seletores possíveis
     select_rk = None
@@ -707,30 +1012,18 @@ def clica_ano(desejado, atual = date.today().year):
         
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ encontrado o botão {anoAtual} na lista de Periodo com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao=f"botão {anoAtual}", etapa='ano_atual')
+    if select_rk is not None:
+        print(f"✅ encontrado o botão {anoAtual} na lista de Periodo com seletor: {seletores_botao[indice]}")
     
     if select_rk is None:
         print(f"❌ Erro crítico: Não foi possível encontrar o botão {anoAtual}")
         print(f"💡 Verifique se o botão {anoAtual} está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('clica_ano', f"Não foi possível encontrar o botão {anoAtual}")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print(f"🔐 Clicando no botão {anoAtual}...")
     # Clica no botão para submeter o formulário
@@ -741,10 +1034,6 @@ def clica_ano(desejado, atual = date.today().year):
     else:
         print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo > DATA - Procurando o botão {anoDesejado}.")
     
-        # Cria um objeto WebDriverWait para aguardar condições específicas
-        # Timeout de 15 segundos para operações que precisam de espera
-        wait = WebDriverWait(driver, 15)
-        
         print(f"🔍 Procurando pelo item botão {anoDesejado}...")
         # Procura pelo botão usando vários seletores possíveis
         select_rk = None
@@ -755,30 +1044,18 @@ def clica_ano(desejado, atual = date.today().year):
             
         ]
         
-        # Tenta encontrar o botão usando cada seletor
-        for seletor in seletores_botao:
-            try:
-                if ":contains(" in seletor:
-                    # Para seletores com :contains, usa XPath que suporta texto
-                    texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                    xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                    select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-                else:
-                    # Para outros seletores, usa CSS selector normal
-                    select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-                print(f"✅ encontrado o botão {anoDesejado} na lista de Periodo com seletor: {seletor}")
-                break
-            except TimeoutException:
-                continue
+        # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+        select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao=f"botão {anoDesejado}", etapa='ano_desejado')
+        if select_rk is not None:
+            print(f"✅ encontrado o botão {anoDesejado} na lista de Periodo com seletor: {seletores_botao[indice]}")
         
         if select_rk is None:
             print(f"❌ Erro crítico: Não foi possível encontrar o botão {anoDesejado}")
             print(f"💡 Verifique se o botão {anoDesejado} está visível na página")
-            encerrar_navegador()
-            sys.exit(1)
+            raise ErroEtapa('clica_ano', f"Não foi possível encontrar o botão {anoDesejado}")
         
-        # Aguarda um pouco antes de clicar para garantir que a página está pronta
-        time.sleep(1)
+        # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+        esperas.esperar_backdrop_sumir(driver, timeout=5)
         
         print(f"🔐 Clicando no botão {anoDesejado}...")
         # Clica no botão para submeter o formulário
@@ -811,13 +1088,10 @@ def test2():
     print(global_virhf)
     
 def clica_dataInicio():
+    driver = obter_driver()
     
     print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo > DATA - Procurando por input 'De' (data inicial).")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print(f"🔍 Procurando pelo input 'De' (data inicial)...")
     # Procura pelo botão usando vários seletores possíveis
     select_rk = None
@@ -830,43 +1104,28 @@ def clica_dataInicio():
         
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ encontrado o input 'De' na lista de Periodo com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao="input 'De'", etapa='data_inicio')
+    if select_rk is not None:
+        print(f"✅ encontrado o input 'De' na lista de Periodo com seletor: {seletores_botao[indice]}")
     
     if select_rk is None:
         print("❌ Erro crítico: Não foi possível encontrar o input 'De' (data inicial)")
         print("💡 Verifique se o formulário do input 'De' (data inicial) está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('clica_dataInicio', "Não foi possível encontrar o input 'De' (data inicial)")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print(f"🔐 Clicando no input 'De' (data inicial)...")
     # Clica no botão para submeter o formulário
     select_rk.click()
 
 def clica_dataFim():
+    driver = obter_driver()
     
     print(f"🌐 Dentro de Ranking de Unidades > Seletor de periodo > DATA - Procurando por input 'Até' (data final).")
     
-    # Cria um objeto WebDriverWait para aguardar condições específicas
-    # Timeout de 15 segundos para operações que precisam de espera
-    wait = WebDriverWait(driver, 15)
-    
     print(f"🔍 Procurando pelo input 'Até' (data final)...")
     # Procura pelo botão usando vários seletores possíveis
     select_rk = None
@@ -879,55 +1138,171 @@ def clica_dataFim():
         
     ]
     
-    # Tenta encontrar o botão usando cada seletor
-    for seletor in seletores_botao:
-        try:
-            if ":contains(" in seletor:
-                # Para seletores com :contains, usa XPath que suporta texto
-                texto = seletor.split("'")[1]  # Extrai o texto do seletor
-                xpath = f"//button[contains(text(), '{texto}')] | //input[@value='{texto}'][1]"
-                select_rk = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            else:
-                # Para outros seletores, usa CSS selector normal
-                select_rk = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            print(f"✅ encontrado o input 'Até' na lista de Periodo com seletor: {seletor}")
-            break
-        except TimeoutException:
-            continue
+    # Envia todos os seletores ao navegador de uma vez (uma ida e volta por tentativa)
+    select_rk, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao="input 'Até'", etapa='data_fim')
+    if select_rk is not None:
+        print(f"✅ encontrado o input 'Até' na lista de Periodo com seletor: {seletores_botao[indice]}")
     
     if select_rk is None:
         print("❌ Erro crítico: Não foi possível encontrar o input 'Até' (data final)")
         print("💡 Verifique se o formulário do input 'Até' (data final) está visível na página")
-        encerrar_navegador()
-        sys.exit(1)
+        raise ErroEtapa('clica_dataFim', "Não foi possível encontrar o input 'Até' (data final)")
     
-    # Aguarda um pouco antes de clicar para garantir que a página está pronta
-    time.sleep(1)
+    # Garante que nenhum backdrop/spinner do Material UI está cobrindo o elemento antes do clique
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
     
     print(f"🔐 Clicando no input 'Até' (data final)...")
     # Clica no botão para submeter o formulário
     select_rk.click()
 
 
-def get_mes(numero_mes):
-    meses = ["janeiro", "fevereiro", "março", "abril", "maio", "junho",
-            "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"]
+# Formato aceito pelos inputs 'De' (From) e 'Até' (To) do período personalizado
+FORMATO_DATA_INPUT = '%d/%m/%Y'
+
+# Escreve o valor em inputs controlados pelo React: o setter nativo de HTMLInputElement
+# passa por cima do setter que o React instala no elemento, e os eventos 'input'/'change'
+# (bubbles) chegam ao onChange do componente. Recebe [[seletor_css, valor], ...] e
+# devolve o value de cada input depois dos eventos (null se o input não existir).
+JS_DEFINIR_VALOR_INPUTS = """
+var pares = arguments[0];
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+return pares.map(function(par) {
+    var campo = document.querySelector(par[0]);
+    if (!campo) { return null; }
+    campo.focus();
+    setter.call(campo, par[1]);
+    campo.dispatchEvent(new Event('input', {bubbles: true}));
+    campo.dispatchEvent(new Event('change', {bubbles: true}));
+    campo.blur();
+    return campo.value;
+});
+"""
+
+JS_LER_VALOR_INPUTS = """
+return arguments[0].map(function(seletor) {
+    var campo = document.querySelector(seletor);
+    return campo ? campo.value : null;
+});
+"""
+
+SELETOR_DATA_INICIO = "input[id='From']"
+SELETOR_DATA_FIM = "input[id='To']"
+
+def datas_na_tela():
+    """
+    Valores dos inputs 'De' e 'Até' ('dd/mm/aaaa'), ou None se eles não estiverem na tela
+    (os inputs só existem com o item DATA selecionado no seletor de período)
+    """
+    valores = obter_driver().execute_script(JS_LER_VALOR_INPUTS, [SELETOR_DATA_INICIO, SELETOR_DATA_FIM])
+    return None if None in valores else valores
+
+def periodo_data_selecionado():
+    """True se o item DATA está selecionado no seletor de período (inputs 'De' e 'Até' na tela)"""
+    return datas_na_tela() is not None
+
+def confere_intervalo_datas(inicio, fim):
+    """True se os inputs 'De' e 'Até' mostram exatamente o intervalo (datetime.date) informado"""
+    return datas_na_tela() == [inicio.strftime(FORMATO_DATA_INPUT), fim.strftime(FORMATO_DATA_INPUT)]
+
+def preenche_input_data(seletores, valor, descricao, etapa):
+    """
+    Substitui o conteúdo de um input de data digitando 'valor' (alternativa quando o
+    valor escrito direto no input não é aceito pelo componente)
+    
+    Retorna:
+    - True se o input foi encontrado e preenchido, False se não
+    """
+    driver = obter_driver()
+    campo, _ = localizador.localizar_primeiro(driver, seletores, timeout=15, descricao=descricao, etapa=etapa)
+    if campo is None:
+        print(f"❌ Não foi possível encontrar o {descricao}")
+        return False
+    
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
+    campo.click()
+    campo.send_keys(Keys.CONTROL, 'a')
+    campo.send_keys(valor)
+    campo.send_keys(Keys.TAB)
+    return True
+
+@rastreamento.rastrear('definir_datas', 'navegador')
+def definir_intervalo_datas(inicio, fim):
+    """
+    Preenche o período personalizado (item DATA já selecionado em procura_periodo('Data'))
+    escrevendo as datas direto nos inputs 'De' e 'Até', sem navegar pelo calendário.
+    O custo é o mesmo para qualquer período, perto ou longe de hoje.
+    
+    1. Um único execute_script grava os dois valores com o setter nativo e dispara os
+       eventos que o React escuta
+    2. Confere se o valor controlado permaneceu (o React desfaz valores que o estado não aceitou)
+    3. Se não permaneceu, digita as datas nos inputs (preenche_input_data)
+    
+    Parâmetros:
+    - inicio, fim: datetime.date
+    
+    Retorna:
+    - True se as duas datas ficaram nos inputs, False se não foi possível defini-las
+    """
+    driver = obter_driver()
+    texto_inicio = inicio.strftime(FORMATO_DATA_INPUT)
+    texto_fim = fim.strftime(FORMATO_DATA_INPUT)
+    esperados = [texto_inicio, texto_fim]
+    seletores = [SELETOR_DATA_INICIO, SELETOR_DATA_FIM]
+    print(f"📅 Definindo período: {texto_inicio} até {texto_fim}")
+    
+    # Os inputs só existem depois de escolher DATA no seletor de período
+    campo, _ = localizador.localizar_primeiro(driver, [SELETOR_DATA_INICIO], timeout=15, clicavel=False,
+                                             descricao="input 'De' (data inicial)", etapa='data_inicio_input')
+    if campo is None:
+        print("❌ Não foi possível encontrar o input 'De' (data inicial)")
+        return False
+    esperas.esperar_backdrop_sumir(driver, timeout=5)
+    
+    gravados = driver.execute_script(JS_DEFINIR_VALOR_INPUTS, [[seletores[0], texto_inicio], [seletores[1], texto_fim]])
+    if None in gravados:
+        print(f"❌ Input de data não encontrado (valores lidos: {gravados})")
+        return False
+    
+    # O React pode reverter o valor no próximo render: confere o valor controlado depois dele
+    confirmado = esperas.esperar(
+        driver,
+        lambda d: d.execute_script(JS_LER_VALOR_INPUTS, seletores) == esperados,
+        'datas aceitas pelos inputs', timeout=2
+    )
+    if confirmado:
+        print("✅ Período definido direto nos inputs")
+        return True
+    
+    print(f"⚠️ Os inputs não mantiveram as datas ({driver.execute_script(JS_LER_VALOR_INPUTS, seletores)}) - digitando...")
+    if not preenche_input_data([SELETOR_DATA_INICIO], texto_inicio, "input 'De' (data inicial)", 'data_inicio_input'):
+        return False
+    if not preenche_input_data([SELETOR_DATA_FIM], texto_fim, "input 'Até' (data final)", 'data_fim_input'):
+        return False
+    
+    valores = driver.execute_script(JS_LER_VALOR_INPUTS, seletores)
+    if valores != esperados:
+        print(f"❌ Período não aceito pelos inputs: esperado {esperados}, ficou {valores}")
+        return False
+    print("✅ Período definido digitando nos inputs")
+    return True
 
-    if 1 <= numero_mes <= 12:
-        # O número do mês (1 a 12) é usado como índice (0 a 11)
-        # Retorna o nomes do mês
-        return meses[numero_mes - 1]
-    else:
-        return "Número do mês inválido"
 
 #  FIM do trecho
 
+@rastreamento.rastrear('download_clique', 'navegador')
 def click_download():
     """
     Função corrigida para clicar no botão de download
     Baseada na análise do HTML real fornecido
+    
+    Retorna:
+    - downloads.DownloadPendente se o clique foi feito: use .aguardar() para obter o caminho
+      exato do arquivo quando o Chrome concluir o download
+    - None se o clique foi feito mas o download não pode ser acompanhado (pasta de
+      downloads não configurada em inicializar_navegador)
+    - False se o botão não foi encontrado ou o clique falhou
     """
-    global driver
+    driver = obter_driver()
     
     print("🌐 Dentro de Ranking de Unidades - Procurando por 'DOWNLOAD'.")
     
@@ -976,35 +1351,25 @@ def click_download():
     ]
     
     # Estratégia 1: Tentar seletores CSS e XPath específicos
-    for i, seletor in enumerate(seletores_botao, 1):
-        print("🔍 Estratégia 1: - Seletor CSS Específico")
-        print(f"🔍 Tentando seletor {i}: {seletor}")
-        try:
-            if seletor.startswith("//"):
-                # XPath
-                botao_DOWNLOAD = wait.until(EC.element_to_be_clickable((By.XPATH, seletor)))
-            else:
-                # CSS selector
-                botao_DOWNLOAD = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, seletor)))
-            
-            print(f"✅ Botão de DOWNLOAD encontrado com seletor {i}: {seletor}")
-            break
-            
-        except TimeoutException:
-            print(f"⏳ Seletor {i} não funcionou, tentando próximo...")
-            continue
-        except Exception as e:
-            print(f"⚠️ Erro no seletor {i}: {e}")
-            continue
+    # Todos os seletores vão ao navegador em um único execute_script por tentativa
+    print("🔍 Estratégia 1: - Seletores CSS/XPath específicos (em lote)")
+    botao_DOWNLOAD, indice = localizador.localizar_primeiro(driver, seletores_botao, timeout=15, descricao='botão DOWNLOAD', etapa='download')
+    if botao_DOWNLOAD is not None:
+        print(f"✅ Botão de DOWNLOAD encontrado com seletor {indice + 1}: {seletores_botao[indice]}")
+    else:
+        print("⏳ Nenhum seletor específico funcionou, tentando próximas estratégias...")
     
     # Estratégia 2: Busca pelo span com texto "download" e depois o botão pai
     if botao_DOWNLOAD is None:
         print("🔍 Estratégia 2: Buscando pelo span interno e navegando para o botão pai...")
         try:
-            # Encontra o span com o ícone de download
-            span_download = wait.until(EC.presence_of_element_located((
-                By.XPATH, "//span[text()='download' and contains(@class, 'material-symbols-outlined')]"
-            )))
+            # Encontra o span com o ícone de download (a página já teve o timeout da estratégia 1 para renderizar)
+            span_download, _ = localizador.localizar_primeiro(
+                driver, ["//span[text()='download' and contains(@class, 'material-symbols-outlined')]"],
+                timeout=2, clicavel=False, descricao='span download'
+            )
+            if span_download is None:
+                raise TimeoutException("span 'download' não encontrado")
             
             # Navega para o botão pai
             botao_DOWNLOAD = span_download.find_element(By.XPATH, "./..")
@@ -1125,7 +1490,7 @@ def click_download():
         
         # Move para o elemento antes de clicar
         driver.execute_script("arguments[0].scrollIntoView(true);", botao_DOWNLOAD)
-        time.sleep(1)
+        esperas.esperar_backdrop_sumir(driver, timeout=5)
         
         # Aguarda o elemento estar pronto para clique
         wait.until(EC.element_to_be_clickable(botao_DOWNLOAD))
@@ -1133,6 +1498,9 @@ def click_download():
         # Estratégia de clique aprimorada
         sucesso_clique = False
         
+        # Marca o ponto dos eventos do CDP antes do clique: o download é o próximo a começar
+        pendente = downloads.preparar(driver)
+        
         # Método 1: Clique com ActionChains (mais preciso)
         try:
             print("🔐 Tentativa 1: Clique com ActionChains...")
@@ -1145,6 +1513,7 @@ def click_download():
             
             # Método 2: JavaScript click direto
             try:
+                rastreamento.registrar_tentativa()
                 print("🔐 Tentativa 2: Clique JavaScript...")
                 driver.execute_script("arguments[0].click();", botao_DOWNLOAD)
                 sucesso_clique = True
@@ -1154,6 +1523,7 @@ def click_download():
                 
                 # Método 3: Clique normal do Selenium
                 try:
+                    rastreamento.registrar_tentativa()
                     print("🔐 Tentativa 3: Clique Selenium normal...")
                     botao_DOWNLOAD.click()
                     sucesso_clique = True
@@ -1168,69 +1538,46 @@ def click_download():
         if not sucesso_clique:
             return False
         
-        # Aguarda processamento
-        print("⏳ Aguardando processamento do download...")
-        time.sleep(3)
-        
-        # Verifica indicadores de sucesso
-        return verificar_download_iniciado()
+        # Confirma pelo evento do navegador que o download realmente começou
+        if not verificar_download_iniciado(pendente):
+            return False
+        return pendente
         
     except Exception as e:
         print(f"❌ Erro geral ao processar clique: {e}")
         return False
 
-def verificar_download_iniciado():
-    """
-    Verifica se o download foi iniciado com sucesso
+def verificar_download_iniciado(pendente, prazo_inicio=15):
     """
-    global driver
+    Verifica se o download foi iniciado com sucesso, pelo evento downloadWillBegin do
+    Chrome (não por indícios no DOM)
+    
+    Parâmetros:
+    - pendente: downloads.DownloadPendente criado antes do clique (None se a pasta de
+      downloads não foi configurada em inicializar_navegador)
+    - prazo_inicio: segundos para o download começar depois do clique
     
+    Retorna:
+    - True se o download começou (ou se não há como acompanhar); False com o motivo impresso
+    """
     print("🔍 Verificando se o download foi iniciado...")
     
-    try:
-        # Lista de indicadores de que o download pode ter iniciado
-        indicadores_sucesso = [
-            # Mudança na URL
-            lambda: "download" in driver.current_url.lower(),
-            
-            # Elementos de progresso ou loading
-            lambda: len(driver.find_elements(By.CSS_SELECTOR, "*[class*='loading'], *[class*='progress'], .spinner")) > 0,
-            
-            # Mensagens de download
-            lambda: len(driver.find_elements(By.XPATH, "//*[contains(text(), 'download') or contains(text(), 'Download') or contains(text(), 'baixando')]")) > 0,
-            
-            # Novos elementos apareceram na página
-            lambda: len(driver.find_elements(By.CSS_SELECTOR, "*[style*='display: block']")) > 0,
-        ]
-        
-        sucesso_detectado = False
-        
-        for i, verificador in enumerate(indicadores_sucesso, 1):
-            try:
-                if verificador():
-                    print(f"✅ Indicador de sucesso {i} detectado!")
-                    sucesso_detectado = True
-                    break
-            except Exception as e:
-                print(f"⚠️ Erro no verificador {i}: {e}")
-        
-        if sucesso_detectado:
-            print("🎉 Download aparentemente iniciado com sucesso!")
-            return True
-        else:
-            print("⚠️ Nenhum indicador claro de download detectado")
-            print("💡 Isso não significa necessariamente que falhou - alguns downloads são silenciosos")
-            return True  # Assumimos sucesso se o clique funcionou
-            
-    except Exception as e:
-        print(f"⚠️ Erro na verificação de download: {e}")
-        return True  # Assumimos sucesso se chegou até aqui
+    if pendente is None:
+        print("⚠️ Download sem acompanhamento - não é possível confirmar o início")
+        return True
+    
+    if pendente.aguardar_inicio(prazo_inicio):
+        print("🎉 Download iniciado com sucesso!")
+        return True
+    
+    print(f"❌ {pendente.motivo}")
+    return False
 
 def debug_pagina_download():
     """
     Função auxiliar melhorada para fazer debug da página
     """
-    global driver
+    driver = obter_driver()
     
     print("🐛 === DEBUG COMPLETO DA PÁGINA ===")
     
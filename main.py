@@ -2,6 +2,11 @@ import login_vg as lvg # dados de login
 import login_cliniCorp as lcc # função de login
 import outrasDefs as defs
 import addDados_EXtoGS as exgs
+import esperas # esperas por sinais de prontidão da página
+import downloads # acompanhamento dos downloads (início, bytes, conclusão)
+import sys
+from datetime import datetime
+import rastreamento # tempo, chamadas ao WebDriver/HTTP e tentativas por etapa
 
 # Chamada de função para efetuar o login automático no sistema clinicorp
 # RU = Ranking de Unidades
@@ -11,8 +16,15 @@ RU_usuario = lvg.RU_user
 RU_senha = lvg.RU_pass
 numeroDivisores = 100
 
+# Período do relatório pela linha de comando: python main.py 01/01/2024 31/01/2024
+# Sem datas, segue o fluxo anterior pelo calendário (clica_dataFim + clica_ano(2024))
+if len(sys.argv) not in (1, 3):
+    sys.exit("Uso: python main.py [data_inicio data_fim]  (datas no formato dd/mm/aaaa)")
+intervalo_datas = [datetime.strptime(texto, lcc.FORMATO_DATA_INPUT).date() for texto in sys.argv[1:3]]
+
 # Inicializa o navegador
-lcc.inicializar_navegador()
+# Perfis: 'interactive' (janela visível) ou 'fast' (headless, sem imagens/fontes/rastreadores)
+lcc.inicializar_navegador(perfil='interactive')
 
 print("✅ Chrome inicializado.")
 
@@ -43,15 +55,23 @@ lcc.click_RU_listarRanking()
 
 defs.divisor(numeroDivisores)
 
-rankList = ['Vendas', 'Orçamentos', 'Conversão', 'Orçamentos Aprovados', 'Ticket Médio', 'Orçamentos em Aberto', 'Orçamentos em Follow Up', 'Orçamentos Reprovados', 'Atendimentos', 'Faltas', 'Agendamentos Novos Pacientes', 'Agendamento Pacientes Antigos', 'Entradas', 'Saídas']
+rankList = lcc.RANKINGS # Vendas, Orçamentos, Conversão, ..., Entradas, Saídas
 periodo = ['Mês atual', 'Semana atual', 'Mês anterior', 'Data']
 
 lcc.procura_periodo(periodo[3])
-lcc.clica_dataFim()
-lcc.clica_ano(2024)
+if intervalo_datas:
+    # Datas escritas direto nos inputs 'De'/'Até' (sem navegar pelo calendário)
+    if not lcc.definir_intervalo_datas(*intervalo_datas):
+        raise lcc.ErroEtapa('definir_intervalo_datas', "datas não aceitas pelos inputs")
+else:
+    lcc.clica_dataFim()
+    lcc.clica_ano(2024)
 
 # lcc.debug_pagina_download()
-# lcc.click_download()
+# download = lcc.click_download()  # DownloadPendente; None/False se não há como acompanhar ou o clique falhou
+# if download:
+#     caminho_relatorio = download.aguardar()  # caminho exato do arquivo, na pasta de downloads desta execução
+#                                              # (lança downloads.ErroDownload com o motivo se não começar/concluir)
 
 # Exemplo de como usar o driver para outras ações:
 # driver_atual = obter_driver()
@@ -86,7 +106,52 @@ def colaDados_googleSheets(google_sheets_url, data, credentials_file)
 # Existem alguns outros processos no meio, como: emoção do 'edit' de dados numéricos da coluna C e fechar um popup do excel que alerta sobre a área de transferencia.
 
 '''
-# exgs.copiandoDados_excelToGs(lvg.gs_link,lvg.caminho_credenciais)
+# exgs.copiandoDados_excelToGs(lvg.gs_link,lvg.caminho_credenciais, caminho_relatorio)
+
+# A limpeza mostra só a tabela de alterações por coluna/regra. Para ver célula a célula:
+# import relatorio_alteracoes
+# relatorio = relatorio_alteracoes.RelatorioAlteracoes('arquivo')  # ou 'amostra', 'completo', 'desligado'
+# dados = exgs.limpar_dados_completo_brasileiro_expandido(dados, relatorio=relatorio)
+# relatorio.fechar()
+
+# Alternativa sem Excel: captura o JSON que alimenta a tabela do "Listar" e envia direto
+# (requer extracao_ranking.CAMPOS_RANKING_JSON preenchido com a ordem das colunas A..AV)
+# linhas_ranking = lcc.click_RU_listarRanking(capturar_json=True)
+# exgs.enviaLinhas_paraGs(linhas_ranking, lvg.gs_link, lvg.caminho_credenciais)
+
+# Ou lê a tabela já renderizada na tela (atualização rápida do "Mês atual")
+# (requer extracao_ranking.CABECALHOS_RANKING_DOM preenchido com a ordem das colunas A..AV)
+# linhas_ranking = lcc.click_RU_listarRanking(extrair_tabela=True)
+# exgs.enviaLinhas_paraGs(linhas_ranking, lvg.gs_link, lvg.caminho_credenciais)
+
+# Backfill de vários períodos na mesma sessão (um relatório por mês de 2024); o envio do mês N
+# ao Google Sheets acontece enquanto o navegador já busca o mês N+1
+# import backfill
+# backfill.executar_backfill(backfill.intervalos_mensais(2024),
+#                            processar=backfill.enviar_para_sheets(lvg.gs_link, lvg.caminho_credenciais))
+
+# Relatório de um período com pontos de retomada: se falhar no meio, rodar de novo continua da
+# última etapa concluída (download, limpeza, envio, formatação) - ver pipeline.py
+# import pipeline
+# pipeline.executar_pipeline(date(2024, 1, 1), date(2024, 1, 31), lvg.gs_link, lvg.caminho_credenciais,
+#                            url_login, RU_usuario, RU_senha)
+
+# Todos os rankings de rankList no período já selecionado, em uma única visita à página
+# (modo 'download': um Excel por ranking; 'tabela'/'json' exigem o mapeamento de colunas de extracao_ranking.py)
+# dados_rankings, tempos_rankings = lcc.listar_rankings_em_lote(rankList, modo='download')
+
+# Vários (ranking, período) em paralelo, cada um em um navegador próprio (headless)
+# import pool_navegadores
+# tarefas = [(ranking, 'Mês atual') for ranking in rankList]
+# resultados = pool_navegadores.executar_pool(
+#     tarefas, pool_navegadores.preparar_sessao_ranking(url_login, RU_usuario, RU_senha), n_workers=3)
+
+# Mostra quanto tempo cada espera realmente levou e as métricas do perfil do navegador
+esperas.resumo_esperas()
+lcc.resumo_navegador()
+downloads.resumo_downloads()
+rastreamento.resumo_spans()
+rastreamento.exportar_trace()
 
 # No final do programa, sempre encerre o navegador
 input("Pressione Enter para encerrar o programa...")
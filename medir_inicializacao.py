@@ -0,0 +1,126 @@
+import os
+import ast
+import sys
+import json
+import time
+import subprocess
+import statistics
+
+'''
+Mede o tempo de inicialização (cold start) dos pontos de entrada.
+
+main.py e exToGS.py executam o fluxo assim que são importados, então a medição roda
+apenas os imports de nível superior de cada arquivo, em um interpretador novo por
+repetição (sem cache de módulos). Para cada ponto de entrada mostra:
+- o tempo total do processo (interpretador + imports), mediana das repetições
+- o tempo de cada import do arquivo (inclui os módulos que ele puxa)
+- os módulos mais pesados, segundo `python -X importtime`
+
+Uso:
+    python medir_inicializacao.py                 # main.py e exToGS.py, 5 repetições
+    python medir_inicializacao.py exToGS.py -n 10
+'''
+
+PASTA_BASE = os.path.dirname(os.path.abspath(__file__))
+PONTOS_DE_ENTRADA = ['main.py', 'exToGS.py']
+
+# Executado no processo filho: importa cada linha e devolve os tempos em JSON
+CODIGO_MEDICAO = '''
+import json, time, sys
+tempos = []
+for linha in {linhas!r}:
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        exec(linha, {{}})
+    except Exception as e:
+        erro = f"{{type(e).__name__}}: {{e}}"
+    tempos.append({{'import': linha, 's': time.perf_counter() - inicio, 'erro': erro}})
+print(json.dumps(tempos))
+'''
+
+
+def imports_nivel_superior(caminho):
+    """Linhas 'import ...'/'from ... import ...' do nível superior do arquivo, na ordem"""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        arvore = ast.parse(arquivo.read(), caminho)
+    return [ast.unparse(no) for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom))]
+
+
+def _modulos_pesados(stderr, limite=8):
+    """Lê a saída de -X importtime e retorna os módulos de topo com maior tempo acumulado"""
+    modulos = []
+    for linha in stderr.splitlines():
+        if not linha.startswith('import time:') or '|' not in linha:
+            continue
+        _, acumulado, nome = linha[len('import time:'):].split('|')
+        # Só o primeiro nível da árvore (sem indentação) para não contar o mesmo tempo duas vezes
+        if acumulado.strip().isdigit() and not nome.startswith('  '):
+            modulos.append((nome.strip(), int(acumulado) / 1e6))
+    return sorted(modulos, key=lambda item: item[1], reverse=True)[:limite]
+
+
+def medir_ponto_de_entrada(arquivo, repeticoes=5):
+    """
+    Mede os imports de um ponto de entrada em 'repeticoes' interpretadores novos
+
+    Retorna:
+    - dicionário com 'total_s' (mediana do processo), 'imports' (mediana por linha, com
+      erro se o import falhou) e 'pesados' (módulos de topo de -X importtime)
+    """
+    linhas = imports_nivel_superior(os.path.join(PASTA_BASE, arquivo))
+    codigo = CODIGO_MEDICAO.format(linhas=linhas)
+
+    totais = []
+    por_import = {linha: [] for linha in linhas}
+    erros = {}
+    pesados = []
+    for repeticao in range(repeticoes):
+        comando = [sys.executable, '-X', 'importtime', '-c', codigo]
+        inicio = time.perf_counter()
+        processo = subprocess.run(comando, cwd=PASTA_BASE, capture_output=True, text=True)
+        totais.append(time.perf_counter() - inicio)
+
+        saida = processo.stdout.strip().splitlines()
+        if processo.returncode != 0 or not saida:
+            raise RuntimeError(f"falha ao medir {arquivo}: {processo.stderr.strip()[-500:]}")
+        for registro in json.loads(saida[-1]):
+            por_import[registro['import']].append(registro['s'])
+            if registro['erro']:
+                erros[registro['import']] = registro['erro']
+        if repeticao == 0:
+            pesados = _modulos_pesados(processo.stderr)
+
+    return {
+        'total_s': statistics.median(totais),
+        'imports': [(linha, statistics.median(tempos), erros.get(linha)) for linha, tempos in por_import.items()],
+        'pesados': pesados,
+    }
+
+
+def relatorio(arquivos=None, repeticoes=5):
+    """Imprime o tempo de inicialização de cada ponto de entrada"""
+    print(f"🚀 === INICIALIZAÇÃO DOS PONTOS DE ENTRADA ({repeticoes} repetições, mediana) ===")
+    resultados = {}
+    for arquivo in arquivos or PONTOS_DE_ENTRADA:
+        medicao = medir_ponto_de_entrada(arquivo, repeticoes)
+        resultados[arquivo] = medicao
+        print(f"📄 {arquivo}: {medicao['total_s'] * 1000:.0f} ms (processo completo)")
+        for linha, segundos, erro in medicao['imports']:
+            status = f"❌ {erro}" if erro else ''
+            print(f"   {segundos * 1000:>8.1f} ms  {linha} {status}")
+        if medicao['pesados']:
+            print("   Módulos mais pesados (-X importtime, acumulado):")
+            for nome, segundos in medicao['pesados']:
+                print(f"   {segundos * 1000:>8.1f} ms  {nome}")
+    return resultados
+
+
+if __name__ == '__main__':
+    argumentos = sys.argv[1:]
+    repeticoes = 5
+    if '-n' in argumentos:
+        posicao = argumentos.index('-n')
+        repeticoes = int(argumentos[posicao + 1])
+        del argumentos[posicao:posicao + 2]
+    relatorio(argumentos or None, repeticoes)
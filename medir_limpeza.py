@@ -0,0 +1,464 @@
+import io
+import os
+import sys
+import copy
+import time
+import random
+import calendar
+from datetime import date
+from contextlib import redirect_stdout
+import addDados_EXtoGS as exgs
+import unidades as cadastro_unidades
+import periodos as cadastro_periodos
+import relatorio_alteracoes
+
+'''
+Benchmark da limpeza do relatório (linhas por segundo): versão antiga, caminho escalar,
+caminho numpy e níveis do relatório de alterações.
+
+Gera um relatório sintético no formato lido do .xlsx (48 colunas, textos no formato
+brasileiro, com 'edit'/'add', "'R$", '%', códigos de unidade e períodos) e compara:
+- limpar_dados_completo_brasileiro_expandido_old, abaixo (procura o índice em listas a
+  cada célula)
+- limpar_dados_completo_brasileiro_expandido, motor='escalar' (um conversor por coluna)
+- limpar_dados_completo_brasileiro_expandido, motor='numpy' (colunas numéricas em bloco;
+  só se o NumPy estiver instalado)
+cada um com o relatório de alterações no nível 'completo' (um print por célula, como a
+_old) e 'resumo' (só a tabela final).
+
+Antes de medir, confere se as versões produzem os mesmos dados (e, entre _old e escalar
+'completo', o mesmo log).
+A saída dos prints vai para os.devnull durante a medição: em um terminal de verdade o
+nível 'completo' é ainda mais lento.
+
+Uso:
+    python medir_limpeza.py            # 20000 linhas, 3 repetições
+    python medir_limpeza.py 100000 5
+'''
+
+
+# Versão antiga da limpeza (antes do esquema de colunas compilado), mantida só como
+# referência de resultado e de tempo para este benchmark
+def limpar_dados_completo_brasileiro_expandido_old(data):
+    """
+    Função expandida que limpa dados mantendo formato brasileiro:
+    - Remove 'edit' e 'add' de todas as colunas
+    - Remove "'R$" das colunas de moeda
+    - MANTÉM formato brasileiro (vírgula como separador decimal)
+    - Substitui códigos de unidades por nomes das cidades na coluna A
+    - Prepara dados para formatação no Google Sheets
+    """
+    try:
+        # Define as colunas que contêm valores monetários
+        def coluna_letra_para_indice(letra):
+            """Converte letra da coluna para índice (A=0, B=1, C=2, etc.)"""
+            if len(letra) == 1:
+                return ord(letra.upper()) - ord('A')
+            elif len(letra) == 2:
+                return (ord(letra[0].upper()) - ord('A') + 1) * 26 + (ord(letra[1].upper()) - ord('A'))
+            else:  # Para colunas como AAA, etc.
+                result = 0
+                for i, char in enumerate(reversed(letra.upper())):
+                    result += (ord(char) - ord('A') + 1) * (26 ** i)
+                return result - 1
+        
+        # Mapeamento de códigos para cidades
+        mapeamento_unidades = {
+            '1odontologiasa': 'Santo Antônio',
+            '2odontologiasa': 'Santo Antônio',
+            '3odontologiasa': 'Santo Antônio',
+            '4odontologiasa': 'Santo Antônio',
+            '5odontologiasa': 'Santo Antônio',
+            '6odontologiasa': 'Santo Antônio',
+            '7odontologiasa': 'Santo Antônio',
+            '8odontologiasa': 'Santo Antônio',
+            '9odontologiasa': 'Santo Antônio',
+            '1odontologiana': 'Natal (odonto)',
+            '2odontologiana': 'Natal (odonto)',
+            '3odontologiana': 'Natal (odonto)',
+            '4odontologiana': 'Natal (odonto)',
+            '5odontologiana': 'Natal (odonto)',
+            '6odontologiana': 'Natal (odonto)',
+            '7odontologiana': 'Natal (odonto)',
+            '8odontologiana': 'Natal (odonto)',
+            '9odontologiana': 'Natal (odonto)',
+            '1odontologiasjm': 'São José do Mipibu',
+            '2odontologiasjm': 'São José do Mipibu',
+            '3odontologiasjm': 'São José do Mipibu',
+            '4odontologiasjm': 'São José do Mipibu',
+            '5odontologiasjm': 'São José do Mipibu',
+            '6odontologiasjm': 'São José do Mipibu',
+            '7odontologiasjm': 'São José do Mipibu',
+            '8odontologiasjm': 'São José do Mipibu',
+            '9odontologiasjm': 'São José do Mipibu',
+            '1odontologiacg': 'Canguaretama',
+            '2odontologiacg': 'Canguaretama',
+            '3odontologiacg': 'Canguaretama',
+            '4odontologiacg': 'Canguaretama',
+            '5odontologiacg': 'Canguaretama',
+            '6odontologiacg': 'Canguaretama',
+            '7odontologiacg': 'Canguaretama',
+            '8odontologiacg': 'Canguaretama',
+            '9odontologiacg': 'Canguaretama',
+            '1odontologiagoi': 'Goianinha',
+            '2odontologiagoi': 'Goianinha',
+            '3odontologiagoi': 'Goianinha',
+            '4odontologiagoi': 'Goianinha',
+            '5odontologiagoi': 'Goianinha',
+            '6odontologiagoi': 'Goianinha',
+            '7odontologiagoi': 'Goianinha',
+            '8odontologiagoi': 'Goianinha',
+            '9odontologiagoi': 'Goianinha',
+            '1mbestetica': 'Natal (MBEstética)',
+            '2mbestetica': 'Natal (MBEstética)',
+            '3mbestetica': 'Natal (MBEstética)',
+            '4mbestetica': 'Natal (MBEstética)',
+            '5mbestetica': 'Natal (MBEstética)',
+            '6mbestetica': 'Natal (MBEstética)',
+            '7mbestetica': 'Natal (MBEstética)',
+            '8mbestetica': 'Natal (MBEstética)',
+            '9mbestetica': 'Natal (MBEstética)',
+            '1odontoma': 'Monte Alegre',
+            '2odontoma': 'Monte Alegre',
+            '3odontoma': 'Monte Alegre',
+            '4odontoma': 'Monte Alegre',
+            '5odontoma': 'Monte Alegre',
+            '6odontoma': 'Monte Alegre',
+            '7odontoma': 'Monte Alegre',
+            '8odontoma': 'Monte Alegre',
+            '9odontoma': 'Monte Alegre',
+            '1odontologiabj': 'Brejinho',
+            '2odontologiabj': 'Brejinho',
+            '3odontologiabj': 'Brejinho',
+            '4odontologiabj': 'Brejinho',
+            '5odontologiabj': 'Brejinho',
+            '6odontologiabj': 'Brejinho',
+            '7odontologiabj': 'Brejinho',
+            '8odontologiabj': 'Brejinho',
+            '9odontologiabj': 'Brejinho',
+            '1odontorecife': 'Recife',
+            '2odontorecife': 'Recife',
+            '3odontorecife': 'Recife',
+            '4odontorecife': 'Recife',
+            '5odontorecife': 'Recife',
+            '6odontorecife': 'Recife',
+            '7odontorecife': 'Recife',
+            '8odontorecife': 'Recife',
+            '9odontorecife': 'Recife',
+        }
+        
+        # Mapeamento de cidades para CEPs
+        mapeamento_ceps = {
+            'Santo Antônio': '59255-000',
+            'Natal (odonto)': '59010-000',
+            'São José do Mipibu': '59162-000',
+            'Canguaretama': '59190-000',
+            'Goianinha': '59173-000',
+            'Natal (MBEstética)': '59010-000',
+            'Monte Alegre': '59182-000',
+            'Brejinho': '59219-000',
+            'Recife': '50010-000'
+        }
+        
+        mapeamento_periodos = {
+            '01/01/2025-31/01/2025': 'Janeiro/2025',
+            '01/02/2025-28/02/2025': 'Fevereiro/2025',
+            '01/03/2025-31/03/2025': 'Março/2025',
+            '01/04/2025-30/04/2025': 'Abril/2025',
+            '01/05/2025-31/05/2025': 'Maio/2025',
+            '01/06/2025-30/06/2025': 'Junho/2025',
+            '01/07/2025-31/07/2025': 'Julho/2025',
+            '01/08/2025-31/08/2025': 'Agosto/2025',
+            '01/09/2025-30/09/2025': 'Setembro/2025',
+            '01/10/2025-31/10/2025': 'Outubro/2025',
+            '01/11/2025-30/11/2025': 'Novembro/2025',
+            '01/12/2025-31/12/2025': 'Dezembro/2025',
+        }
+        
+        # Colunas de moeda: C, D, F, G, L, M, O, P, R, S, U, V, X, Y, AP, AQ, AS, AT
+        colunas_moeda = ['C', 'D', 'F', 'G', 'L', 'M', 'O', 'P', 'R', 'S', 'U', 'V', 'X', 'Y', 'AP', 'AQ', 'AS', 'AT']
+        indices_moeda = [coluna_letra_para_indice(col) for col in colunas_moeda]
+        
+        # Colunas de porcentagem: E, H, I, J, K, N, Q, T, W, Z, AC, AF, AI, AL, AO, AR, AU
+        colunas_porcentagem = ['E', 'H', 'I', 'J', 'K', 'N', 'Q', 'T', 'W', 'Z', 'AC', 'AF', 'AI', 'AL', 'AO', 'AR', 'AU']
+        indices_porcentagem = [coluna_letra_para_indice(col) for col in colunas_porcentagem]
+        
+        # Colunas de número: AA, AB, AD, AE, AG, AH, AJ, AK, AM, AN
+        colunas_numero = ['AA', 'AB', 'AD', 'AE', 'AG', 'AH', 'AJ', 'AK', 'AM', 'AN']
+        indices_numero = [coluna_letra_para_indice(col) for col in colunas_numero]
+        
+        # Coluna AV (índice para CEP)
+        indice_av = coluna_letra_para_indice('AV')
+        indice_b = coluna_letra_para_indice('B')
+        
+        print(f"🔍 Colunas de moeda identificadas: {colunas_moeda}")
+        print(f"📊 Colunas de porcentagem identificadas: {colunas_porcentagem}")
+        print(f"🔢 Colunas de número identificadas: {colunas_numero}")
+        
+        linhas_alteradas = 0
+        
+        for i, row in enumerate(data):
+            linha_alterada = False
+            linha_alterada2 = False
+            cidade_linha = None  # Para armazenar a cidade da linha atual
+            periodo_linha = None
+            
+            # Primeiro, verifica se há substituição de unidade na coluna A
+            if len(row) > 0 and row[0] is not None:
+                valor_coluna_a = str(row[0]).strip()
+                if valor_coluna_a in mapeamento_unidades:
+                    cidade_linha = mapeamento_unidades[valor_coluna_a]
+                    row[0] = cidade_linha
+                    linha_alterada = True
+                    print(f"Linha {i+3}, Coluna A: '{valor_coluna_a}' -> '{cidade_linha}'")
+            
+            if len(row) > 0 and row[1] is not None:
+                valor_coluna_b = str(row[1]).strip()
+                if valor_coluna_b in mapeamento_periodos:
+                    periodo_linha = mapeamento_periodos[valor_coluna_b]
+                    row[1] = periodo_linha
+                    linha_alterada = True
+                    print(f"Linha {i+3}, Coluna b: '{valor_coluna_b}' -> '{periodo_linha}'")
+            
+            # Percorre todas as colunas da linha
+            for j, cell_value in enumerate(row):
+                if cell_value is not None:
+                    valor_original = str(cell_value)
+                    valor_processado = valor_original
+                    
+                    # ETAPA 1: Remove 'edit' e 'add' de qualquer coluna
+                    if 'edit' in valor_processado.lower():
+                        valor_processado = valor_processado.replace('edit', '').replace('Edit', '').replace('EDIT', '')
+                        linha_alterada = True
+                    
+                    if 'add' in valor_processado.lower():
+                        valor_processado = valor_processado.replace('add', '').replace('Add', '').replace('ADD', '')
+                        linha_alterada = True
+                    
+                    # ETAPA 2: Tratamento específico por tipo de coluna
+                    if j in indices_moeda:
+                        # Tratamento para colunas de moeda
+                        if valor_processado.startswith("'R$"):
+                            valor_processado = valor_processado[3:]
+                            linha_alterada = True
+                        elif valor_processado.startswith("'"):
+                            valor_processado = valor_processado[1:]
+                            linha_alterada = True
+                        elif valor_processado.startswith("R$"):
+                            valor_processado = valor_processado[2:]
+                            linha_alterada = True
+                        
+                        valor_processado = valor_processado.strip()
+                        
+                        if valor_processado and not valor_processado.isalpha():
+                            try:
+                                partes = valor_processado.split(',')
+                                if len(partes) == 2:
+                                    parte_inteira = partes[0].replace('.', '')
+                                    parte_decimal = partes[1]
+                                    valor_processado = f"{parte_inteira},{parte_decimal}"
+                                else:
+                                    valor_processado = valor_processado.replace('.', '')
+                                
+                                valor_para_sheets = valor_processado.replace(',', '.')
+                                float(valor_para_sheets)
+                                valor_processado = float(valor_para_sheets)
+                                
+                            except ValueError:
+                                valor_processado = valor_processado.strip()
+                    
+                    elif j in indices_porcentagem:
+                        # Tratamento para colunas de porcentagem
+                        valor_processado = valor_processado.strip()
+                        
+                        # Remove % se estiver presente
+                        if valor_processado.endswith('%'):
+                            valor_processado = valor_processado[:-1].strip()
+                            linha_alterada = True
+                        
+                        if valor_processado and not valor_processado.isalpha():
+                            try:
+                                # Converte vírgula para ponto para processamento
+                                valor_para_sheets = valor_processado.replace(',', '.')
+                                valor_numerico = float(valor_para_sheets)
+                                
+                                # Se o valor é maior que 1, assume que já está em formato percentual (ex: 15 = 15%)
+                                # Se o valor é menor que 1, assume que está em decimal (ex: 0.15 = 15%)
+                                if valor_numerico > 1:
+                                    valor_processado = valor_numerico / 100  # Converte para decimal para Google Sheets
+                                else:
+                                    valor_processado = valor_numerico
+                                
+                            except ValueError:
+                                valor_processado = valor_processado.strip()
+                    
+                    elif j in indices_numero:
+                        # Tratamento para colunas de número
+                        valor_processado = valor_processado.strip()
+                        
+                        if valor_processado and not valor_processado.isalpha():
+                            try:
+                                # Remove separadores de milhares e converte vírgula decimal
+                                partes = valor_processado.split(',')
+                                if len(partes) == 2:
+                                    parte_inteira = partes[0].replace('.', '')
+                                    parte_decimal = partes[1]
+                                    valor_processado = f"{parte_inteira}.{parte_decimal}"
+                                else:
+                                    valor_processado = valor_processado.replace('.', '')
+                                
+                                valor_processado = float(valor_processado)
+                                
+                            except ValueError:
+                                valor_processado = valor_processado.strip()
+                    
+                    else:
+                        # Para outras colunas, só remove espaços
+                        valor_processado = valor_processado.strip()
+                    
+                    # Atualiza o valor se houve mudança
+                    if str(valor_original) != str(valor_processado):
+                        data[i][j] = valor_processado
+                        linha_alterada = True
+                        
+                        coluna_letra = exgs.indice_para_coluna_letra(j)
+                        print(f"Linha {i+3}, Coluna {coluna_letra}: '{valor_original}' -> '{valor_processado}'")
+            
+            # Preenche CEP na coluna AV se temos uma cidade identificada
+            if cidade_linha:
+                cep = mapeamento_ceps.get(cidade_linha, '')
+                if cep:
+                    # Expande a linha se necessário para incluir a coluna AV
+                    while len(data[i]) <= indice_av:
+                        data[i].append(None)
+                    
+                    data[i][indice_av] = cep  # ✅ Agora funciona sempre
+            
+            if linha_alterada:
+                linhas_alteradas += 1
+        
+        print(f"✅ Limpeza concluída. {linhas_alteradas} linhas foram alteradas.")
+        
+    except Exception as e:
+        print(f"❌ Erro ao limpar dados: {e}")
+    
+    return data
+
+
+def _moeda(gerador):
+    valor = f"{gerador.uniform(0, 250000):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    return gerador.choice(["'R$ ", "R$ ", "'", ""]) + valor
+
+
+def _porcentagem(gerador):
+    return f"{gerador.uniform(0, 100):.2f}".replace('.', ',') + gerador.choice(['%', ''])
+
+
+def _numero(gerador):
+    return f"{gerador.randint(0, 25000):,}".replace(',', '.')
+
+
+def gerar_relatorio_sintetico(linhas, semente=42):
+    """Lista de linhas com o mesmo formato (textos, None e colunas) do relatório lido do .xlsx"""
+    gerador = random.Random(semente)
+    esquema = exgs.compilar_esquema_colunas()
+    # Códigos de 1 a 9, os mesmos que a _old conhece
+    unidades = [f"{numero}{unidade.slug}" for unidade in cadastro_unidades.listar_unidades()
+                for numero in range(1, 10)] + ['unidade_nova']
+    # Meses de 2025 (os que a _old conhece) e um texto que não é período
+    periodos = [cadastro_periodos.formatar_periodo(date(2025, mes, 1), date(2025, mes, calendar.monthrange(2025, mes)[1]))
+                for mes in range(1, 13)] + ['Período personalizado']
+    geradores = {exgs.converte_moeda: _moeda, exgs.converte_porcentagem: _porcentagem,
+                 exgs.converte_numero: _numero}
+
+    dados = []
+    for _ in range(linhas):
+        linha = [gerador.choice(unidades), gerador.choice(periodos)]
+        for conversor in esquema[2:exgs.INDICE_AV]:
+            if gerador.random() < 0.05:
+                linha.append(None)
+            elif conversor in geradores:
+                valor = geradores[conversor](gerador)
+                linha.append(valor + 'edit' if gerador.random() < 0.1 else valor)
+            else:
+                linha.append(gerador.choice([' Texto ', 'add', '-', '']))
+        dados.append(linha)
+    return dados
+
+
+def _executar(funcao, dados, saida):
+    with redirect_stdout(saida):
+        return funcao(copy.deepcopy(dados))
+
+
+def limpeza(motor, nivel='resumo'):
+    def limpar(dados):
+        relatorio = relatorio_alteracoes.RelatorioAlteracoes(nivel)
+        exgs.limpar_dados_completo_brasileiro_expandido(dados, motor=motor, relatorio=relatorio)
+        relatorio.fechar()
+        return dados
+    return limpar
+
+
+def numpy_instalado():
+    try:
+        import numpy
+        return True
+    except ImportError:
+        return False
+
+
+def conferir_equivalencia(linhas=2000):
+    """True se a versão nova gera os mesmos dados e o mesmo log que a _old (e o numpy os mesmos dados)"""
+    dados = gerar_relatorio_sintetico(linhas, semente=7)
+    log_old, log_novo = io.StringIO(), io.StringIO()
+    resultado_old = _executar(limpar_dados_completo_brasileiro_expandido_old, dados, log_old)
+    resultado_novo = _executar(limpeza('escalar', 'completo'), dados, log_novo)
+    # A tabela de resumo do relatório não existe na _old
+    log_novo = log_novo.getvalue().split("🧾 ===")[0]
+    if resultado_old != resultado_novo or log_old.getvalue() != log_novo:
+        return False
+    if numpy_instalado():
+        # repr: compara também o tipo de cada célula (texto x float)
+        return repr(_executar(limpeza('numpy'), dados, io.StringIO())) == repr(resultado_novo)
+    return True
+
+
+def medir(funcao, dados, repeticoes=3):
+    """Melhor tempo (s) entre as repetições; a cópia dos dados fica fora da medição"""
+    melhor = None
+    with open(os.devnull, 'w', encoding='utf-8') as nulo:
+        for _ in range(repeticoes):
+            copia = copy.deepcopy(dados)
+            with redirect_stdout(nulo):
+                inicio = time.perf_counter()
+                funcao(copia)
+                duracao = time.perf_counter() - inicio
+            melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+def relatorio(linhas=20000, repeticoes=3):
+    print(f"🧪 Relatório sintético: {linhas} linhas x {exgs.INDICE_AV + 1} colunas")
+    if not conferir_equivalencia():
+        print("❌ As versões antiga e nova produziram resultados diferentes")
+        return None
+    print("✅ As versões produzem os mesmos dados")
+
+    dados = gerar_relatorio_sintetico(linhas)
+    tempos = {'_old': medir(limpar_dados_completo_brasileiro_expandido_old, dados, repeticoes)}
+    motores = ['escalar'] + (['numpy'] if numpy_instalado() else [])
+    if len(motores) == 1:
+        print("ℹ️ NumPy não instalado: caminho colunar não medido")
+    for motor in motores:
+        for nivel in ('completo', 'resumo'):
+            tempos[f"{motor} ({nivel})"] = medir(limpeza(motor, nivel), dados, repeticoes)
+
+    for nome, tempo in tempos.items():
+        print(f"   {nome:<20} {linhas / tempo:>10,.0f} linhas/s ({tempo:.2f}s) | {tempos['_old'] / tempo:.2f}x")
+    return tempos
+
+
+if __name__ == '__main__':
+    argumentos = [int(argumento) for argumento in sys.argv[1:3]]
+    relatorio(*argumentos)
@@ -0,0 +1,85 @@
+import re
+import calendar
+from datetime import date
+from functools import lru_cache
+
+'''
+Rótulos dos períodos do relatório (coluna B).
+
+O relatório traz o período como 'dd/mm/aaaa-dd/mm/aaaa'. rotulo_periodo() transforma
+qualquer período válido em um rótulo, conforme o intervalo:
+- mês completo:        '01/01/2024-31/01/2024' -> 'Janeiro/2024'
+- trimestre completo:  '01/04/2024-30/06/2024' -> '2º Trimestre/2024'
+- ano completo:        '01/01/2024-31/12/2024' -> 'Ano/2024'
+- semana ISO (seg-dom): '30/12/2024-05/01/2025' -> 'Semana 01/2025'
+- outros intervalos:   '15/01/2024-20/02/2024' -> '15 Janeiro/2024 a 20 Fevereiro/2024'
+Cada período já rotulado fica em memória (LRU): o relatório repete o mesmo período em
+todas as linhas.
+'''
+
+PADRAO_PERIODO = re.compile(r'^(\d{2})/(\d{2})/(\d{4})\s*-\s*(\d{2})/(\d{2})/(\d{4})$')
+
+
+def get_mes(numero_mes):
+    meses = ["janeiro", "fevereiro", "março", "abril", "maio", "junho",
+            "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"]
+
+    if 1 <= numero_mes <= 12:
+        # O número do mês (1 a 12) é usado como índice (0 a 11)
+        # Retorna o nomes do mês
+        return meses[numero_mes - 1]
+    else:
+        return "Número do mês inválido"
+
+
+def _ultimo_dia(ano, mes):
+    return date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+
+def _mes_ano(dia):
+    """date -> 'Janeiro/2024'"""
+    return f"{get_mes(dia.month).capitalize()}/{dia.year}"
+
+
+def formatar_periodo(inicio, fim):
+    """(date, date) -> 'dd/mm/aaaa-dd/mm/aaaa', o formato do período no relatório"""
+    return f"{inicio:%d/%m/%Y}-{fim:%d/%m/%Y}"
+
+
+def rotulo_intervalo(inicio, fim):
+    """Rótulo do intervalo (date, date): mês, trimestre, ano, semana ISO ou intervalo livre"""
+    if inicio.day == 1 and fim == _ultimo_dia(fim.year, fim.month) and inicio.year == fim.year:
+        if inicio.month == fim.month:
+            return _mes_ano(inicio)
+        if inicio.month % 3 == 1 and fim.month == inicio.month + 2:
+            return f"{inicio.month // 3 + 1}º Trimestre/{inicio.year}"
+        if inicio.month == 1 and fim.month == 12:
+            return f"Ano/{inicio.year}"
+
+    if inicio.isoweekday() == 1 and (fim - inicio).days == 6:
+        ano_iso, semana, _ = inicio.isocalendar()
+        return f"Semana {semana:02d}/{ano_iso}"
+
+    return f"{inicio.day:02d} {_mes_ano(inicio)} a {fim.day:02d} {_mes_ano(fim)}"
+
+
+@lru_cache(maxsize=1024)
+def rotulo_periodo(periodo):
+    """
+    Período do relatório ('dd/mm/aaaa-dd/mm/aaaa') -> rótulo (ver exemplos acima)
+
+    Retorna:
+    - o rótulo, ou None se o texto não for um período válido (data inexistente ou fim antes do início)
+    """
+    correspondencia = PADRAO_PERIODO.match(periodo.strip())
+    if correspondencia is None:
+        return None
+    dia_i, mes_i, ano_i, dia_f, mes_f, ano_f = map(int, correspondencia.groups())
+    try:
+        inicio = date(ano_i, mes_i, dia_i)
+        fim = date(ano_f, mes_f, dia_f)
+    except ValueError:
+        return None
+    if fim < inicio:
+        return None
+    return rotulo_intervalo(inicio, fim)
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit
+import localizador
+import esperas
+
+'''
+Persistência da sessão do CliniCorp entre execuções.
+
+Depois de um login bem-sucedido, salva cookies, localStorage e sessionStorage em um
+arquivo local. Na próxima execução restaura tudo antes da primeira navegação (via CDP)
+e valida a sessão com um único carregamento da área logada; o formulário de login só
+é usado quando a sessão expirou.
+
+Cada usuário e endereço do sistema tem o seu arquivo em sessoes/ (ver caminho_sessao):
+trocar de conta nunca restaura os cookies de outra.
+
+ATENÇÃO: o arquivo contém tokens de acesso. Ele está no .gitignore e não deve ser compartilhado.
+'''
+
+PASTA_SESSOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessoes')
+
+# Workers do pool (pool_navegadores.py) logam com o mesmo usuário e leem/gravam o mesmo arquivo
+_trava = threading.Lock()
+
+
+def caminho_sessao(usuario, url_login):
+    """
+    Arquivo da sessão de um usuário em um host (ex.: sessoes/sessao_sistema.clinicorp.com_1a2b3c4d5e6f.json).
+    O usuário entra no nome só como hash, para o e-mail não aparecer no nome do arquivo.
+    """
+    host = urlsplit(url_login).netloc or 'local'
+    resumo_usuario = hashlib.sha256(usuario.strip().lower().encode('utf-8')).hexdigest()[:12]
+    return os.path.join(PASTA_SESSOES, f"sessao_{host}_{resumo_usuario}.json")
+
+# Elementos que só existem na área logada (mesmos indicadores usados no login)
+INDICADORES_LOGADO = [
+    "div[id='Ranking de Unidades']",
+    "//*[contains(@class, 'welcome-msg__text--2')]",
+    "//a[contains(text(), 'Ranking de Unidades')]",
+]
+
+# Elementos do formulário de login (sessão expirada)
+INDICADORES_FORMULARIO = [
+    "input[type='password']",
+    "input[id='username']",
+]
+
+JS_LER_STORAGE = """
+function copia(storage) {
+    var itens = {};
+    for (var i = 0; i < storage.length; i++) {
+        var chave = storage.key(i);
+        itens[chave] = storage.getItem(chave);
+    }
+    return itens;
+}
+return [window.location.origin, copia(window.localStorage), copia(window.sessionStorage)];
+"""
+
+# Executado antes de qualquer script da página: repõe o storage apenas na origem salva
+JS_RESTAURAR_STORAGE = """
+(function() {
+    var origem = %s;
+    if (window.location.origin !== origem) { return; }
+    var locais = %s, sessao = %s;
+    Object.keys(locais).forEach(function(k) { window.localStorage.setItem(k, locais[k]); });
+    Object.keys(sessao).forEach(function(k) { window.sessionStorage.setItem(k, sessao[k]); });
+})();
+"""
+
+
+def salvar_sessao(driver, usuario, url_login):
+    """
+    Salva cookies, localStorage, sessionStorage e a URL da área logada no arquivo do
+    usuário/host (gravação atômica: arquivo temporário + os.replace)
+    """
+    caminho = caminho_sessao(usuario, url_login)
+    try:
+        origem, local_storage, session_storage = driver.execute_script(JS_LER_STORAGE)
+        sessao = {
+            'salva_em': time.time(),
+            'usuario': usuario.strip().lower(),
+            'host': urlsplit(url_login).netloc,
+            'origem': origem,
+            'url_logada': driver.current_url,
+            'cookies': driver.get_cookies(),
+            'localStorage': local_storage,
+            'sessionStorage': session_storage,
+        }
+        os.makedirs(PASTA_SESSOES, exist_ok=True)
+        # Temporário próprio do processo/thread: outra execução gravando ao mesmo tempo não o trunca
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with _trava:
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(sessao, arquivo, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        print(f"💾 Sessão salva ({len(sessao['cookies'])} cookies) em: {caminho}")
+        return True
+    except Exception as e:
+        print(f"⚠️ Não foi possível salvar a sessão: {e}")
+        return False
+
+
+def _cookie_para_cdp(cookie):
+    """Converte o formato do Selenium (get_cookies) para o Network.setCookies do CDP"""
+    convertido = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain'),
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False),
+    }
+    if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+        convertido['sameSite'] = cookie['sameSite']
+    if 'expiry' in cookie:
+        convertido['expires'] = cookie['expiry']
+    return convertido
+
+
+def restaurar_sessao(driver, usuario, url_login, timeout=10):
+    """
+    Restaura a sessão salva deste usuário neste host e confirma se ainda está válida.
+
+    Retorna:
+    - True: o navegador está na área logada (o login pelo formulário pode ser pulado)
+    - False: não há sessão salva ou ela expirou (faça o login normal)
+    """
+    caminho = caminho_sessao(usuario, url_login)
+    try:
+        with _trava, open(caminho, 'r', encoding='utf-8') as arquivo:
+            sessao = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        print("ℹ️ Nenhuma sessão salva encontrada para este usuário")
+        return False
+
+    # Confere o dono do arquivo (ex.: arquivo copiado ou renomeado à mão)
+    if sessao.get('usuario') != usuario.strip().lower() or sessao.get('host') != urlsplit(url_login).netloc:
+        print("⚠️ Sessão salva pertence a outro usuário ou endereço - ignorada")
+        return False
+
+    # Cookies já vencidos não adiantam; se não sobrou nenhum, a sessão expirou
+    agora = time.time()
+    cookies = [c for c in sessao.get('cookies', []) if c.get('expiry', agora + 1) > agora]
+    if not cookies:
+        print("⌛ Cookies da sessão salva expiraram")
+        return False
+
+    print(f"🍪 Restaurando sessão salva ({len(cookies)} cookies)...")
+    identificador_script = None
+    try:
+        # Cookies e storage entram antes da primeira navegação: um único carregamento valida a sessão
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': [_cookie_para_cdp(c) for c in cookies]})
+
+        script = JS_RESTAURAR_STORAGE % (
+            json.dumps(sessao['origem']),
+            json.dumps(sessao.get('localStorage', {})),
+            json.dumps(sessao.get('sessionStorage', {})),
+        )
+        identificador_script = driver.execute_cdp_cmd(
+            'Page.addScriptToEvaluateOnNewDocument', {'source': script}
+        ).get('identifier')
+
+        driver.get(sessao['url_logada'])
+        esperas.esperar_pagina_carregada(driver, timeout=timeout, descricao='validação da sessão')
+
+        # O que aparecer primeiro decide: área logada ou formulário de login
+        _, indice = localizador.localizar_primeiro(
+            driver, INDICADORES_LOGADO + INDICADORES_FORMULARIO,
+            timeout=timeout, clicavel=False, descricao='área logada ou formulário'
+        )
+        valida = indice is not None and indice < len(INDICADORES_LOGADO) and 'login' not in driver.current_url.lower()
+
+    except Exception as e:
+        print(f"⚠️ Erro ao restaurar sessão: {e}")
+        valida = False
+
+    finally:
+        # O storage só deve ser reposto nesta navegação, não nas próximas
+        if identificador_script:
+            try:
+                driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                       {'identifier': identificador_script})
+            except Exception:
+                pass
+
+    if valida:
+        print("✅ Sessão restaurada - login pelo formulário dispensado")
+    else:
+        print("⌛ Sessão salva expirou ou é inválida - será feito o login pelo formulário")
+    return valida
+
+
+def apagar_sessao(usuario, url_login):
+    """Remove a sessão salva do usuário neste host (ex.: senha trocada)"""
+    caminho = caminho_sessao(usuario, url_login)
+    with _trava:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+            print("🗑️ Sessão salva removida")
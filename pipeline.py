@@ -0,0 +1,277 @@
+import os
+import json
+import time
+from datetime import datetime
+import login_cliniCorp as lcc
+import addDados_EXtoGS as exgs
+import rastreamento
+import leitor_xlsx
+
+'''
+Pipeline com pontos de retomada (checkpoints) para o relatório de um período.
+
+Etapas, em ordem:
+1. navegador_logado   - abre o Chrome, faz login e entra em Ranking de Unidades
+2. periodo_definido   - escolhe DATA e preenche o intervalo
+3. arquivo_baixado    - Listar + download (salva o caminho do .xlsx)
+4. dados_limpos       - lê e limpa o .xlsx (salva o conjunto limpo em checkpoints/)
+5. dados_enviados     - acrescenta as linhas no Google Sheets (salva o range usado)
+6. formatado          - aplica as formatações no range enviado
+
+As etapas 3 a 6 ficam registradas em estado_pipeline.json assim que concluem. Ao rodar
+de novo para o mesmo período e planilha, o pipeline continua da primeira etapa não
+concluída; as etapas 1 e 2 (estado do navegador) só rodam se ainda faltar o download.
+Uma falha repete apenas a etapa que falhou, sem fechar o navegador; se o navegador tiver
+caído, outro é aberto (login e período refeitos) antes de repetir a etapa.
+
+O envio (etapa 5) não é repetido automaticamente: o values.append não é idempotente, e
+uma resposta perdida (timeout, 5xx) depois de o Google gravar as linhas duplicaria os
+dados. Antes do primeiro envio fica salvo no estado o tamanho da tabela que o append
+encontra (linhas contíguas a partir de A1), e a resposta do append (updatedRange) é salva
+assim que chega. Ao rodar de novo: com o updatedRange salvo o envio está feito; sem ele,
+se a tabela cresceu exatamente as linhas do período o envio é dado como feito, se não
+cresceu o envio é refeito, e qualquer outra diferença interrompe para conferência.
+'''
+
+PASTA_BASE = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_ESTADO = os.path.join(PASTA_BASE, 'estado_pipeline.json')
+PASTA_CHECKPOINTS = os.path.join(PASTA_BASE, 'checkpoints')
+
+
+def _carregar_estado():
+    try:
+        with open(CAMINHO_ESTADO, 'r', encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _salvar_estado(estado):
+    """Grava o estado de forma atômica (arquivo temporário + os.replace)"""
+    temporario = CAMINHO_ESTADO + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, CAMINHO_ESTADO)
+
+
+def chave_execucao(inicio, fim, link_gs):
+    """Identifica a execução: mesmo período e mesma planilha retomam o mesmo estado"""
+    return f"{inicio:%Y-%m-%d}_{fim:%Y-%m-%d}_{exgs.extrair_id_planilha(link_gs)}"
+
+
+# Funções das etapas: recebem o contexto (parâmetros + saídas das etapas anteriores)
+
+def _etapa_navegador_logado(contexto):
+    if lcc.obter_driver() is not None and not lcc.navegador_responde():
+        print("⚠️ O navegador aberto não responde - abrindo outro")
+        lcc.encerrar_navegador()
+    if lcc.obter_driver() is None:
+        lcc.inicializar_navegador(perfil=contexto['perfil'])
+    lcc.loginCliniCorp_RU(contexto['url_login'], contexto['usuario'], contexto['senha'])
+    lcc.click_RankinUnidades()
+
+
+def _etapa_periodo_definido(contexto):
+    lcc.procura_periodo('Data')
+    if not lcc.definir_intervalo_datas(contexto['inicio'], contexto['fim']):
+        raise lcc.ErroEtapa('periodo_definido', "datas não aceitas pelos inputs")
+
+
+def _etapa_arquivo_baixado(contexto):
+    lcc.click_RU_listarRanking()
+    pendente = lcc.click_download()
+    if not pendente:
+        raise lcc.ErroEtapa('arquivo_baixado', "download não iniciado ou sem acompanhamento")
+    return {'caminho': pendente.aguardar()}
+
+
+def _etapa_dados_limpos(contexto):
+    dados = exgs.leXlsx_copiaDados_formato_completo(contexto['saidas']['arquivo_baixado']['caminho'])
+    os.makedirs(PASTA_CHECKPOINTS, exist_ok=True)
+    caminho = os.path.join(PASTA_CHECKPOINTS, f"{contexto['chave']}_dados.json")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+    return {'caminho': caminho, 'linhas': len(dados)}
+
+
+def _dados_limpos(contexto):
+    with open(contexto['saidas']['dados_limpos']['caminho'], 'r', encoding='utf-8') as arquivo:
+        return exgs.substitui_none(json.load(arquivo))
+
+
+def _linhas_da_tabela(worksheet, largura):
+    """
+    Linhas da tabela que o values.append (table_range='A1') encontra: as linhas contíguas a
+    partir de A1, até a primeira linha vazia nas colunas do relatório (A até a coluna 'largura').
+    Conta qualquer coluna preenchida, não só a A: linhas sem unidade também são da tabela.
+    """
+    linhas = worksheet.get_values(f"A1:{exgs.indice_para_coluna_letra(largura - 1)}")
+    return next((i for i, linha in enumerate(linhas) if not any(celula != '' for celula in linha)), len(linhas))
+
+
+def _etapa_dados_enviados(contexto):
+    _, worksheet = exgs.obter_planilha_google(contexto['path_cred'], exgs.extrair_id_planilha(contexto['link_gs']))
+    dados = _dados_limpos(contexto)
+    largura = max(map(len, dados))
+    envio = contexto['envio']
+
+    if 'range' in envio:
+        # A resposta do append chegou na execução anterior: o envio está feito
+        linha_inicio = leitor_xlsx.separa_referencia(envio['range'].split(':')[0])[1]
+        print(f"⏭️ As linhas já foram inseridas em {envio['range']} - envio não repetido")
+        return {'range': envio['range'], 'linha_inicio': linha_inicio}
+
+    if 'linhas_antes' in envio:
+        # Uma execução anterior começou o envio e não registrou a conclusão: as linhas podem
+        # ter chegado ao Google sem a resposta voltar
+        linhas_antes, linhas_agora = envio['linhas_antes'], _linhas_da_tabela(worksheet, largura)
+        if linhas_agora == linhas_antes + len(dados):
+            linha_inicio = linhas_antes + 1
+            range_usado = f"A{linha_inicio}:{exgs.indice_para_coluna_letra(largura - 1)}{linhas_antes + len(dados)}"
+            print(f"⏭️ As {len(dados)} linhas já estão na planilha ({range_usado}) - envio não repetido")
+            return {'range': range_usado, 'linha_inicio': linha_inicio}
+        if linhas_agora != linhas_antes:
+            raise lcc.ErroEtapa('dados_enviados', f"a planilha tinha {linhas_antes} linhas antes do envio anterior e "
+                                f"agora tem {linhas_agora}; confira se as linhas do período já estão lá antes de "
+                                f"enviar de novo (recomecar=True reenvia)")
+    else:
+        envio['linhas_antes'] = _linhas_da_tabela(worksheet, largura)
+        contexto['salvar_estado']()
+
+    range_usado, linha_inicio = exgs.insere_dados_append(worksheet, dados)
+    print(f"📍 Dados inseridos em {range_usado}")
+    # O updatedRange devolvido é a referência: guarda-o e confere com a contagem feita antes
+    envio['range'] = range_usado
+    if linha_inicio != envio['linhas_antes'] + 1:
+        print(f"⚠️ O append começou na linha {linha_inicio}, mas a contagem prévia indicava a linha "
+              f"{envio['linhas_antes'] + 1}: a retomada deste envio não seria confiável")
+    contexto['salvar_estado']()
+    return {'range': range_usado, 'linha_inicio': linha_inicio}
+
+
+def _etapa_formatado(contexto):
+    _, worksheet = exgs.obter_planilha_google(contexto['path_cred'], exgs.extrair_id_planilha(contexto['link_gs']))
+    exgs.aplicar_formatacao_completa_google_sheets(
+        worksheet, _dados_limpos(contexto), contexto['saidas']['dados_enviados']['linha_inicio']
+    )
+
+
+def _arquivo_existe(saida):
+    return bool(saida) and os.path.exists(saida['caminho'])
+
+
+# (nome, função, fica salvo entre execuções, validação da saída salva, pode repetir na mesma execução)
+# As etapas não salvas (estado do navegador) vêm antes do download: só rodam se ele faltar
+ETAPAS = [
+    ('navegador_logado', _etapa_navegador_logado, False, None, True),
+    ('periodo_definido', _etapa_periodo_definido, False, None, True),
+    ('arquivo_baixado', _etapa_arquivo_baixado, True, _arquivo_existe, True),
+    ('dados_limpos', _etapa_dados_limpos, True, _arquivo_existe, True),
+    ('dados_enviados', _etapa_dados_enviados, True, None, False),
+    ('formatado', _etapa_formatado, True, None, True),
+]
+
+# Etapas do navegador que dependem das anteriores (para refazê-las se o navegador cair)
+ETAPAS_NAVEGADOR = [
+    ('navegador_logado', _etapa_navegador_logado),
+    ('periodo_definido', _etapa_periodo_definido),
+    ('arquivo_baixado', _etapa_arquivo_baixado),
+]
+
+
+def _recuperar_navegador(nome, contexto):
+    """Antes de repetir uma etapa do navegador: se ele caiu, abre outro e refaz as etapas anteriores"""
+    nomes = [nome_etapa for nome_etapa, _ in ETAPAS_NAVEGADOR]
+    if nome not in nomes[1:] or lcc.navegador_responde():
+        return
+    print("⚠️ O navegador não responde - abrindo outro e refazendo login e período")
+    for nome_etapa, funcao in ETAPAS_NAVEGADOR[:nomes.index(nome)]:
+        with rastreamento.span(f"pipeline:{nome_etapa}", 'pipeline', recuperacao=True):
+            funcao(contexto)
+
+
+def _executar_com_tentativas(nome, funcao, contexto, tentativas, espera_s):
+    """Executa uma etapa repetindo só ela em caso de falha. Retorna a saída ou lança o último erro."""
+    for tentativa in range(1, tentativas + 1):
+        if tentativa > 1:
+            rastreamento.registrar_tentativa()
+            print(f"🔁 Repetindo a etapa '{nome}' (tentativa {tentativa}/{tentativas})...")
+            _recuperar_navegador(nome, contexto)
+        try:
+            with rastreamento.span(f"pipeline:{nome}", 'pipeline', tentativa=tentativa):
+                return funcao(contexto)
+        except Exception as e:
+            print(f"❌ Etapa '{nome}' falhou: {type(e).__name__}: {e}")
+            if tentativa == tentativas:
+                raise
+            time.sleep(espera_s)
+
+
+def executar_pipeline(inicio, fim, link_gs, path_cred, url_login, usuario, senha,
+                      perfil='interactive', tentativas=3, espera_s=2, recomecar=False, encerrar_ao_final=True):
+    """
+    Gera o relatório do período e envia ao Google Sheets, retomando de onde parou
+
+    Parâmetros:
+    - inicio, fim: datetime.date do período
+    - tentativas: quantas vezes cada etapa é tentada antes de desistir (o envio ao Google
+      Sheets é tentado uma vez por execução; ver o docstring do módulo)
+    - espera_s: pausa entre tentativas da mesma etapa
+    - recomecar: ignora o estado salvo e executa todas as etapas
+    - encerrar_ao_final: fecha o navegador no final (com sucesso ou não)
+
+    Retorna:
+    - True se todas as etapas concluíram; False se alguma falhou (o estado fica salvo para
+      a próxima execução continuar dali)
+    """
+    chave = chave_execucao(inicio, fim, link_gs)
+    estado_geral = _carregar_estado()
+    if recomecar:
+        estado_geral.pop(chave, None)
+    estado = estado_geral.setdefault(chave, {'concluidas': {}, 'falha': None})
+
+    contexto = {'chave': chave, 'inicio': inicio, 'fim': fim, 'link_gs': link_gs, 'path_cred': path_cred,
+                'url_login': url_login, 'usuario': usuario, 'senha': senha, 'perfil': perfil, 'saidas': {},
+                'envio': estado.setdefault('envio', {}), 'salvar_estado': lambda: _salvar_estado(estado_geral)}
+
+    # Retoma depois da última etapa salva que ainda é válida (ex.: o .xlsx baixado ainda existe)
+    def concluida(nome, validar):
+        registro = estado['concluidas'].get(nome)
+        return registro is not None and (validar is None or validar(registro['saida']))
+
+    retomar_de = 0
+    for indice, (nome, _, persistente, validar, _) in enumerate(ETAPAS):
+        if persistente and concluida(nome, validar):
+            retomar_de = indice + 1
+
+    print(f"🧭 Pipeline {chave}")
+    try:
+        for indice, (nome, funcao, persistente, validar, repetir) in enumerate(ETAPAS):
+            if indice < retomar_de:
+                if persistente and nome in estado['concluidas']:
+                    contexto['saidas'][nome] = estado['concluidas'][nome]['saida']
+                    print(f"⏭️ Etapa '{nome}' já concluída em {estado['concluidas'][nome]['em']}")
+                continue
+
+            try:
+                saida = _executar_com_tentativas(nome, funcao, contexto, tentativas if repetir else 1, espera_s)
+            except Exception as e:
+                estado['falha'] = {'etapa': nome, 'motivo': f"{type(e).__name__}: {e}",
+                                   'em': datetime.now().isoformat(timespec='seconds')}
+                _salvar_estado(estado_geral)
+                print(f"🛑 Pipeline interrompido na etapa '{nome}'. Rode de novo para continuar daqui.")
+                return False
+
+            contexto['saidas'][nome] = saida
+            if persistente:
+                estado['concluidas'][nome] = {'saida': saida, 'em': datetime.now().isoformat(timespec='seconds')}
+                estado['falha'] = None
+                _salvar_estado(estado_geral)
+            print(f"✅ Etapa '{nome}' concluída")
+
+        print(f"🎉 Pipeline {chave} concluído")
+        return True
+
+    finally:
+        if encerrar_ao_final and lcc.obter_driver() is not None:
+            lcc.encerrar_navegador()
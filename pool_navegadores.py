@@ -0,0 +1,210 @@
+import time
+import queue
+import functools
+import threading
+import login_cliniCorp as lcc
+import extracao_ranking
+import rastreamento
+
+'''
+Pool de navegadores para buscar vários (ranking, período) ao mesmo tempo.
+
+Cada worker é uma thread com a sua própria SessaoNavegador (perfil do Chrome e pasta
+de downloads exclusivos). Os workers tiram tarefas de uma fila comum, e os resultados
+são recebidos na ordem em que terminam. As funções de etapa de login_cliniCorp rodam
+sem alteração porque usam a sessão ativa da thread (SessaoNavegador.ativa).
+
+Se uma etapa falhar (ErroEtapa), o worker marca a tarefa como falha e segue com a
+mesma sessão. Antes de cada tarefa o worker confere se o navegador ainda responde; se
+ele caiu ou foi fechado, abre uma sessão nova (e refaz o preparo) em vez de falhar todas
+as tarefas seguintes contra um navegador morto.
+Se um worker morrer sem devolver resultado, o pool não fica esperando para sempre: as
+tarefas que faltarem quando não houver mais worker vivo voltam marcadas como falha.
+'''
+
+# De quanto em quanto tempo o pool confere se ainda há worker vivo enquanto espera resultados
+INTERVALO_VERIFICACAO_S = 5
+
+
+def preparar_sessao_ranking(url_login, usuario, senha):
+    """Cria a função que leva cada sessão nova até a tela de Ranking de Unidades"""
+    def preparar():
+        lcc.loginCliniCorp_RU(url_login, usuario, senha)
+        lcc.click_RankinUnidades()
+    return preparar
+
+
+def executar_tarefa_ranking(ranking, periodo, modo='download'):
+    """
+    Tarefa padrão: seleciona o ranking e o período, lista e obtém o relatório
+
+    Parâmetros:
+    - periodo: item do seletor ('Mês atual', 'Semana atual', 'Mês anterior') ou
+      (data_inicio, data_fim) para um período personalizado
+    - modo: 'download' (caminho do Excel, na pasta de downloads da sessão), 'tabela' (lê a
+      tabela da tela) ou 'json' (resposta do Listar); os dois últimos exigem o mapeamento
+      de colunas de extracao_ranking
+    """
+    if not lcc.seleciona_ranking(ranking):
+        raise RuntimeError(f"ranking '{ranking}' não pôde ser selecionado")
+
+    if isinstance(periodo, tuple):
+        lcc.procura_periodo('Data')
+        if not lcc.definir_intervalo_datas(*periodo):
+            raise RuntimeError("não foi possível preencher as datas do período")
+    else:
+        lcc.procura_periodo(periodo)
+
+    if modo == 'download':
+        lcc.click_RU_listarRanking()
+        pendente = lcc.click_download()
+        if not pendente:
+            raise RuntimeError("download não iniciado ou sem acompanhamento")
+        return pendente.aguardar()
+    if modo == 'json':
+        return lcc.click_RU_listarRanking(capturar_json=True)
+    return lcc.click_RU_listarRanking(extrair_tabela=True)
+
+
+def _trabalhar(nome, fila_tarefas, fila_resultados, preparar, executar, perfil, estatisticas):
+    """Laço de um worker: abre (ou reabre) a sessão e executa tarefas até a fila esvaziar"""
+    sessao = None
+    try:
+        while True:
+            try:
+                ranking, periodo = fila_tarefas.get_nowait()
+            except queue.Empty:
+                break
+
+            inicio = time.perf_counter()
+            resultado, erro = None, None
+            try:
+                if sessao is not None and sessao.driver is not None and not lcc.navegador_responde(sessao.driver):
+                    print(f"⚠️ Navegador de {nome} não responde - abrindo uma sessão nova")
+                    sessao.encerrar()
+                if sessao is None or sessao.driver is None:
+                    if sessao is not None:
+                        estatisticas['reinicios'] += 1
+                    sessao = lcc.SessaoNavegador(perfil=perfil, nome=nome)
+                    try:
+                        sessao.iniciar()
+                        with sessao.ativa():
+                            preparar()
+                    except Exception:
+                        # Sessão pela metade não serve para a próxima tarefa
+                        sessao.encerrar()
+                        raise
+                    estatisticas['inicializacao_s'] += time.perf_counter() - inicio
+                    inicio = time.perf_counter()
+
+                with sessao.ativa(), rastreamento.span('tarefa_pool', 'pool', ranking=ranking, periodo=str(periodo)):
+                    resultado = executar(ranking, periodo)
+
+            except Exception as e:
+                erro = f"{type(e).__name__}: {e}"
+                estatisticas['falhas'] += 1
+
+            duracao = time.perf_counter() - inicio
+            estatisticas['tarefas'] += 1
+            estatisticas['ocupado_s'] += duracao
+            fila_resultados.put({'ranking': ranking, 'periodo': periodo, 'resultado': resultado,
+                                 'erro': erro, 'duracao_s': duracao, 'worker': nome})
+    except Exception as e:
+        print(f"❌ {nome} encerrado por erro inesperado: {type(e).__name__}: {e}")
+    finally:
+        if sessao is not None:
+            sessao.encerrar()
+
+
+def executar_pool(tarefas, preparar, executar=None, n_workers=2, perfil='fast', ao_concluir=None, modo='download'):
+    """
+    Executa as tarefas (ranking, período) em N navegadores independentes
+
+    Parâmetros:
+    - tarefas: lista de (ranking, periodo); ranking vem de lcc.RANKINGS
+    - preparar: função sem parâmetros que deixa uma sessão nova pronta (ex.: preparar_sessao_ranking)
+    - executar: função (ranking, periodo) que retorna o resultado da tarefa. None =
+      executar_tarefa_ranking no 'modo' escolhido
+    - n_workers: quantidade de navegadores em paralelo
+    - perfil: perfil de navegador de cada worker ('fast' = headless)
+    - ao_concluir: função chamada com cada resultado assim que ele chega
+    - modo: modo de executar_tarefa_ranking quando executar=None ('download', 'tabela' ou
+      'json'); sem o mapeamento de colunas do modo, o pool falha antes de abrir navegadores
+
+    Retorna:
+    - dicionário {(ranking, periodo): {'resultado', 'erro', 'duracao_s', 'worker'}}
+    """
+    if executar is None:
+        extracao_ranking.conferir_mapeamento(modo)
+        executar = functools.partial(executar_tarefa_ranking, modo=modo)
+
+    fila_tarefas = queue.Queue()
+    for tarefa in tarefas:
+        fila_tarefas.put(tarefa)
+    fila_resultados = queue.Queue()
+
+    n_workers = max(1, min(n_workers, len(tarefas)))
+    print(f"🧵 Pool com {n_workers} navegador(es) para {len(tarefas)} tarefa(s)...")
+    inicio_total = time.perf_counter()
+
+    estatisticas = []
+    workers = []
+    # Os spans dos workers ficam pendurados no span de quem chamou o pool
+    contexto = rastreamento.contexto_atual()
+    for indice in range(n_workers):
+        nome = f"worker-{indice + 1}"
+        estatistica = {'worker': nome, 'tarefas': 0, 'falhas': 0, 'reinicios': 0,
+                       'ocupado_s': 0.0, 'inicializacao_s': 0.0}
+        estatisticas.append(estatistica)
+        worker = threading.Thread(
+            target=rastreamento.executar_no_contexto, name=nome,
+            args=(contexto, _trabalhar, nome, fila_tarefas, fila_resultados, preparar, executar, perfil, estatistica)
+        )
+        worker.start()
+        workers.append(worker)
+
+    resultados = {}
+    concluidas = 0
+    while concluidas < len(tarefas):
+        try:
+            registro = fila_resultados.get(timeout=INTERVALO_VERIFICACAO_S)
+        except queue.Empty:
+            # Sem worker vivo e sem nada na fila, os resultados que faltam nunca vão chegar
+            if not any(worker.is_alive() for worker in workers) and fila_resultados.empty():
+                break
+            continue
+        concluidas += 1
+        resultados[(registro['ranking'], registro['periodo'])] = registro
+        status = '❌' if registro['erro'] else '✅'
+        print(f"{status} [{concluidas}/{len(tarefas)}] {registro['ranking']} | {registro['periodo']} "
+              f"em {registro['duracao_s']:.2f}s ({registro['worker']})"
+              + (f" - {registro['erro']}" if registro['erro'] else ''))
+        if ao_concluir is not None:
+            ao_concluir(registro)
+
+    for worker in workers:
+        worker.join()
+
+    for ranking, periodo in tarefas:
+        if (ranking, periodo) not in resultados:
+            registro = {'ranking': ranking, 'periodo': periodo, 'resultado': None,
+                        'erro': "nenhum worker devolveu resultado (worker encerrado)", 'duracao_s': 0.0, 'worker': None}
+            resultados[(ranking, periodo)] = registro
+            print(f"❌ {ranking} | {periodo} - {registro['erro']}")
+            if ao_concluir is not None:
+                ao_concluir(registro)
+
+    resumo_pool(estatisticas, time.perf_counter() - inicio_total)
+    return resultados
+
+
+def resumo_pool(estatisticas, total_s):
+    """Imprime tarefas, falhas e vazão (tarefas por minuto ocupado) de cada worker"""
+    print("🧵 === RESUMO DO POOL DE NAVEGADORES ===")
+    for estatistica in estatisticas:
+        vazao = estatistica['tarefas'] / estatistica['ocupado_s'] * 60 if estatistica['ocupado_s'] else 0
+        print(f"   {estatistica['worker']:<10} {estatistica['tarefas']} tarefa(s), {estatistica['falhas']} falha(s), "
+              f"{estatistica['reinicios']} reinício(s) | preparo {estatistica['inicializacao_s']:.2f}s | "
+              f"ocupado {estatistica['ocupado_s']:.2f}s | {vazao:.1f} tarefas/min")
+    total_tarefas = sum(estatistica['tarefas'] for estatistica in estatisticas)
+    print(f"   Total: {total_tarefas} tarefa(s) em {total_s:.2f}s")
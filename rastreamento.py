@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import threading
+import functools
+from datetime import datetime
+from contextlib import contextmanager
+
+'''
+Medição por etapa (spans) da execução.
+
+Cada span registra a duração, quantas chamadas ao WebDriver e quantas requisições HTTP
+(Google Sheets) aconteceram dentro dele e quantas novas tentativas foram necessárias.
+Spans podem ser aninhados (ex.: 'envio_sheets' contém 'limpeza' e 'formatacao').
+
+Uso:
+    with rastreamento.span('leitura_xlsx'):
+        ...
+
+    @rastreamento.rastrear('login')
+    def loginCliniCorp_RU(...): ...
+
+No final: resumo_spans() imprime a tabela por etapa e exportar_trace() grava um JSON no
+formato Chrome Trace (abrir em chrome://tracing ou https://ui.perfetto.dev).
+
+Contadores e pilha de spans são por thread: um span só conta as chamadas feitas na
+própria thread. Para as threads criadas pelo projeto (worker do backfill, workers do
+pool), quem cria a thread entrega o contexto com contexto_atual() e a thread roda com
+executar_no_contexto(): os spans abertos nela têm como pai o span de quem a criou
+('pai' no trace), e as chamadas dela contam nesses spans, não no span pai.
+'''
+
+PASTA_TRACES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+
+_spans = []
+_trava = threading.Lock()
+_local = threading.local()
+_inicio_execucao = time.perf_counter()
+_http_instrumentado = False
+
+
+def _contadores():
+    """Contadores acumulados da thread atual (os spans guardam a diferença entre início e fim)"""
+    if not hasattr(_local, 'contadores'):
+        _local.contadores = {'webdriver': 0, 'http': 0, 'tentativas': 0}
+        _local.pilha = []
+    return _local.contadores
+
+
+def contexto_atual():
+    """Spans abertos nesta thread (do mais externo ao atual), para entregar a uma thread nova"""
+    _contadores()
+    return tuple(_local.pilha)
+
+
+def executar_no_contexto(contexto, funcao, *args, **kwargs):
+    """
+    Executa a função com 'contexto' (de contexto_atual) como pilha de spans da thread atual:
+    os spans abertos dentro dela apontam para o span de quem criou a thread
+    """
+    _contadores()
+    anterior = _local.pilha
+    _local.pilha = list(contexto)
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        _local.pilha = anterior
+
+
+@contextmanager
+def span(nome, categoria='etapa', **argumentos):
+    """
+    Mede o bloco como uma etapa. Os 'argumentos' (e o que for adicionado ao dicionário
+    retornado) aparecem no trace.
+    """
+    contadores = _contadores()
+    antes = dict(contadores)
+    registro = {'nome': nome, 'categoria': categoria, 'args': dict(argumentos), 'erro': None,
+                'pai': _local.pilha[-1] if _local.pilha else None}
+    _local.pilha.append(nome)
+    inicio = time.perf_counter()
+    try:
+        yield registro['args']
+    except BaseException as e:
+        registro['erro'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        fim = time.perf_counter()
+        _local.pilha.pop()
+        registro.update({
+            'inicio': inicio - _inicio_execucao,
+            'duracao': fim - inicio,
+            'thread': threading.get_ident(),
+            'nome_thread': threading.current_thread().name,
+            'webdriver': contadores['webdriver'] - antes['webdriver'],
+            'http': contadores['http'] - antes['http'],
+            'tentativas': contadores['tentativas'] - antes['tentativas'],
+        })
+        with _trava:
+            _spans.append(registro)
+
+
+def rastrear(nome=None, categoria='etapa'):
+    """Decorador: executa a função dentro de um span (nome padrão: nome da função)"""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with span(nome or funcao.__name__, categoria):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def registrar_tentativa():
+    """Conta uma nova tentativa (retry/fallback) no span atual"""
+    _contadores()['tentativas'] += 1
+
+
+def instrumentar_driver(driver):
+    """Conta cada comando enviado ao WebDriver (inclui WebElement e execute_cdp_cmd)"""
+    original = driver.execute
+
+    def execute(comando, parametros=None):
+        _contadores()['webdriver'] += 1
+        return original(comando, parametros)
+
+    driver.execute = execute
+    return driver
+
+
+def instrumentar_http():
+    """Conta as requisições HTTP feitas com 'requests' (usado por gspread/google-auth)"""
+    global _http_instrumentado
+    if _http_instrumentado:
+        return
+    import requests
+
+    original = requests.Session.request
+
+    def request(self, *args, **kwargs):
+        _contadores()['http'] += 1
+        return original(self, *args, **kwargs)
+
+    requests.Session.request = request
+    _http_instrumentado = True
+
+
+def spans_registrados():
+    with _trava:
+        return list(_spans)
+
+
+def resumo_spans():
+    """Imprime, por etapa: execuções, tempo total/médio/máximo, WebDriver, HTTP e tentativas"""
+    agregados = {}
+    for registro in spans_registrados():
+        agregado = agregados.setdefault(registro['nome'], {
+            'execucoes': 0, 'total': 0.0, 'maximo': 0.0, 'webdriver': 0, 'http': 0, 'tentativas': 0, 'erros': 0
+        })
+        agregado['execucoes'] += 1
+        agregado['total'] += registro['duracao']
+        agregado['maximo'] = max(agregado['maximo'], registro['duracao'])
+        agregado['webdriver'] += registro['webdriver']
+        agregado['http'] += registro['http']
+        agregado['tentativas'] += registro['tentativas']
+        agregado['erros'] += 1 if registro['erro'] else 0
+
+    if not agregados:
+        return
+    print("⏱️ === TEMPO POR ETAPA ===")
+    print(f"   {'etapa':<32} {'n':>3} {'total':>9} {'médio':>8} {'máx':>8} {'webdriver':>9} {'http':>5} {'retry':>5} {'erros':>5}")
+    for nome, agregado in sorted(agregados.items(), key=lambda item: item[1]['total'], reverse=True):
+        print(f"   {nome:<32} {agregado['execucoes']:>3} {agregado['total']:>8.2f}s "
+              f"{agregado['total'] / agregado['execucoes']:>7.2f}s {agregado['maximo']:>7.2f}s "
+              f"{agregado['webdriver']:>9} {agregado['http']:>5} {agregado['tentativas']:>5} {agregado['erros']:>5}")
+
+
+def exportar_trace(caminho=None):
+    """
+    Grava os spans no formato Chrome Trace (eventos 'X' com início e duração em µs)
+
+    Retorna:
+    - caminho do arquivo gravado
+    """
+    if caminho is None:
+        os.makedirs(PASTA_TRACES, exist_ok=True)
+        caminho = os.path.join(PASTA_TRACES, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    pid = os.getpid()
+    eventos = []
+    threads = {}
+    for registro in spans_registrados():
+        threads[registro['thread']] = registro['nome_thread']
+        argumentos = dict(registro['args'])
+        argumentos.update({'webdriver': registro['webdriver'], 'http': registro['http'],
+                           'tentativas': registro['tentativas']})
+        if registro['pai']:
+            argumentos['pai'] = registro['pai']
+        if registro['erro']:
+            argumentos['erro'] = registro['erro']
+        eventos.append({
+            'name': registro['nome'], 'cat': registro['categoria'], 'ph': 'X',
+            'ts': round(registro['inicio'] * 1e6), 'dur': round(registro['duracao'] * 1e6),
+            'pid': pid, 'tid': registro['thread'], 'args': argumentos,
+        })
+    for tid, nome in threads.items():
+        eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nome}})
+
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, arquivo, ensure_ascii=False, default=str)
+    print(f"🧾 Trace da execução salvo em: {caminho}")
+    return caminho
@@ -0,0 +1,186 @@
+import json
+import time
+import base64
+import threading
+
+'''
+Leitura dos eventos do Chrome DevTools Protocol (CDP) gravados no log 'performance'
+do ChromeDriver (ativado em inicializar_navegador com capturar_rede=True).
+
+driver.get_log('performance') esvazia o buffer a cada leitura, então todos os
+consumidores (captura de XHR, acompanhamento de downloads...) leem daqui: os eventos
+relevantes ficam em um buffer por driver e cada consumidor usa seu próprio cursor.
+
+Cada driver tem as suas travas: a leitura do log (uma chamada HTTP ao ChromeDriver) é
+feita fora da trava do buffer, que só é segurada para acrescentar ou ler eventos. Assim
+os navegadores do pool não esperam uns pelos outros.
+
+O log 'performance' só é lido sob demanda (não avisa quando chega algo). Quem precisa
+esperar um evento (ex.: download concluído) usa aguardar_eventos(), que drena o log na
+própria thread a cada INTERVALO_COLETA_S até o evento chegar ou o prazo acabar: é uma
+consulta periódica, feita pela thread dona do driver (nenhuma outra thread envia
+comandos ao navegador).
+'''
+
+# Só estes eventos são guardados (o log completo tem milhares de entradas por página)
+METODOS_GUARDADOS = (
+    'Network.responseReceived',
+    'Network.loadingFinished',
+    'Network.loadingFailed',
+    'Page.downloadWillBegin',
+    'Page.downloadProgress',
+    'Browser.downloadWillBegin',
+    'Browser.downloadProgress',
+)
+
+# Intervalo entre leituras do log enquanto aguardar_eventos espera
+INTERVALO_COLETA_S = 0.05
+
+
+class _CanalEventos:
+    """Buffer de eventos de um driver e as suas travas"""
+
+    def __init__(self):
+        self.eventos = []
+        # Serializa as leituras do log deste driver (mantém a ordem de chegada no buffer)
+        self.leitura = threading.Lock()
+        # Protege só o buffer; notificada quando eventos novos entram nele
+        self.novos_eventos = threading.Condition(threading.Lock())
+
+
+_canais = {}
+_trava_canais = threading.Lock()
+
+
+def _canal(driver):
+    with _trava_canais:
+        return _canais.setdefault(id(driver), _CanalEventos())
+
+
+def coletar_eventos(driver):
+    """
+    Drena o log 'performance' do driver para o buffer e retorna o buffer (lista de eventos
+    {'method': ..., 'params': ...} em ordem de chegada)
+    """
+    canal = _canal(driver)
+    with canal.leitura:
+        entradas = driver.get_log('performance')
+        novos = []
+        for entrada in entradas:
+            try:
+                mensagem = json.loads(entrada['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if mensagem.get('method') in METODOS_GUARDADOS:
+                novos.append(mensagem)
+        if novos:
+            with canal.novos_eventos:
+                canal.eventos.extend(novos)
+                canal.novos_eventos.notify_all()
+    return canal.eventos
+
+
+def marcar(driver):
+    """Cursor para 'a partir de agora': use antes da ação cujas respostas serão lidas"""
+    return len(coletar_eventos(driver))
+
+
+def eventos_desde(driver, cursor, metodos=None):
+    """Eventos recebidos depois do cursor, opcionalmente filtrados por método"""
+    coletar_eventos(driver)
+    canal = _canal(driver)
+    with canal.novos_eventos:
+        eventos = canal.eventos[cursor:]
+    if metodos:
+        eventos = [e for e in eventos if e['method'] in metodos]
+    return eventos
+
+
+def aguardar_eventos(driver, cursor, metodos, timeout):
+    """
+    Espera chegar algum evento de 'metodos' depois do cursor, ou até o timeout (s), lendo o
+    log a cada INTERVALO_COLETA_S (outra thread que leia o mesmo driver acorda a espera antes)
+
+    Retorna:
+    - (novo_cursor, eventos): eventos de 'metodos' recebidos depois do cursor (lista vazia
+      se o timeout acabou) e o cursor para continuar depois deles
+    """
+    canal = _canal(driver)
+    limite = time.perf_counter() + max(timeout, 0)
+    while True:
+        coletar_eventos(driver)
+        with canal.novos_eventos:
+            eventos = [evento for evento in canal.eventos[cursor:] if evento['method'] in metodos]
+            restante = limite - time.perf_counter()
+            if eventos or restante <= 0:
+                return len(canal.eventos), eventos
+            canal.novos_eventos.wait(min(INTERVALO_COLETA_S, restante))
+
+
+def limpar_eventos(driver):
+    """Descarta o buffer do driver (ex.: ao encerrar o navegador)"""
+    with _trava_canais:
+        _canais.pop(id(driver), None)
+
+
+def corpo_resposta(driver, request_id):
+    """Busca o corpo de uma resposta pelo requestId (Network.getResponseBody)"""
+    resposta = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+    corpo = resposta.get('body', '')
+    if resposta.get('base64Encoded'):
+        corpo = base64.b64decode(corpo).decode('utf-8', errors='replace')
+    return corpo
+
+
+def respostas_json_desde(driver, cursor, filtro_url=None):
+    """
+    Retorna [(url, json)] das respostas XHR/fetch JSON concluídas depois do cursor
+
+    Parâmetros:
+    - filtro_url: se informado, só considera URLs que contenham este trecho
+    """
+    eventos = eventos_desde(driver, cursor)
+    concluidos = {e['params']['requestId'] for e in eventos if e['method'] == 'Network.loadingFinished'}
+
+    respostas = []
+    for evento in eventos:
+        if evento['method'] != 'Network.responseReceived':
+            continue
+        params = evento['params']
+        resposta = params.get('response', {})
+        if params.get('type') not in ('XHR', 'Fetch'):
+            continue
+        if 'json' not in resposta.get('mimeType', ''):
+            continue
+        if filtro_url and filtro_url not in resposta.get('url', ''):
+            continue
+        if params['requestId'] not in concluidos:
+            continue
+
+        try:
+            respostas.append((resposta['url'], json.loads(corpo_resposta(driver, params['requestId']))))
+        except Exception as e:
+            print(f"⚠️ Não foi possível ler a resposta {resposta.get('url')}: {e}")
+
+    return respostas
+
+
+def maior_lista_de_registros(dado):
+    """
+    Procura (recursivamente) a maior lista de objetos dentro de um JSON.
+    É onde normalmente ficam as linhas de uma tabela ({"data": {"items": [{...}, ...]}})
+    """
+    melhor = []
+    if isinstance(dado, list):
+        if dado and all(isinstance(item, dict) for item in dado):
+            melhor = dado
+        for item in dado:
+            candidata = maior_lista_de_registros(item)
+            if len(candidata) > len(melhor):
+                melhor = candidata
+    elif isinstance(dado, dict):
+        for valor in dado.values():
+            candidata = maior_lista_de_registros(valor)
+            if len(candidata) > len(melhor):
+                melhor = candidata
+    return melhor
@@ -0,0 +1,125 @@
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+
+'''
+Registro das alterações feitas pela limpeza do relatório.
+
+A limpeza chama registrar(linha, coluna, regra, antes, depois) para cada célula alterada.
+O nível define o que acontece com cada registro:
+- 'desligado': nada (nem contagem)
+- 'resumo':    só conta por coluna e regra (padrão)
+- 'amostra':   conta e imprime as primeiras N alterações de cada coluna/regra
+- 'arquivo':   conta e grava todas as alterações em um arquivo (escrita com buffer)
+- 'completo':  conta e imprime todas as alterações (comportamento antigo, lento em
+               relatórios grandes porque o terminal vira o gargalo). As linhas saem em
+               lotes de TAMANHO_LOTE_COMPLETO (um write por lote, não um print por célula);
+               descarregar() imprime o que estiver pendente
+
+Em todos os níveis, exceto 'desligado', fechar() imprime uma tabela com as contagens.
+'''
+
+NIVEIS = ('desligado', 'resumo', 'amostra', 'arquivo', 'completo')
+NIVEL_PADRAO = 'resumo'
+PASTA_LOGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+TAMANHO_BUFFER_ARQUIVO = 1024 * 1024
+TAMANHO_LOTE_COMPLETO = 5000
+
+
+class RelatorioAlteracoes:
+    """Destino dos registros de alteração da limpeza (ver níveis acima)"""
+
+    def __init__(self, nivel=NIVEL_PADRAO, amostras=5, caminho=None):
+        if nivel not in NIVEIS:
+            raise ValueError(f"nível de relatório inválido: {nivel!r} (use um de {NIVEIS})")
+        self.nivel = nivel
+        self.amostras = amostras
+        self.contagens = {}
+        self.caminho = None
+        self._arquivo = None
+        self._pendentes = []
+
+        # Cada nível tem a sua função de registro: sem 'if' por célula no laço da limpeza
+        self.registrar = {
+            'desligado': self._ignorar,
+            'resumo': self._contar_registro,
+            'amostra': self._registrar_amostra,
+            'arquivo': self._registrar_arquivo,
+            'completo': self._registrar_completo,
+        }[nivel]
+
+        if nivel == 'arquivo':
+            if caminho is None:
+                os.makedirs(PASTA_LOGS, exist_ok=True)
+                caminho = os.path.join(PASTA_LOGS, f"limpeza_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+            self.caminho = caminho
+            self._arquivo = open(caminho, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER_ARQUIVO)
+
+    @property
+    def por_celula(self):
+        """True se o nível usa cada alteração (não basta a contagem em bloco)"""
+        return self.nivel in ('amostra', 'arquivo', 'completo')
+
+    def contar(self, coluna, regra, quantidade=1):
+        """Soma alterações sem detalhes (ex.: células convertidas em bloco)"""
+        if self.nivel != 'desligado' and quantidade:
+            chave = (coluna, regra)
+            self.contagens[chave] = self.contagens.get(chave, 0) + quantidade
+
+    def _ignorar(self, linha, coluna, regra, antes, depois):
+        pass
+
+    def _contar_registro(self, linha, coluna, regra, antes, depois):
+        chave = (coluna, regra)
+        contagem = self.contagens.get(chave, 0) + 1
+        self.contagens[chave] = contagem
+        return contagem
+
+    def _registrar_amostra(self, linha, coluna, regra, antes, depois):
+        if self._contar_registro(linha, coluna, regra, antes, depois) <= self.amostras:
+            print(f"Linha {linha}, Coluna {coluna}: '{antes}' -> '{depois}'")
+
+    def _registrar_arquivo(self, linha, coluna, regra, antes, depois):
+        self._contar_registro(linha, coluna, regra, antes, depois)
+        self._arquivo.write(f"Linha {linha}, Coluna {coluna} [{regra}]: '{antes}' -> '{depois}'\n")
+
+    def _registrar_completo(self, linha, coluna, regra, antes, depois):
+        pendentes = self._pendentes
+        pendentes.append((linha, coluna, regra, antes, depois))
+        if len(pendentes) >= TAMANHO_LOTE_COMPLETO:
+            self.descarregar()
+
+    def descarregar(self):
+        """Conta e imprime as alterações pendentes do nível 'completo' (um write só)"""
+        pendentes = self._pendentes
+        if not pendentes:
+            return
+        self._pendentes = []
+        contagens = self.contagens
+        for chave, quantidade in Counter((coluna, regra) for _, coluna, regra, _, _ in pendentes).items():
+            contagens[chave] = contagens.get(chave, 0) + quantidade
+        sys.stdout.write(''.join([f"Linha {linha}, Coluna {coluna}: '{antes}' -> '{depois}'\n"
+                                  for linha, coluna, _, antes, depois in pendentes]))
+
+    def resumo(self):
+        """Imprime a tabela de alterações por coluna e regra"""
+        if self.nivel == 'desligado' or not self.contagens:
+            return
+        print("🧾 === ALTERAÇÕES DA LIMPEZA ===")
+        print(f"   {'coluna':<7} {'regra':<24} {'células':>9}")
+        # Ordem das colunas da planilha: A..Z, AA..AZ, ...
+        for (coluna, regra), quantidade in sorted(self.contagens.items(),
+                                                  key=lambda item: (len(item[0][0]), item[0][0].upper(), item[0][1])):
+            print(f"   {coluna.upper():<7} {regra:<24} {quantidade:>9}")
+        print(f"   Total: {sum(self.contagens.values())} alterações")
+        if self.caminho:
+            print(f"📝 Alterações célula a célula em: {self.caminho}")
+
+    def fechar(self):
+        """Grava o que estiver no buffer do arquivo (ou pendente no nível 'completo') e imprime o resumo"""
+        self.descarregar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        self.resumo()
@@ -0,0 +1,89 @@
+import os
+import re
+import json
+import threading
+from functools import lru_cache
+from collections import namedtuple
+
+'''
+Cadastro das unidades (clínicas) do relatório, lido de unidades.json.
+
+O relatório identifica a unidade por um código como '1odontologiasa': um número seguido
+do slug da clínica. Cada unidade do arquivo tem o slug, o nome usado na planilha e o CEP
+(coluna AV). O formato do código é o 'padrao_codigo' do arquivo (grupos 'numero' e 'slug'),
+então qualquer número vale ('10odontologiasa') e uma clínica nova entra só no JSON:
+
+    {"slug": "odontonova", "nome": "Nova Cruz", "cep": "59215-000"}
+
+Códigos fora do padrão podem ser listados em "codigos" na própria unidade.
+Cada código resolvido fica em memória (LRU); a consulta é um dicionário pelo slug.
+'''
+
+CAMINHO_UNIDADES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'unidades.json')
+
+Unidade = namedtuple('Unidade', ['slug', 'nome', 'cep'])
+
+_registro = None
+_trava_carga = threading.Lock()
+
+
+def carregar_unidades(caminho=CAMINHO_UNIDADES):
+    """
+    Lê o arquivo de unidades e substitui o cadastro em uso (descarta os códigos em memória)
+
+    Retorna:
+    - dicionário com 'padrao', 'por_slug' e 'por_codigo'
+    """
+    global _registro
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        configuracao = json.load(arquivo)
+
+    por_slug = {}
+    por_codigo = {}
+    for item in configuracao['unidades']:
+        unidade = Unidade(item['slug'], item['nome'], item.get('cep', ''))
+        por_slug[unidade.slug] = unidade
+        for codigo in item.get('codigos', []):
+            por_codigo[codigo] = unidade
+
+    _registro = {'padrao': re.compile(configuracao['padrao_codigo']), 'por_slug': por_slug, 'por_codigo': por_codigo}
+    resolver_unidade.cache_clear()
+    print(f"🏥 {len(por_slug)} unidades carregadas de {caminho}")
+    return _registro
+
+
+def _obter_registro():
+    """Cadastro em uso, lido do arquivo na primeira consulta"""
+    global _registro
+    if _registro is None:
+        with _trava_carga:
+            if _registro is None:
+                try:
+                    carregar_unidades()
+                except FileNotFoundError:
+                    print(f"⚠️ Arquivo de unidades não encontrado: {CAMINHO_UNIDADES} (nenhum código será substituído)")
+                    _registro = {'padrao': re.compile(r'(?!)'), 'por_slug': {}, 'por_codigo': {}}
+    return _registro
+
+
+@lru_cache(maxsize=4096)
+def resolver_unidade(codigo):
+    """
+    Unidade do código do relatório (ex.: '1odontologiasa' ou '10odontologiasa')
+
+    Retorna:
+    - Unidade(slug, nome, cep) ou None se o código não corresponder a nenhuma unidade
+    """
+    registro = _obter_registro()
+    unidade = registro['por_codigo'].get(codigo)
+    if unidade is not None:
+        return unidade
+    correspondencia = registro['padrao'].match(codigo)
+    if correspondencia is None:
+        return None
+    return registro['por_slug'].get(correspondencia.group('slug'))
+
+
+def listar_unidades():
+    """Unidades cadastradas, na ordem do arquivo"""
+    return list(_obter_registro()['por_slug'].values())